@@ -0,0 +1,28 @@
+from django.urls import path
+
+from . import views
+
+app_name: str = "api"
+
+urlpatterns: list = [
+    path("posts/", views.PostResource.as_view(), name="posts"),
+    path("posts/<int:pk>/", views.PostResource.as_view(), name="post"),
+    path("categories/", views.CategoryResource.as_view(), name="categories"),
+    path(
+        "categories/<int:pk>/",
+        views.CategoryResource.as_view(),
+        name="category",
+    ),
+    path("locations/", views.LocationResource.as_view(), name="locations"),
+    path(
+        "locations/<int:pk>/",
+        views.LocationResource.as_view(),
+        name="location",
+    ),
+    path("comments/", views.CommentResource.as_view(), name="comments"),
+    path(
+        "comments/<int:pk>/", views.CommentResource.as_view(), name="comment"
+    ),
+    path("users/", views.UserResource.as_view(), name="users"),
+    path("users/<int:pk>/", views.UserResource.as_view(), name="user"),
+]
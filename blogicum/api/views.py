@@ -0,0 +1,295 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import default_storage
+from django.db.models import Case, F, When
+from django.http import Http404, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, urlencode
+from django.views.generic import View
+
+from blog.models import Category, Comment, Location, Post
+from blog.paginators import CursorPaginator
+from core.conditional import make_etag
+
+User = get_user_model()
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# Сколько записей можно запросить одним ?ids=.
+MAX_IDS = 100
+
+
+class ApiError(Exception):
+    """Некорректный параметр запроса: ответ 400 с текстом ошибки."""
+
+
+def json_response(data, status=200):
+    return JsonResponse(
+        data, status=status, json_dumps_params={"ensure_ascii": False}
+    )
+
+
+class ResourceView(View):
+    """
+    Ресурс API только для чтения: список с keyset-пагинацией, запись по
+    id и пакетная выборка ?ids=1,2,3. Записи выбираются через values()
+    без создания моделей, ?fields= оставляет в SELECT только нужные
+    столбцы и JOIN. ETag и Last-Modified строятся по id и столбцам
+    версии выбранных записей, поэтому видят изменения из любого процесса,
+    и неизменившиеся данные отдаются ответом 304 без сериализации.
+    """
+
+    # Поле ответа → путь ORM или выражение.
+    fields = {}
+    # Преобразования значений полей для JSON.
+    converters = {}
+    # Параметр запроса → поиск ORM для фильтрации списка.
+    filters = {}
+    date_field = "created_at"
+    # Столбцы, которые меняются вместе с данными записи, и время
+    # изменения для Last-Modified (None — без Last-Modified).
+    version_fields = ("updated_at",)
+    modified_field = "updated_at"
+    descending = False
+    queryset = None
+
+    def get_queryset(self):
+        if self.queryset is None:
+            raise ImproperlyConfigured(
+                f"{self.__class__.__name__} is missing a QuerySet. Define "
+                f"{self.__class__.__name__}.queryset or override "
+                f"{self.__class__.__name__}.get_queryset()."
+            )
+        return self.queryset.all()
+
+    def get_validators(self, rows):
+        """Возвращает пару (etag, last_modified) для выбранных записей;
+        путь с параметрами учитывает ?fields=, ?ids= и курсор.
+        """
+        etag = make_etag(
+            self.request.get_full_path(),
+            *(
+                (row["id"], *(row[name] for name in self.version_fields))
+                for row in rows
+            ),
+        )
+        if self.modified_field is None:
+            return etag, None
+        last_modified = max(
+            (int(row[self.modified_field].timestamp()) for row in rows),
+            default=None,
+        )
+        return etag, last_modified
+
+    def get_fields(self):
+        requested = self.request.GET.get("fields")
+        if not requested:
+            return list(self.fields)
+        names = list(dict.fromkeys(filter(None, requested.split(","))))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown or not names:
+            raise ApiError(
+                f"Неизвестные поля: {', '.join(unknown)}. "
+                f"Доступны: {', '.join(self.fields)}."
+            )
+        return names
+
+    def select(self, names):
+        """Выборка словарей только с нужными столбцами."""
+        queryset = self.get_queryset()
+        expressions = {
+            f"api_{name}": self.fields[name]
+            for name in names
+            if not isinstance(self.fields[name], str)
+        }
+        if expressions:
+            queryset = queryset.annotate(**expressions)
+        paths = [
+            self.fields[name]
+            for name in names
+            if isinstance(self.fields[name], str)
+        ]
+        return queryset.values(
+            *dict.fromkeys(
+                [
+                    "id",
+                    self.date_field,
+                    *self.version_fields,
+                    *paths,
+                    *expressions,
+                ]
+            )
+        )
+
+    def serialize(self, row, names):
+        item = {}
+        for name in names:
+            source = self.fields[name]
+            value = row[source if isinstance(source, str) else f"api_{name}"]
+            convert = self.converters.get(name)
+            item[name] = convert(value) if convert and value else value
+        return item
+
+    def get(self, request, pk=None):
+        try:
+            names = self.get_fields()
+            rows = self.select(names)
+            if pk is not None:
+                row = rows.filter(pk=pk).first()
+                if row is None:
+                    return json_response({"error": "Не найдено."}, 404)
+                rows, data = [row], self.serialize(row, names)
+            elif "ids" in request.GET:
+                rows, data = self.get_many(rows, names)
+            else:
+                rows, data = self.get_page(rows, names)
+        except ApiError as error:
+            return json_response({"error": str(error)}, 400)
+        etag, last_modified = self.get_validators(rows)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        ) or json_response(data)
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def get_many(self, rows, names):
+        try:
+            ids = [
+                int(value)
+                for value in self.request.GET["ids"].split(",")
+                if value
+            ]
+        except ValueError:
+            raise ApiError("ids — список чисел через запятую.")
+        if len(ids) > MAX_IDS:
+            raise ApiError(f"Не больше {MAX_IDS} записей за запрос.")
+        ids = list(dict.fromkeys(ids))
+        found = {row["id"]: row for row in rows.filter(pk__in=ids)}
+        return found.values(), {
+            "results": [
+                self.serialize(found[pk], names) for pk in ids if pk in found
+            ],
+            "missing": [pk for pk in ids if pk not in found],
+        }
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get("limit", DEFAULT_LIMIT))
+        except ValueError:
+            raise ApiError("limit — целое число.")
+        return min(max(limit, 1), MAX_LIMIT)
+
+    def get_page(self, rows, names):
+        try:
+            rows = rows.filter(
+                **{
+                    lookup: self.request.GET[param]
+                    for param, lookup in self.filters.items()
+                    if param in self.request.GET
+                }
+            )
+        except (ValueError, TypeError):
+            raise ApiError("Некорректное значение фильтра.")
+        paginator = CursorPaginator(
+            rows,
+            self.get_limit(),
+            date_field=self.date_field,
+            descending=self.descending,
+        )
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except Http404:
+            raise ApiError("Некорректный курсор.")
+        return page, {
+            "results": [self.serialize(row, names) for row in page],
+            "next": self.page_url(page.next_cursor),
+            "previous": self.page_url(page.previous_cursor),
+        }
+
+    def page_url(self, cursor):
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params["cursor"] = cursor
+        return f"{self.request.path}?{urlencode(sorted(params.items()))}"
+
+
+class PostResource(ResourceView):
+    """Опубликованные посты, от новых к старым."""
+
+    queryset = Post.objects.published()
+    fields = {
+        "id": "id",
+        "title": "title",
+        "text": "text",
+        "pub_date": "pub_date",
+        "author": "author__username",
+        "category": "category__slug",
+        # Скрытое местоположение не показывается, как и на сайте.
+        "location": Case(
+            When(location__is_published=True, then=F("location__name"))
+        ),
+        "image": "image",
+        "comment_count": "comment_count",
+    }
+    converters = {"image": lambda name: default_storage.url(name)}
+    filters = {"category": "category__slug", "author": "author__username"}
+    date_field = "pub_date"
+    descending = True
+
+
+class CategoryResource(ResourceView):
+    """Опубликованные категории."""
+
+    queryset = Category.objects.filter(is_published=True)
+    fields = {
+        "id": "id",
+        "title": "title",
+        "slug": "slug",
+        "description": "description",
+        "posts_published": "stats__posts_published",
+    }
+    version_fields = ("updated_at", "stats__posts_published")
+
+
+class LocationResource(ResourceView):
+    """Опубликованные местоположения."""
+
+    queryset = Location.objects.filter(is_published=True)
+    fields = {"id": "id", "name": "name"}
+
+
+class CommentResource(ResourceView):
+    """Комментарии к опубликованным постам в хронологическом порядке."""
+
+    queryset = Comment.objects.filter(post__is_live=True)
+    fields = {
+        "id": "id",
+        "post": "post_id",
+        "author": "author__username",
+        "text": "text",
+        "created_at": "created_at",
+    }
+    filters = {"post": "post_id"}
+    # Времени изменения у комментария нет: версия — выводимые столбцы.
+    version_fields = ("text", "author__username")
+    modified_field = None
+
+
+class UserResource(ResourceView):
+    """Открытые данные активных пользователей, без почты."""
+
+    queryset = User.objects.filter(is_active=True)
+    fields = {
+        "id": "id",
+        "username": "username",
+        "first_name": "first_name",
+        "last_name": "last_name",
+        "about_me": "about_me",
+        "date_joined": "date_joined",
+        "posts_published": "post_stats__posts_published",
+    }
+    date_field = "date_joined"
+    version_fields = ("updated_at", "post_stats__posts_published")
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import Category, Comment, Location, Post
+from .search import search_posts
 
 admin.site.empty_value_display = "Не задано"
 
@@ -27,6 +28,12 @@ class PostAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         return super().get_queryset(request).filter(is_published=True)
 
+    def get_search_results(self, request, queryset, search_term):
+        """Ищет по полнотекстовому индексу вместо LIKE по search_fields."""
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
     def get_actions(self, request):
         actions = super().get_actions(request)
         if "delete_selected" in actions:
@@ -0,0 +1,324 @@
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+from io import StringIO
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+from faker import Faker
+
+from api import urls as api_urls
+from blog import urls as blog_urls
+from pages import urls as pages_urls
+
+from .models import Category, Comment, Location, Post
+from .publication import rebuild_live_flags
+
+User = get_user_model()
+
+BENCH_USERNAME = "bench_author"
+# Сколько строк вставляется одним bulk_create.
+BATCH_SIZE = 5000
+# Допуски по умолчанию: запросов не больше, чем в базовой линии, p50 и
+# пик памяти — не больше чем на долю сверх неё плюс абсолютный запас.
+LATENCY_TOLERANCE = 1.0
+LATENCY_SLACK_MS = 2.0
+MEMORY_TOLERANCE = 0.25
+MEMORY_SLACK_KIB = 64
+
+
+def _corpus():
+    """Заголовки, тексты, категории и места из фикстуры db.json."""
+    corpus = {"post": [], "category": [], "location": []}
+    path = settings.BASE_DIR.parent / "db.json"
+    if path.exists():
+        for row in json.loads(path.read_text(encoding="utf-8")):
+            model = row["model"].partition(".")[2]
+            if model in corpus:
+                corpus[model].append(row["fields"])
+    return corpus
+
+
+def seed(posts, comments, users=50, categories=20, seed_value=0):
+    """
+    Заполняет пустую базу постами и комментариями: тексты берутся из
+    db.json и дополняются Faker. Вставка идёт через bulk_create без
+    сигналов, поэтому производные данные затем пересчитываются теми же
+    командами, что исправляют их расхождение в рабочей базе.
+    """
+    rnd = random.Random(seed_value)
+    fake = Faker("ru_RU")
+    fake.seed_instance(seed_value)
+    corpus = _corpus()
+    now = timezone.now()
+
+    User.objects.bulk_create(
+        [User(username=BENCH_USERNAME, is_staff=True, password="!")]
+        + [
+            User(username=f"bench_{i}_{fake.user_name()}", password="!")
+            for i in range(users - 1)
+        ]
+    )
+    user_ids = list(User.objects.values_list("pk", flat=True))
+
+    category_rows = corpus["category"] or [{}]
+    Category.objects.bulk_create(
+        Category(
+            title=category_rows[i % len(category_rows)].get("title")
+            or fake.word().capitalize(),
+            description=category_rows[i % len(category_rows)].get(
+                "description"
+            )
+            or fake.sentence(),
+            slug=f"bench-{i}",
+            is_published=rnd.random() > 0.1,
+        )
+        for i in range(categories)
+    )
+    category_ids = list(Category.objects.values_list("pk", flat=True))
+    Location.objects.bulk_create(
+        Location(name=row.get("name") or fake.city())
+        for row in corpus["location"] or [{} for _ in range(10)]
+    )
+    location_ids = list(Location.objects.values_list("pk", flat=True))
+
+    post_rows = corpus["post"] or [{}]
+    for start in range(0, posts, BATCH_SIZE):
+        batch = []
+        for _ in range(start, min(posts, start + BATCH_SIZE)):
+            row = rnd.choice(post_rows)
+            batch.append(
+                Post(
+                    title=(row.get("title") or fake.sentence())[:256],
+                    text=" ".join(
+                        filter(None, (row.get("text"), fake.paragraph()))
+                    ),
+                    # Немного постов остаются отложенными.
+                    pub_date=now - timedelta(days=rnd.uniform(-3, 3650)),
+                    author_id=rnd.choice(user_ids),
+                    category_id=rnd.choice(category_ids),
+                    location_id=rnd.choice(location_ids),
+                    is_published=rnd.random() > 0.05,
+                )
+            )
+        Post.objects.bulk_create(batch)
+    rebuild_live_flags()
+
+    post_ids = list(
+        Post.objects.published().order_by("pk").values_list("pk", flat=True)
+    )
+    sentences = [fake.sentence() for _ in range(500)]
+    for start in range(0, comments if post_ids else 0, BATCH_SIZE):
+        Comment.objects.bulk_create(
+            Comment(
+                # Перекос в сторону первых постов: у них тысячи
+                # комментариев, как у популярных записей.
+                post_id=post_ids[int(len(post_ids) * rnd.random() ** 3)],
+                author_id=rnd.choice(user_ids),
+                text=rnd.choice(sentences),
+            )
+            for _ in range(start, min(comments, start + BATCH_SIZE))
+        )
+
+    call_command("recount_comments", stdout=StringIO())
+    # Самый комментируемый пост и его первый комментарий отдаются автору
+    # бенчмарка: от его имени открываются страницы редактирования.
+    author = User.objects.get(username=BENCH_USERNAME)
+    hot = Post.objects.published().order_by("-comment_count").first()
+    if hot is not None:
+        Post.objects.filter(pk=hot.pk).update(author=author)
+        Comment.objects.filter(
+            pk=Comment.objects.filter(post=hot).values("pk")[:1]
+        ).update(author=author)
+    call_command("rebuild_stats", stdout=StringIO())
+    call_command("rebuild_search_index", stdout=StringIO())
+
+
+def _clear_caches():
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+def _sample_kwargs():
+    """Значения аргументов URL: самый комментируемый пост автора
+    бенчмарка, его комментарий, категория, местоположение и профиль.
+    """
+    author = User.objects.get(username=BENCH_USERNAME)
+    post = (
+        Post.objects.published()
+        .filter(author=author)
+        .order_by("-comment_count")
+        .first()
+    )
+    comment = Comment.objects.filter(post=post, author=author).first()
+    return author, {
+        "pk": post.pk,
+        "post_id": post.pk,
+        "username": author.username,
+        "category_slug": post.category.slug,
+        "comment_pk": comment.pk if comment else None,
+        # Записи API по имени маршрута.
+        "api:post": post.pk,
+        "api:category": post.category_id,
+        "api:location": post.location_id,
+        "api:comment": comment.pk if comment else None,
+        "api:user": author.pk,
+    }
+
+
+def route_urls():
+    """URL всех маршрутов blog, pages и api с правдоподобными
+    аргументами и дополнительные варианты с параметрами запроса.
+    """
+    author, sample = _sample_kwargs()
+    urls = {}
+    for namespace, module in (
+        ("blog", blog_urls),
+        ("pages", pages_urls),
+        ("api", api_urls),
+    ):
+        for pattern in module.urlpatterns:
+            if not isinstance(pattern, URLPattern):
+                continue
+            route = f"{namespace}:{pattern.name}"
+            names = list(pattern.pattern.regex.groupindex)
+            kwargs = {name: sample[name] for name in names}
+            if pattern.name in ("edit_comment", "delete_comment"):
+                kwargs["pk"] = sample["comment_pk"]
+            if pattern.name == "edit_profile":
+                kwargs["pk"] = author.pk
+            if route in sample:
+                kwargs["pk"] = sample[route]
+            if None in kwargs.values():
+                continue
+            urls[route] = reverse(route, kwargs=kwargs)
+    # Полная выгрузка на миллионе комментариев мерилась бы минутами.
+    urls["blog:export"] += "?" + urlencode(
+        {"models": "users,categories,locations"}
+    )
+    last_page = max(1, Post.objects.published().count() // 10)
+    urls["blog:index?deep"] = reverse("blog:index") + "?" + urlencode(
+        {"page": last_page}
+    )
+    word = Post.objects.published().values_list("title", flat=True).first()
+    urls["blog:search?q"] = reverse("blog:search") + "?" + urlencode(
+        {"q": (word or "обед").split()[0]}
+    )
+    return author, urls
+
+
+def _get(client, url):
+    response = client.get(url)
+    # Потоковый ответ строится только при чтении.
+    if response.streaming:
+        b"".join(response.streaming_content)
+    return response
+
+
+def _measure(client, url, iterations, warm):
+    if not warm:
+        _clear_caches()
+    with CaptureQueriesContext(connection) as queries:
+        response = _get(client, url)
+    # captured_queries читает журнал соединения, который следующие
+    # запросы очистят.
+    query_count = len(queries.captured_queries)
+    timings = []
+    for _ in range(iterations):
+        if not warm:
+            _clear_caches()
+        started = time.perf_counter()
+        _get(client, url)
+        timings.append((time.perf_counter() - started) * 1000)
+    if not warm:
+        _clear_caches()
+    tracemalloc.start()
+    _get(client, url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings.sort()
+    return {
+        "status": response.status_code,
+        "queries": query_count,
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1,
+                                    int(len(timings) * 0.95))], 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(iterations=20, warm=False):
+    """
+    Запрашивает каждый маршрут анонимно и от имени автора. Возвращает
+    словарь «маршрут:клиент» → число запросов к БД, p50/p95 времени
+    ответа и пик выделенной памяти. Без warm кеши очищаются перед
+    каждым запросом, и измеряется сама отрисовка.
+    """
+    author, urls = route_urls()
+    clients = {"anon": Client(), "user": Client()}
+    clients["user"].force_login(author)
+    results = {}
+    for name, url in urls.items():
+        for who, client in clients.items():
+            results[f"{name}:{who}"] = {
+                "url": url,
+                **_measure(client, url, max(1, iterations), warm),
+            }
+    return results
+
+
+def volumes():
+    return {
+        "posts": Post.objects.count(),
+        "comments": Comment.objects.count(),
+    }
+
+
+def compare(results, baseline, latency_tolerance=LATENCY_TOLERANCE,
+            memory_tolerance=MEMORY_TOLERANCE, timings=True):
+    """
+    Сравнивает результаты с базовой линией и возвращает список
+    регрессий. Рост числа запросов — регрессия всегда; время и память
+    сравниваются только при timings, то есть на тех же объёмах данных.
+    Маршрут, которого нет в базовой линии или в результатах, — тоже
+    регрессия: базовую линию нужно обновить.
+    """
+    regressions = [
+        f"{key}: нет в результатах"
+        for key in sorted(baseline.keys() - results.keys())
+    ]
+    for key, current in sorted(results.items()):
+        base = baseline.get(key)
+        if base is None:
+            regressions.append(f"{key}: нет в базовой линии")
+            continue
+        if current["queries"] > base["queries"]:
+            regressions.append(
+                f"{key}: запросов {current['queries']} > {base['queries']}"
+            )
+        if not timings:
+            continue
+        # Медиана устойчива к паузам сборщика мусора и соседям по
+        # машине, p95 из пары десятков замеров — почти максимум.
+        limit = base["p50_ms"] * (1 + latency_tolerance) + LATENCY_SLACK_MS
+        if current["p50_ms"] > limit:
+            regressions.append(
+                f"{key}: p50 {current['p50_ms']} мс > {limit:.1f} мс"
+            )
+        limit = base["peak_kib"] * (1 + memory_tolerance) + MEMORY_SLACK_KIB
+        if current["peak_kib"] > limit:
+            regressions.append(
+                f"{key}: память {current['peak_kib']} КиБ > {limit:.0f} КиБ"
+            )
+    return regressions
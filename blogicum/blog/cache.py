@@ -0,0 +1,27 @@
+from django.core.cache.utils import make_template_fragment_key
+from django.utils import timezone
+
+# Алиас кеша и имя фрагмента из {% cache %} в includes/post_card.html
+FRAGMENT_CACHE = "fragments"
+POST_CARD_FRAGMENT = "post_card"
+
+
+def post_card_key(post_id, updated_at, comment_count):
+    """
+    Ключ закешированной карточки поста. Время изменения и число
+    комментариев входят в ключ, поэтому правка поста в любом процессе
+    сразу даёт новую карточку.
+    """
+    return make_template_fragment_key(
+        POST_CARD_FRAGMENT, [post_id, updated_at.timestamp(), comment_count]
+    )
+
+
+def touch_posts(posts):
+    """
+    Отмечает посты изменёнными, когда изменились выводимые в их
+    карточках категория, местоположение или автор. Новое время
+    изменения меняет ключи карточек и валидаторы страниц во всех
+    процессах, а не только в кеше этого.
+    """
+    return posts.update(updated_at=timezone.now())
@@ -0,0 +1,172 @@
+import gzip
+import json
+import os
+import zlib
+from datetime import datetime, time
+from itertools import chain
+from pathlib import Path
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+
+# Короткие имена выгружаемых моделей в порядке зависимостей, так что
+# выгрузка в один файл импортируется командой import_content.
+MODELS = {
+    "users": "users.user",
+    "categories": "blog.category",
+    "locations": "blog.location",
+    "posts": "blog.post",
+    "comments": "blog.comment",
+}
+# Что не должно покидать базу.
+EXCLUDED_FIELDS = {"users.user": {"password"}}
+DATE_FIELDS = {"users.user": "date_joined"}
+# По дате делятся только растущие без предела таблицы.
+SHARDED = {"blog.post", "blog.comment"}
+SHARD_FORMATS = {"day": "%Y-%m-%d", "month": "%Y-%m"}
+
+
+def date_field(label):
+    return DATE_FIELDS.get(label, "created_at")
+
+
+def iter_records(
+    label, after_pk=0, since=None, batch_size=1000, by_date=False
+):
+    """
+    Записи модели в формате фикстуры по возрастанию первичного ключа,
+    а с by_date — по (дата, ключ). Каждая порция — отдельный короткий
+    запрос по ключу после последней выгруженной записи, а не один
+    открытый курсор: в SQLite без WAL читающий курсор не дал бы сайту
+    записывать всё время выгрузки. after_pk — последний уже выгруженный
+    ключ, since — дата или момент, с которого выгружаются записи.
+    """
+    model = apps.get_model(label)
+    excluded = EXCLUDED_FIELDS.get(label, set())
+    fields = [
+        field
+        for field in model._meta.concrete_fields
+        if not field.primary_key and field.name not in excluded
+    ]
+    names = [field.name for field in fields]
+    moment_field = date_field(label)
+    queryset = (
+        model._base_manager.filter(pk__gt=after_pk)
+        .order_by(*((moment_field, "pk") if by_date else ("pk",)))
+        .values_list("pk", *(field.attname for field in fields))
+    )
+    if since is not None:
+        if not isinstance(since, datetime):
+            since = timezone.make_aware(datetime.combine(since, time()))
+        queryset = queryset.filter(**{f"{moment_field}__gte": since})
+    batch = queryset
+    while True:
+        rows = list(batch[:batch_size])
+        if not rows:
+            return
+        for pk, *values in rows:
+            fields = dict(zip(names, values))
+            yield {"model": label, "pk": pk, "fields": fields}
+        last_pk = rows[-1][0]
+        if by_date:
+            moment = fields[moment_field]
+            batch = queryset.filter(
+                Q(**{f"{moment_field}__gt": moment})
+                | Q(**{moment_field: moment, "pk__gt": last_pk})
+            )
+        else:
+            batch = queryset.filter(pk__gt=last_pk)
+
+
+def to_jsonl(record):
+    return (
+        json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+    )
+
+
+def iter_gzip(lines, level=6):
+    """Сжимает строки в поток gzip по мере поступления."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for line in lines:
+        chunk = compressor.compress(line.encode())
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+def stream_export(labels, since=None, batch_size=1000):
+    """Сжатый JSONL всех записей моделей для потокового ответа."""
+    records = chain.from_iterable(
+        iter_records(label, since=since, batch_size=batch_size)
+        for label in labels
+    )
+    return iter_gzip(map(to_jsonl, records))
+
+
+class Exporter:
+    """
+    Выгрузка в каталог сжатым JSONL. Без деления по датам всё пишется
+    в один файл, который можно загрузить import_content; с shard_by
+    каждая модель пишется в свой файл, посты и комментарии — ещё и по
+    дням или месяцам. watermark — последние выгруженные ключи моделей:
+    инкрементальная выгрузка берёт только записи после них и возвращает
+    новые. Файлы появляются под итоговыми именами только целиком.
+    """
+
+    def __init__(self, directory, shard_by=None, batch_size=1000):
+        self.directory = Path(directory)
+        self.shard_by = shard_by
+        self.batch_size = batch_size
+
+    def file_name(self, label, record, stamp):
+        if self.shard_by is None:
+            return f"blogicum-{stamp}.jsonl.gz"
+        name = label.partition(".")[2]
+        if label not in SHARDED:
+            return f"{name}-{stamp}.jsonl.gz"
+        moment = record["fields"][date_field(label)]
+        period = moment.strftime(SHARD_FORMATS[self.shard_by])
+        return f"{name}-{period}-{stamp}.jsonl.gz"
+
+    def run(self, labels, stamp, watermark=None, since=None):
+        watermark = dict(watermark or {})
+        counts = {}
+        names = []
+        stream = None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        try:
+            for label in labels:
+                counts[label] = 0
+                # Посты и комментарии идут по дате, поэтому записи одного
+                # файла идут подряд и открытым держится один файл.
+                records = iter_records(
+                    label,
+                    watermark.get(label, 0),
+                    since,
+                    self.batch_size,
+                    by_date=self.shard_by is not None and label in SHARDED,
+                )
+                for record in records:
+                    name = self.file_name(label, record, stamp)
+                    if not names or names[-1] != name:
+                        if stream is not None:
+                            stream.close()
+                        stream = gzip.open(
+                            self.directory / f".{name}.part",
+                            "wt",
+                            encoding="utf-8",
+                        )
+                        names.append(name)
+                    stream.write(to_jsonl(record))
+                    counts[label] += 1
+                    watermark[label] = max(
+                        watermark.get(label, 0), record["pk"]
+                    )
+        finally:
+            if stream is not None:
+                stream.close()
+        for name in names:
+            os.replace(self.directory / f".{name}.part", self.directory / name)
+        return counts, watermark, sorted(names)
@@ -0,0 +1,208 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date
+from django.utils.text import Truncator
+
+from core.cache import PAGE_CACHE
+from core.conditional import make_etag
+
+from .models import Category, Post
+
+User = get_user_model()
+
+# Столбцы, из которых строятся записи ленты; модели не создаются.
+ITEM_FIELDS = (
+    "pk",
+    "title",
+    "text",
+    "pub_date",
+    "author__username",
+    "author__first_name",
+    "author__last_name",
+    "category__title",
+)
+DESCRIPTION_WORDS = 60
+
+
+class LatestPostsFeed(Feed):
+    """
+    Лента последних опубликованных постов.
+    ETag и Last-Modified строятся одним запросом по id, времени
+    изменения и публикации постов ленты, поэтому видят изменения из
+    любого процесса, и повторный опрос читалкой заканчивается 304.
+    Переименование категории или автора меняет время изменения их
+    постов. Готовый XML кешируется по ETag.
+    """
+
+    title = "Блогикум: новые публикации"
+    description = "Последние публикации всех авторов."
+
+    def link(self):
+        return reverse("blog:index")
+
+    def get_posts(self, obj):
+        return Post.objects.published()
+
+    def items(self, obj):
+        return list(
+            self.get_posts(obj)
+            .order_by("-pub_date")
+            .values(*ITEM_FIELDS)[: settings.BLOG_FEED_ITEMS]
+        )
+
+    def item_title(self, item):
+        return item["title"]
+
+    def item_description(self, item):
+        return Truncator(item["text"]).words(DESCRIPTION_WORDS)
+
+    def item_link(self, item):
+        return reverse("blog:post_detail", args=[item["pk"]])
+
+    def item_guid(self, item):
+        return self.item_link(item)
+
+    def item_pubdate(self, item):
+        return item["pub_date"]
+
+    def item_author_name(self, item):
+        names = (item["author__first_name"], item["author__last_name"])
+        full_name = " ".join(filter(None, names))
+        return full_name or item["author__username"]
+
+    def item_categories(self, item):
+        return (item["category__title"],)
+
+    def get_validators(self, request, *args, **kwargs):
+        """Возвращает пару (etag, last_modified) для ленты; last_modified
+        — timestamp в секундах.
+        """
+        obj = self.get_object(request, *args, **kwargs)
+        rows = list(
+            self.get_posts(obj)
+            .order_by("-pub_date")
+            .values_list("pk", "updated_at", "pub_date")[
+                : settings.BLOG_FEED_ITEMS
+            ]
+        )
+        etag = make_etag(
+            request.path,
+            *(
+                (pk, updated_at.isoformat(), pub_date.isoformat())
+                for pk, updated_at, pub_date in rows
+            ),
+        )
+        last_modified = max(
+            (
+                int(moment.timestamp())
+                for _, *moments in rows
+                for moment in moments
+            ),
+            default=0,
+        )
+        return etag, last_modified
+
+    def __call__(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request, *args, **kwargs)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.cached_feed(request, etag, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def cached_feed(self, request, etag, *args, **kwargs):
+        timeout = settings.BLOG_FEED_CACHE_TIMEOUT
+        if not timeout:
+            return super().__call__(request, *args, **kwargs)
+        cache = caches[PAGE_CACHE]
+        key = "feed:" + etag.strip('"')
+        entry = cache.get(key)
+        if entry is not None:
+            return HttpResponse(
+                entry["content"], content_type=entry["content_type"]
+            )
+        response = super().__call__(request, *args, **kwargs)
+        cache.set(
+            key,
+            {
+                "content": response.content,
+                "content_type": response["Content-Type"],
+            },
+            timeout,
+        )
+        return response
+
+
+class CategoryPostFeed(LatestPostsFeed):
+    """Лента опубликованных постов категории."""
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category.objects.only("title", "slug", "description"),
+            slug=category_slug,
+            is_published=True,
+        )
+
+    def title(self, obj):
+        return f"Блогикум: {obj.title}"
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse("blog:category_posts", args=[obj.slug])
+
+    def get_posts(self, obj):
+        return Post.objects.published().filter(category=obj)
+
+
+class AuthorPostFeed(LatestPostsFeed):
+    """Лента опубликованных постов автора."""
+
+    def get_object(self, request, username):
+        return get_object_or_404(
+            User.objects.only("username", "first_name", "last_name"),
+            username=username,
+        )
+
+    def title(self, obj):
+        return f"Блогикум: {obj.get_full_name() or obj.username}"
+
+    def description(self, obj):
+        return f"Публикации пользователя {obj.username}."
+
+    def link(self, obj):
+        return reverse("blog:profile", args=[obj.username])
+
+    def get_posts(self, obj):
+        return Post.objects.published().filter(author=obj)
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr("description", obj)
+
+
+class LatestPostsAtomFeed(AtomFeedMixin, LatestPostsFeed):
+    pass
+
+
+class CategoryPostAtomFeed(AtomFeedMixin, CategoryPostFeed):
+    pass
+
+
+class AuthorPostAtomFeed(AtomFeedMixin, AuthorPostFeed):
+    pass
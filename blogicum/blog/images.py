@@ -0,0 +1,58 @@
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+# Наибольшая ширина каждой уменьшенной копии. Карточка занимает 40rem,
+# поэтому medium покрывает её и на экранах с двойной плотностью.
+RENDITION_WIDTHS = {"thumb": 320, "medium": 800}
+# Формат Pillow, расширение файла и параметры сохранения.
+RENDITION_FORMATS = {
+    "jpeg": ("JPEG", "jpg", {"quality": 82, "optimize": True,
+                             "progressive": True}),
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+}
+
+
+def rendition_name(name, label, extension):
+    """Имя копии рядом с оригиналом: blog/photo.png → blog/photo_thumb.jpg."""
+    stem = posixpath.splitext(name)[0]
+    return f"{stem}_{label}.{extension}"
+
+
+def _open_rgb(name, storage):
+    with storage.open(name) as file:
+        image = Image.open(file)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def build_renditions(name, storage=default_storage):
+    """
+    Сохраняет рядом с оригиналом уменьшенные копии во всех форматах и
+    возвращает их описание для Post.image_renditions. Картинки меньше
+    заданной ширины не увеличиваются.
+    """
+    original = _open_rgb(name, storage)
+    renditions = {"source": name}
+    for label, width in RENDITION_WIDTHS.items():
+        image = original.copy()
+        image.thumbnail((width, width * 2), Image.Resampling.LANCZOS)
+        entry = {"width": image.width}
+        for key, (fmt, extension, options) in RENDITION_FORMATS.items():
+            buffer = BytesIO()
+            image.save(buffer, fmt, **options)
+            target = rendition_name(name, label, extension)
+            if storage.exists(target):
+                storage.delete(target)
+            entry[key] = storage.save(target, ContentFile(buffer.getvalue()))
+        renditions[label] = entry
+    return renditions
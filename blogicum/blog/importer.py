@@ -0,0 +1,237 @@
+import gzip
+import json
+import re
+from collections import Counter
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management import call_command
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core.cache import GLOBAL_TAG, purge_page_tags
+
+from .publication import rebuild_live_flags
+
+# Модели в порядке зависимостей: каждый уровень ссылается только на
+# предыдущие. Файл читается по разу на уровень, поэтому записи в нём
+# могут идти в любом порядке.
+LEVELS = (
+    ("users.user",),
+    ("blog.category", "blog.location"),
+    ("blog.post",),
+    ("blog.comment",),
+)
+# Уже существующие записи узнаются по естественному ключу и не
+# дублируются.
+NATURAL_KEYS = {"users.user": "username", "blog.category": "slug"}
+CHUNK_SIZE = 1 << 16
+
+_SEPARATOR_RE = re.compile(r"[\s,]*")
+
+
+def _open(path):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def _iter_array(stream):
+    """Элементы JSON-массива по одному, без чтения файла целиком."""
+    decoder = json.JSONDecoder()
+    buffer, position, eof = stream.read(CHUNK_SIZE).lstrip(), 1, False
+    while True:
+        position = _SEPARATOR_RE.match(buffer, position).end()
+        if position < len(buffer):
+            if buffer[position] == "]":
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Элемент ещё не дочитан.
+                if eof:
+                    raise
+            else:
+                yield item
+                continue
+        elif eof:
+            raise ValueError("Массив JSON не закрыт.")
+        chunk = stream.read(CHUNK_SIZE)
+        eof = not chunk
+        buffer, position = buffer[position:] + chunk, 0
+
+
+def iter_records(path):
+    """
+    Записи фикстуры из файла: JSON-массив в формате dumpdata или JSONL
+    по записи на строку, в том числе сжатые gzip (.gz).
+    """
+    with _open(path) as stream:
+        head = stream.read(CHUNK_SIZE).lstrip()
+        stream.seek(0)
+        if head.startswith("["):
+            yield from _iter_array(stream)
+            return
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+@contextmanager
+def preserve_timestamps(models):
+    """
+    bulk_create заполняет поля auto_now и auto_now_add текущим временем;
+    на время импорта они сохраняют значения из файла, как loaddata.
+    Возвращает эти поля: отсутствующие в файле значения заполняет
+    Importer.
+    """
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False)
+        or getattr(field, "auto_now_add", False)
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield fields
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Importer:
+    """
+    Потоковый импорт фикстур: записи читаются по одной и пишутся
+    bulk_create порциями по batch_size, каждая порция в своей
+    транзакции. Первичные ключи выдаются заново подряд после
+    существующих, в памяти держится только соответствие старых ключей
+    новым для моделей, на которые ссылаются другие. Сигналы не
+    отправляются: производные данные пересчитывает rebuild_derived().
+    """
+
+    def __init__(self, batch_size=1000, progress=None):
+        self.batch_size = batch_size
+        self.progress = progress or (lambda label, stats: None)
+        self.maps = {}
+        self.stats = Counter()
+
+    def run(self, path):
+        labels = [label for level in LEVELS for label in level]
+        with preserve_timestamps(map(apps.get_model, labels)) as fields:
+            self.stamped = fields
+            for level in LEVELS:
+                self.import_level(path, level)
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), map(apps.get_model, labels)
+            ):
+                cursor.execute(sql)
+        return self.stats
+
+    def import_level(self, path, labels):
+        batches = {label: [] for label in labels}
+        self.next_pk = {}
+        for label in labels:
+            self.maps.setdefault(label, {})
+            model = apps.get_model(label)
+            self.next_pk[label] = (
+                model.objects.aggregate(last=Max("pk"))["last"] or 0
+            ) + 1
+        for record in iter_records(path):
+            label = record.get("model", "").lower()
+            if label not in batches:
+                continue
+            batches[label].append(record)
+            if len(batches[label]) >= self.batch_size:
+                self.flush(label, batches[label])
+                batches[label] = []
+        for label, records in batches.items():
+            if records:
+                self.flush(label, records)
+
+    def build(self, model, record):
+        """Объект модели из записи или None, если нет обязательной связи."""
+        obj = model()
+        for name, value in record.get("fields", {}).items():
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.many_to_many or not field.concrete:
+                continue
+            if field.is_relation:
+                target = field.related_model._meta.label_lower
+                value = self.maps.get(target, {}).get(value)
+                if value is None and not field.null:
+                    return None
+                setattr(obj, field.attname, value)
+            else:
+                setattr(obj, field.attname, field.to_python(value))
+        for field in self.stamped:
+            if field.model is model and getattr(obj, field.attname) is None:
+                setattr(obj, field.attname, timezone.now())
+        return obj
+
+    def flush(self, label, records):
+        model = apps.get_model(label)
+        key = NATURAL_KEYS.get(label)
+        # На комментарии никто не ссылается: их ключи не запоминаются,
+        # и миллион комментариев не растит память.
+        pk_map = self.maps[label] if label not in LEVELS[-1] else {}
+        objs = []
+        for record in records:
+            obj = self.build(model, record)
+            if obj is None:
+                self.stats[f"{label}:orphaned"] += 1
+                continue
+            natural = getattr(obj, key) if key else None
+            objs.append((record.get("pk"), natural, obj))
+        with transaction.atomic():
+            existing = {}
+            if key:
+                existing = dict(
+                    model.objects.filter(
+                        **{f"{key}__in": [natural for _, natural, _ in objs]}
+                    ).values_list(key, "pk")
+                )
+            new = []
+            for old_pk, natural, obj in objs:
+                if natural in existing:
+                    pk_map[old_pk] = existing[natural]
+                    self.stats[f"{label}:existing"] += 1
+                    continue
+                obj.pk = self.next_pk[label]
+                self.next_pk[label] += 1
+                if natural is not None:
+                    existing[natural] = obj.pk
+                new.append(obj)
+                if old_pk is not None:
+                    pk_map[old_pk] = obj.pk
+            model.objects.bulk_create(new)
+        self.stats[label] += len(new)
+        self.progress(label, self.stats)
+
+
+def import_fixture(path, batch_size=1000, progress=None):
+    """Импортирует фикстуру и возвращает счётчики по моделям."""
+    return Importer(batch_size, progress).run(path)
+
+
+def rebuild_derived(stdout=None):
+    """
+    Пересчитывает то, что при обычном сохранении поддерживают сигналы:
+    флаги публикации, счётчики комментариев, сводки, поисковый индекс,
+    и сбрасывает кеш страниц.
+    """
+    rebuild_live_flags()
+    for command in ("recount_comments", "rebuild_stats",
+                    "rebuild_search_index"):
+        call_command(command, stdout=stdout)
+    purge_page_tags(GLOBAL_TAG)
@@ -0,0 +1,146 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from blog import benchmark
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет отдельную базу постами и комментариями, запрашивает "
+        "все маршруты blog, pages и api и сравнивает число запросов к БД, "
+        "время ответа и память с базовой линией."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=100_000)
+        parser.add_argument("--comments", type=int, default=1_000_000)
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="Сколько раз запрашивается каждый маршрут для p50/p95.",
+        )
+        parser.add_argument(
+            "--warm",
+            action="store_true",
+            help="Не очищать кеши между запросами.",
+        )
+        parser.add_argument(
+            "--database",
+            default=str(
+                Path(tempfile.gettempdir()) / "blogicum_benchmark.sqlite3"
+            ),
+            help="Файл базы бенчмарка.",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Не удалять базу после прогона и не заполнять её заново.",
+        )
+        parser.add_argument(
+            "--baseline",
+            default=str(settings.BASE_DIR / "benchmarks" / "baseline.json"),
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Записать результаты прогона как новую базовую линию.",
+        )
+        parser.add_argument(
+            "--latency-tolerance",
+            type=float,
+            default=benchmark.LATENCY_TOLERANCE,
+        )
+        parser.add_argument(
+            "--memory-tolerance",
+            type=float,
+            default=benchmark.MEMORY_TOLERANCE,
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        connection.settings_dict["TEST"]["NAME"] = options["database"]
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"]
+        )
+        try:
+            # Проверка отложенных публикаций срабатывает на случайном
+            # запросе и сбивала бы число запросов.
+            with override_settings(BLOG_PUBLICATION_CHECK_INTERVAL=None):
+                if not Post.objects.exists():
+                    self.stdout.write("Заполнение базы…")
+                    benchmark.seed(options["posts"], options["comments"])
+                results = benchmark.run(
+                    options["iterations"], warm=options["warm"]
+                )
+                volumes = benchmark.volumes()
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+
+        self.print_results(results)
+        path = Path(options["baseline"])
+        if options["update_baseline"]:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(
+                json.dumps(
+                    {"volumes": volumes, "results": results},
+                    ensure_ascii=False,
+                    indent=2,
+                    sort_keys=True,
+                )
+                + "\n",
+                encoding="utf-8",
+            )
+            self.stdout.write(self.style.SUCCESS(f"Записано в {path}"))
+            return
+        if not path.exists():
+            raise CommandError(
+                f"Нет базовой линии {path}, запустите с --update-baseline."
+            )
+        baseline = json.loads(path.read_text(encoding="utf-8"))
+        timings = baseline["volumes"] == volumes
+        if not timings:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Объёмы данных отличаются от базовой линии, "
+                    "сравнивается только число запросов."
+                )
+            )
+        regressions = benchmark.compare(
+            results,
+            baseline["results"],
+            latency_tolerance=options["latency_tolerance"],
+            memory_tolerance=options["memory_tolerance"],
+            timings=timings,
+        )
+        if regressions:
+            raise CommandError(
+                "Регрессии производительности:\n" + "\n".join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS("Регрессий нет."))
+
+    def print_results(self, results):
+        self.stdout.write(
+            f"{'маршрут':<40} {'код':>4} {'запр.':>6} "
+            f"{'p50 мс':>8} {'p95 мс':>8} {'КиБ':>8}"
+        )
+        for key, row in sorted(results.items()):
+            self.stdout.write(
+                f"{key:<40} {row['status']:>4} {row['queries']:>6} "
+                f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+                f"{row['peak_kib']:>8.0f}"
+            )
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.tasks import generate_post_renditions
+
+
+class Command(BaseCommand):
+    help = (
+        "Строит уменьшенные копии фото постов, у которых их нет или они "
+        "устарели."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Перестроить копии всех фото, а не только недостающие.",
+        )
+
+    def handle(self, *args, **options):
+        rows = (
+            Post.objects.exclude(image="")
+            .exclude(image__isnull=True)
+            .order_by("pk")
+            .values_list("pk", "image", "image_renditions")
+        )
+        built = failed = 0
+        for post_id, image, renditions in rows.iterator():
+            if not options["all"] and renditions.get("source") == image:
+                continue
+            try:
+                ok = generate_post_renditions(post_id, force=options["all"])
+            except OSError as error:
+                self.stderr.write(f"{image}: {error}")
+                ok = False
+            if ok:
+                built += 1
+            else:
+                failed += 1
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Построено копий: {built}, не удалось: {failed}"
+            )
+        )
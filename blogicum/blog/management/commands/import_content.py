@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.importer import import_fixture, rebuild_derived
+
+
+class Command(BaseCommand):
+    help = (
+        "Потоково импортирует пользователей, категории, местоположения, "
+        "посты и комментарии из фикстуры JSON или JSONL (можно .gz)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл фикстуры.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Количество записей в одной транзакции.",
+        )
+        parser.add_argument(
+            "--skip-rebuild",
+            action="store_true",
+            help="Не пересчитывать производные данные после импорта.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        def progress(label, stats):
+            rate = stats[label] / max(time.monotonic() - started, 1e-3)
+            self.stdout.write(f"{label}: {stats[label]} ({rate:.0f}/с)")
+
+        try:
+            stats = import_fixture(
+                options["path"], options["batch_size"], progress
+            )
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Не удалось прочитать фикстуру: {error}")
+        if not options["skip_rebuild"]:
+            rebuild_derived(self.stdout)
+        for label, count in sorted(stats.items()):
+            self.stdout.write(f"  {label}: {count}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Импорт завершён за {time.monotonic() - started:.1f} с"
+            )
+        )
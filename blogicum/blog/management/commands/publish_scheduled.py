@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.publication import publish_due_posts, rebuild_live_flags
+
+
+class Command(BaseCommand):
+    help = "Публикует отложенные посты, время которых наступило."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Работать непрерывно, проверяя очередь раз в указанное "
+            "число секунд.",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Пересчитать флаг is_live у всех постов.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            shown, hidden = rebuild_live_flags()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Показано постов: {shown}, скрыто: {hidden}"
+                )
+            )
+            return
+        while True:
+            post_ids = publish_due_posts()
+            if post_ids:
+                self.stdout.write(f"Опубликовано постов: {len(post_ids)}")
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import rebuild_index, use_fts
+
+
+class Command(BaseCommand):
+    help = "Строит поисковый индекс постов заново."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Количество постов, индексируемых за один проход.",
+        )
+
+    def handle(self, *args, **options):
+        total = rebuild_index(batch_size=options["batch_size"])
+        backend = "FTS5" if use_fts() else "обратный индекс"
+        self.stdout.write(
+            self.style.SUCCESS(f"Проиндексировано постов: {total} ({backend})")
+        )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from blog.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает сводную статистику авторов и категорий."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Количество авторов или категорий за один проход.",
+        )
+
+    def handle(self, *args, **options):
+        authors, categories = rebuild_stats(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Пересчитано авторов: {authors}, категорий: {categories}"
+            )
+        )
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает денормализованный счётчик комментариев постов."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Количество постов, обрабатываемых за одну транзакцию.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        post_ids = Post.objects.order_by("pk").values_list("pk", flat=True)
+        last_pk, fixed = 0, 0
+        while True:
+            batch = list(post_ids.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1]
+            counts = dict(
+                Comment.objects.filter(post_id__in=batch)
+                .values_list("post_id")
+                .annotate(total=Count("pk"))
+                .order_by()
+            )
+            with transaction.atomic():
+                stale = [
+                    post
+                    for post in Post.objects.filter(pk__in=batch).only(
+                        "pk", "comment_count"
+                    )
+                    if post.comment_count != counts.get(post.pk, 0)
+                ]
+                for post in stale:
+                    post.comment_count = counts.get(post.pk, 0)
+                Post.objects.bulk_update(stale, ["comment_count"])
+            fixed += len(stale)
+        self.stdout.write(
+            self.style.SUCCESS(f"Исправлено счётчиков комментариев: {fixed}")
+        )
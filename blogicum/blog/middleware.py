@@ -0,0 +1,47 @@
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .publication import next_publication_time, publish_due_posts
+
+
+class ScheduledPublicationMiddleware:
+    """
+    Внутрипроцессный таймер отложенных публикаций.
+    Проверка выполняется не на каждом запросе, а в момент ближайшей
+    запланированной публикации, но не реже, чем раз в
+    BLOG_PUBLICATION_CHECK_INTERVAL секунд (новые отложенные посты могут
+    появиться из других процессов). None отключает таймер: тогда посты
+    публикует команда publish_scheduled.
+    """
+
+    _lock = threading.Lock()
+    _next_check = None
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        interval = settings.BLOG_PUBLICATION_CHECK_INTERVAL
+        if interval is not None:
+            self.check(timedelta(seconds=interval))
+        return self.get_response(request)
+
+    @classmethod
+    def check(cls, interval):
+        now = timezone.now()
+        next_check = cls._next_check
+        if next_check is not None and now < next_check:
+            return
+        if not cls._lock.acquire(blocking=False):
+            return
+        try:
+            publish_due_posts(now)
+            next_due = next_publication_time()
+            cls._next_check = now + interval
+            if next_due is not None and next_due < cls._next_check:
+                cls._next_check = next_due
+        finally:
+            cls._lock.release()
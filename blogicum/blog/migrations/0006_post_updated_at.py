@@ -0,0 +1,20 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_is_live'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='Обновляется и при изменении комментариев поста.', verbose_name='Изменено'),
+            preserve_default=False,
+        ),
+    ]
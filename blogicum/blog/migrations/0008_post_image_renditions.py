@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_comment_post_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_renditions',
+            field=models.JSONField(default=dict, editable=False, help_text='Заполняется в фоне после загрузки фото.', verbose_name='Уменьшенные копии фото'),
+        ),
+    ]
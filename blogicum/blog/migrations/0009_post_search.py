@@ -0,0 +1,54 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_search_index(apps, schema_editor):
+    from blog.search import create_fts_table, write_index
+
+    Post = apps.get_model('blog', 'Post')
+    PostSearchTerm = apps.get_model('blog', 'PostSearchTerm')
+    fts = create_fts_table(schema_editor)
+    rows = Post.objects.order_by('pk').values_list(
+        'pk', 'title', 'text', 'author__username'
+    )
+    write_index(rows.iterator(), term_model=PostSearchTerm, fts=fts)
+
+
+def drop_search_index(apps, schema_editor):
+    from blog.search import FTS_TABLE
+
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField()),
+                ('post', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='blog.post')),
+            ],
+            options={
+                'verbose_name': 'термин поиска',
+                'verbose_name_plural': 'Термины поиска',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='postsearchterm',
+            index=models.Index(fields=['term', 'post', 'weight'], name='post_search_term_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='postsearchterm',
+            constraint=models.UniqueConstraint(fields=('post', 'term'), name='post_search_term_unique'),
+        ),
+        migrations.RunPython(build_search_index, drop_search_index),
+    ]
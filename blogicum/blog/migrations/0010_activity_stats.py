@@ -0,0 +1,85 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Max
+
+
+def fill_stats(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    for name, owner, post_field in (
+        ('AuthorStats', 'user', 'author'),
+        ('CategoryStats', 'category', 'category'),
+    ):
+        model = apps.get_model('blog', name)
+        posts = {
+            pk: (total, last)
+            for pk, total, last in Post.objects.filter(
+                is_live=True, **{f'{post_field}__isnull': False}
+            )
+            .values_list(post_field)
+            .annotate(total=Count('pk'), last=Max('pub_date'))
+            .order_by()
+        }
+        comments = {
+            pk: (total, last)
+            for pk, total, last in Comment.objects.filter(
+                **{f'post__{post_field}__isnull': False}
+            )
+            .values_list(f'post__{post_field}')
+            .annotate(total=Count('pk'), last=Max('created_at'))
+            .order_by()
+        }
+        rows = []
+        for pk in posts.keys() | comments.keys():
+            post_total, post_last = posts.get(pk, (0, None))
+            comment_total, comment_last = comments.get(pk, (0, None))
+            moments = [m for m in (post_last, comment_last) if m]
+            rows.append(
+                model(
+                    **{f'{owner}_id': pk},
+                    posts_published=post_total,
+                    comments_received=comment_total,
+                    last_activity_at=max(moments) if moments else None,
+                )
+            )
+        model.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('blog', '0009_post_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('posts_published', models.PositiveIntegerField(default=0, verbose_name='Опубликовано постов')),
+                ('comments_received', models.PositiveIntegerField(default=0, verbose_name='Комментариев к постам')),
+                ('last_activity_at', models.DateTimeField(blank=True, null=True, verbose_name='Последняя активность')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_stats', serialize=False, to='users.user', verbose_name='Автор')),
+            ],
+            options={
+                'verbose_name': 'статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                ('posts_published', models.PositiveIntegerField(default=0, verbose_name='Опубликовано постов')),
+                ('comments_received', models.PositiveIntegerField(default=0, verbose_name='Комментариев к постам')),
+                ('last_activity_at', models.DateTimeField(blank=True, null=True, verbose_name='Последняя активность')),
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='blog.category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'статистика категории',
+                'verbose_name_plural': 'Статистика категорий',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
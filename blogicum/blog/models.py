@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
 
 from core.models import BaseModel
 
@@ -16,6 +17,7 @@ class Category(BaseModel):
         help_text="Идентификатор страницы для URL; разрешены "
         "символы латиницы, цифры, дефис и подчёркивание.",
     )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Изменено")
 
     class Meta:
         verbose_name = "категория"
@@ -27,6 +29,7 @@ class Category(BaseModel):
 
 class Location(BaseModel):
     name = models.CharField(max_length=256, verbose_name="Название места")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Изменено")
 
     class Meta:
         verbose_name = "местоположение"
@@ -36,6 +39,59 @@ class Location(BaseModel):
         return self.name
 
 
+class PostQuerySet(models.QuerySet):
+    """Единые правила видимости и выборки публикаций."""
+
+    # Ровно те поля, что выводит includes/post_card.html.
+    LISTING_FIELDS = (
+        "id",
+        "title",
+        "text",
+        "pub_date",
+        "image",
+        "image_renditions",
+        "is_published",
+        "comment_count",
+        "updated_at",
+        "author__id",
+        "author__username",
+        "category__id",
+        "category__title",
+        "category__slug",
+        "category__is_published",
+        "location__id",
+        "location__name",
+        "location__is_published",
+    )
+
+    def published(self):
+        """Посты, видимые всем посетителям."""
+        return self.filter(is_live=True)
+
+    def visible_to(self, user):
+        """Опубликованные посты плюс все собственные посты автора."""
+        if not user.is_authenticated:
+            return self.published()
+        return self.filter(models.Q(is_live=True) | models.Q(author=user))
+
+    def due_for_publication(self, now=None):
+        """Отложенные посты, время публикации которых уже наступило."""
+        return self.filter(
+            is_live=False,
+            is_published=True,
+            category__is_published=True,
+            pub_date__lte=now or timezone.now(),
+        )
+
+    def for_listing(self):
+        """Выборка для карточек ленты: все связи одним JOIN и только
+        используемые шаблоном столбцы.
+        """
+        return self.select_related("author", "category", "location").only(
+            *self.LISTING_FIELDS
+        )
+
+
 class Post(BaseModel):
     title = models.CharField(max_length=256, verbose_name="Заголовок")
     text = models.TextField(verbose_name="Текст")
@@ -45,7 +101,10 @@ class Post(BaseModel):
         "можно делать отложенные публикации.",
     )
     author = models.ForeignKey(
-        User, on_delete=models.CASCADE, verbose_name="Автор публикации"
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Автор публикации",
+        db_index=False,
     )
     location = models.ForeignKey(
         Location,
@@ -59,6 +118,7 @@ class Post(BaseModel):
         null=True,
         verbose_name="Категория",
         related_name="posts",
+        db_index=False,
     )
     image = models.ImageField(
         verbose_name="Фото",
@@ -66,13 +126,117 @@ class Post(BaseModel):
         null=True,
         blank=True,
     )
+    image_renditions = models.JSONField(
+        default=dict,
+        editable=False,
+        verbose_name="Уменьшенные копии фото",
+        help_text="Заполняется в фоне после загрузки фото.",
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество комментариев",
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Изменено",
+        help_text="Обновляется и при изменении комментариев поста.",
+    )
+    is_live = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name="Виден в ленте",
+        help_text="Пост опубликован, его категория опубликована и время "
+        "публикации наступило. Поддерживается автоматически.",
+    )
+
+    objects = PostQuerySet.as_manager()
 
     def get_absolute_url(self):
         return reverse("blog:post_detail", kwargs={"pk": self.pk})
 
+    def _renditions(self):
+        """Копии текущего фото; копии заменённого фото не учитываются."""
+        renditions = self.image_renditions or {}
+        if not self.image or renditions.get("source") != self.image.name:
+            return []
+        return [
+            renditions[label]
+            for label in ("thumb", "medium")
+            if label in renditions
+        ]
+
+    def _srcset(self, key):
+        return ", ".join(
+            f"{self.image.storage.url(entry[key])} {entry['width']}w"
+            for entry in self._renditions()
+        )
+
+    @property
+    def image_preview_url(self):
+        """Самая лёгкая версия фото: копия thumb или оригинал."""
+        renditions = self._renditions()
+        if renditions:
+            return self.image.storage.url(renditions[0]["jpeg"])
+        return self.image.url
+
+    @property
+    def image_srcset(self):
+        return self._srcset("jpeg")
+
+    @property
+    def image_webp_srcset(self):
+        return self._srcset("webp")
+
+    def compute_is_live(self, now=None):
+        """Вычисляет значение флага is_live по текущим полям поста."""
+        return bool(
+            self.is_published
+            and self.category_id is not None
+            and self.category.is_published
+            and self.pub_date <= (now or timezone.now())
+        )
+
+    def save(self, *args, **kwargs):
+        self.is_live = self.compute_is_live()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            # updated_at — версия карточки и страниц поста.
+            kwargs["update_fields"] = {*update_fields, "is_live", "updated_at"}
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = "публикация"
         verbose_name_plural = "Публикации"
+        # Составные индексы начинаются с author/category и заменяют
+        # одиночные индексы внешних ключей. Лента фильтруется по
+        # предвычисленному is_live через частичный индекс, а отложенные
+        # посты ищет планировщик публикаций.
+        indexes = (
+            models.Index(
+                fields=("-pub_date",),
+                condition=models.Q(is_live=True),
+                name="post_live_date_idx",
+            ),
+            models.Index(
+                fields=("pub_date",),
+                condition=models.Q(is_live=False, is_published=True),
+                name="post_scheduled_date_idx",
+            ),
+            models.Index(
+                fields=("category", "-pub_date"),
+                name="post_category_date_idx",
+            ),
+            models.Index(
+                fields=("author", "-pub_date"),
+                name="post_author_date_idx",
+            ),
+            # Выгрузка по дням и месяцам идёт порциями по (created_at, id).
+            models.Index(
+                fields=("created_at", "id"),
+                name="post_created_idx",
+            ),
+        )
 
     def __str__(self):
         return self.title
@@ -84,6 +248,7 @@ class Comment(BaseModel):
         on_delete=models.CASCADE,
         verbose_name="Публикация",
         related_name="comments",
+        db_index=False,
     )
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, verbose_name="Автор комментария"
@@ -98,6 +263,105 @@ class Comment(BaseModel):
         verbose_name = "комментарий"
         verbose_name_plural = "Комментарии"
         ordering = ["created_at"]
+        # Порции комментариев поста и выгрузка по датам выбираются по
+        # (created_at, id).
+        indexes = (
+            models.Index(
+                fields=("post", "created_at", "id"),
+                name="comment_post_created_idx",
+            ),
+            models.Index(
+                fields=("created_at", "id"),
+                name="comment_created_idx",
+            ),
+        )
 
     def __str__(self):
         return self.text
+
+
+class PostSearchTerm(models.Model):
+    """
+    Запасной обратный индекс поиска для баз без FTS5: основа слова и
+    её вес в посте. Поддерживается модулем blog.search.
+    """
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="search_terms",
+        db_index=False,
+    )
+    term = models.CharField(max_length=64)
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        verbose_name = "термин поиска"
+        verbose_name_plural = "Термины поиска"
+        constraints = (
+            models.UniqueConstraint(
+                fields=("post", "term"), name="post_search_term_unique"
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=("term", "post", "weight"),
+                name="post_search_term_idx",
+            ),
+        )
+
+    def __str__(self):
+        return self.term
+
+
+class ActivityStats(models.Model):
+    """Сводка, которая выводится в шапке профиля и категории без
+    агрегирующих запросов. Поддерживается модулем blog.stats.
+    """
+
+    posts_published = models.PositiveIntegerField(
+        default=0, verbose_name="Опубликовано постов"
+    )
+    comments_received = models.PositiveIntegerField(
+        default=0, verbose_name="Комментариев к постам"
+    )
+    last_activity_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Последняя активность"
+    )
+
+    class Meta:
+        abstract = True
+
+
+class AuthorStats(ActivityStats):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="post_stats",
+        verbose_name="Автор",
+    )
+
+    class Meta:
+        verbose_name = "статистика автора"
+        verbose_name_plural = "Статистика авторов"
+
+    def __str__(self):
+        return str(self.user_id)
+
+
+class CategoryStats(ActivityStats):
+    category = models.OneToOneField(
+        Category,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name="Категория",
+    )
+
+    class Meta:
+        verbose_name = "статистика категории"
+        verbose_name_plural = "Статистика категорий"
+
+    def __str__(self):
+        return str(self.category_id)
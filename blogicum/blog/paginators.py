@@ -0,0 +1,201 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.paginator import EmptyPage, Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from core.cache import PAGE_CACHE
+
+NEXT = "n"
+PREVIOUS = "p"
+# Страница, начинающаяся с самой записи курсора включительно.
+START = "s"
+
+
+def _field(obj, name):
+    """Значение поля записи: модели или словаря из values()."""
+    if isinstance(obj, dict):
+        return obj["id" if name == "pk" else name]
+    return getattr(obj, name)
+
+
+class CursorPage:
+    """Страница keyset-пагинации: без номера страницы и общего числа
+    записей, только ссылки вперёд и назад.
+    """
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Пагинатор по ключу (date_field, id) вместо OFFSET.
+    Записями могут быть и словари из values() с ключами id и date_field.
+    Каждая страница выбирается по индексу с условием «строго после
+    курсора», поэтому глубокие страницы стоят столько же, сколько
+    первая, а COUNT(*) не выполняется вовсе. По умолчанию — от новых
+    записей к старым, descending=False — в хронологическом порядке.
+    """
+
+    is_keyset = True
+
+    def __init__(
+        self, queryset, per_page, date_field="pub_date", descending=True
+    ):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.date_field = date_field
+        self.descending = descending
+
+    def encode_cursor(self, direction, obj):
+        """Собирает непрозрачный токен курсора для записи obj."""
+        payload = json.dumps(
+            [
+                direction,
+                _field(obj, self.date_field).isoformat(),
+                _field(obj, "pk"),
+            ],
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def cursor_at(self, obj):
+        """Курсор страницы, которая начинается с записи obj."""
+        return self.encode_cursor(START, obj)
+
+    @staticmethod
+    def decode_cursor(token):
+        """Разбирает токен курсора, при ошибке отдаёт 404."""
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            direction, moment, pk = json.loads(
+                base64.urlsafe_b64decode(padded.encode())
+            )
+            moment = parse_datetime(moment)
+            if direction not in (NEXT, PREVIOUS, START) or moment is None:
+                raise ValueError
+            return direction, moment, int(pk)
+        except (ValueError, TypeError):
+            raise Http404("Некорректный курсор страницы.")
+
+    def page(self, cursor=None):
+        """Возвращает страницу после (или до) указанного курсора."""
+        queryset = self.queryset
+        direction = NEXT
+        forward = "lt" if self.descending else "gt"
+        backward = "gt" if self.descending else "lt"
+        if cursor:
+            direction, moment, pk = self.decode_cursor(cursor)
+            lookup = backward if direction == PREVIOUS else forward
+            pk_lookup = f"{lookup}e" if direction == START else lookup
+            queryset = queryset.filter(
+                Q(**{f"{self.date_field}__{lookup}": moment})
+                | Q(**{self.date_field: moment, f"pk__{pk_lookup}": pk})
+            )
+        ordering = (self.date_field, "pk")
+        if (direction != PREVIOUS) == self.descending:
+            ordering = tuple(f"-{field}" for field in ordering)
+        queryset = queryset.order_by(*ordering)
+
+        rows = list(queryset[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if direction == PREVIOUS:
+            rows.reverse()
+
+        if not rows:
+            return CursorPage(rows, self, None, None)
+        if direction != PREVIOUS:
+            has_next, has_previous = has_more, bool(cursor)
+        else:
+            has_next, has_previous = True, has_more
+        return CursorPage(
+            rows,
+            self,
+            self.encode_cursor(NEXT, rows[-1]) if has_next else None,
+            self.encode_cursor(PREVIOUS, rows[0]) if has_previous else None,
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Постраничный пагинатор, который берёт общее число записей из кеша
+    страниц по ключу count_key и выполняет COUNT(*) только при промахе.
+    Сбрасывать счётчик — забота того, кто строит ключ, но сбросы
+    сигналами видны только в своём процессе. Поэтому счётчик живёт
+    BLOG_COUNT_CACHE_TIMEOUT секунд, а последняя страница сверяет его с
+    выбранными записями и при расхождении пересчитывает: устаревший
+    счётчик не обрезает ленту.
+    """
+
+    def __init__(self, *args, count_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return Paginator.count.func(self)
+        count = caches[PAGE_CACHE].get(self.count_key)
+        if count is None:
+            count = self.recount()
+        return count
+
+    def recount(self):
+        """Считает записи заново и обновляет кеш."""
+        count = Paginator.count.func(self)
+        caches[PAGE_CACHE].set(
+            self.count_key, count, settings.BLOG_COUNT_CACHE_TIMEOUT
+        )
+        self.__dict__["count"] = count
+        self.__dict__.pop("num_pages", None)
+        return count
+
+    def page(self, number):
+        if self.count_key is None:
+            return super().page(number)
+        try:
+            page = super().page(number)
+        except EmptyPage:
+            # Записей могло стать больше, чем в кеше.
+            self.recount()
+            return super().page(number)
+        if page.number < self.num_pages:
+            return page
+        # Последняя страница выбирается с запасом в одну запись: так
+        # видно, сходится ли счётчик, без отдельного COUNT(*).
+        bottom = (page.number - 1) * self.per_page
+        rows = list(
+            self.object_list[bottom:bottom + self.per_page + self.orphans + 1]
+        )
+        if bottom + len(rows) == self.count:
+            return self._get_page(rows, page.number, self)
+        self.recount()
+        return super().page(number)
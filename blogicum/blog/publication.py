@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.db.models import Min
+from django.dispatch import Signal
+from django.utils import timezone
+
+from core.writes import serialized_write
+
+from .models import Post
+
+# Отправляется с аргументом post_ids, когда отложенные посты попадают
+# в ленту: по нему сбрасываются кеши страниц.
+posts_went_live = Signal()
+
+
+@serialized_write
+def publish_due_posts(now=None):
+    """Переводит в ленту посты, время публикации которых наступило.
+    Возвращает список их id.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        post_ids = list(
+            Post.objects.due_for_publication(now).values_list("pk", flat=True)
+        )
+        if post_ids:
+            Post.objects.filter(pk__in=post_ids).update(
+                is_live=True, updated_at=now
+            )
+    if post_ids:
+        posts_went_live.send(sender=Post, post_ids=post_ids)
+    return post_ids
+
+
+def next_publication_time():
+    """Время ближайшей отложенной публикации или None."""
+    return Post.objects.filter(
+        is_live=False, is_published=True, category__is_published=True
+    ).aggregate(next_due=Min("pub_date"))["next_due"]
+
+
+def sync_category_posts(category):
+    """Пересчитывает is_live у постов категории после её изменения."""
+    now = timezone.now()
+    posts = Post.objects.filter(category=category)
+    if category.is_published:
+        posts.filter(
+            is_live=False, is_published=True, pub_date__lte=now
+        ).update(is_live=True, updated_at=now)
+    else:
+        posts.filter(is_live=True).update(is_live=False, updated_at=now)
+
+
+def rebuild_live_flags():
+    """Полностью пересчитывает is_live по всем постам."""
+    now = timezone.now()
+    with transaction.atomic():
+        hidden = Post.objects.filter(is_live=True).exclude(
+            is_published=True,
+            category__is_published=True,
+            pub_date__lte=now,
+        ).update(is_live=False, updated_at=now)
+        shown = Post.objects.due_for_publication(now).update(
+            is_live=True, updated_at=now
+        )
+    return shown, hidden
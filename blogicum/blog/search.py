@@ -0,0 +1,193 @@
+import re
+import threading
+from collections import Counter
+
+import snowballstemmer
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Count, OuterRef, Subquery, Sum
+
+from .models import Post, PostSearchTerm
+
+# Виртуальная таблица FTS5 с основами слов постов, rowid — id поста.
+FTS_TABLE = "blog_post_search"
+# Вес совпадения в заголовке, тексте и имени автора; порядок совпадает
+# со столбцами FTS_TABLE.
+FIELD_WEIGHTS = {"title": 10, "text": 1, "author": 3}
+MAX_QUERY_TERMS = 8
+MAX_TERM_LENGTH = 64
+
+_WORD_RE = re.compile(r"\w+")
+_CYRILLIC_RE = re.compile("[а-я]")
+# Стеммеры snowballstemmer хранят кеш и не потокобезопасны.
+_local = threading.local()
+# Есть ли таблица FTS5 в базе, по псевдониму соединения. Схема меняется
+# только миграциями, после которых кеш сбрасывается.
+_fts_tables = {}
+
+
+def _stem(word):
+    if not hasattr(_local, "russian"):
+        _local.russian = snowballstemmer.stemmer("russian")
+        _local.english = snowballstemmer.stemmer("english")
+    stemmer = _local.russian if _CYRILLIC_RE.search(word) else _local.english
+    return stemmer.stemWord(word)
+
+
+def tokenize(text):
+    """Основы слов текста: «Котики гуляли» → ['котик', 'гуля']."""
+    words = _WORD_RE.findall(text.lower().replace("ё", "е"))
+    return [_stem(word)[:MAX_TERM_LENGTH] for word in words]
+
+
+def create_fts_table(schema_editor):
+    """Создаёт таблицу FTS5, если база её поддерживает. Возвращает
+    True, если таблица создана.
+    """
+    if schema_editor.connection.vendor != "sqlite":
+        return False
+    columns = ", ".join(FIELD_WEIGHTS)
+    try:
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            f"USING fts5({columns}, tokenize='unicode61')"
+        )
+    except Exception:
+        # SQLite собран без FTS5: работает запасной индекс.
+        return False
+    return True
+
+
+def _fts_table_exists(alias):
+    if alias not in _fts_tables:
+        _fts_tables[alias] = (
+            FTS_TABLE in connections[alias].introspection.table_names()
+        )
+    return _fts_tables[alias]
+
+
+def forget_fts_tables():
+    _fts_tables.clear()
+
+
+def use_fts():
+    """Выбирает индекс по BLOG_SEARCH_BACKEND: fts5, python или auto —
+    FTS5, если таблица для неё создана миграцией.
+    """
+    backend = settings.BLOG_SEARCH_BACKEND
+    if backend == "auto":
+        return _fts_table_exists(connection.alias)
+    return backend == "fts5"
+
+
+def write_index(rows, term_model=PostSearchTerm, fts=None):
+    """
+    Перестраивает записи индекса для строк (id, title, text, username).
+    term_model передаётся из миграций, где доступны только исторические
+    модели.
+    """
+    rows = list(rows)
+    post_ids = [row[0] for row in rows]
+    fts = use_fts() if fts is None else fts
+    if fts:
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+                [(post_id,) for post_id in post_ids],
+            )
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} "
+                f"(rowid, {', '.join(FIELD_WEIGHTS)}) "
+                f"VALUES (%s, {', '.join(['%s'] * len(FIELD_WEIGHTS))})",
+                [
+                    (row[0], *(" ".join(tokenize(value or ""))
+                               for value in row[1:]))
+                    for row in rows
+                ],
+            )
+        return
+    term_model.objects.filter(post_id__in=post_ids).delete()
+    terms = []
+    for post_id, *values in rows:
+        weights = Counter()
+        for weight, value in zip(FIELD_WEIGHTS.values(), values):
+            for term in tokenize(value or ""):
+                weights[term] += weight
+        terms.extend(
+            term_model(post_id=post_id, term=term, weight=weight)
+            for term, weight in weights.items()
+        )
+    term_model.objects.bulk_create(terms, batch_size=500)
+
+
+def _index_rows(queryset):
+    return queryset.values_list("pk", "title", "text", "author__username")
+
+
+def index_posts(post_ids):
+    """Переиндексирует указанные посты."""
+    write_index(_index_rows(Post.objects.filter(pk__in=post_ids)))
+
+
+def unindex_post(post_id):
+    """Убирает пост из индекса FTS5; запасной индекс чистится каскадом."""
+    if use_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post_id]
+            )
+
+
+def rebuild_index(batch_size=500):
+    """Строит индекс заново по всем постам. Возвращает их число."""
+    if use_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    else:
+        PostSearchTerm.objects.all().delete()
+    rows = _index_rows(Post.objects.order_by("pk"))
+    last_pk, total = 0, 0
+    while True:
+        batch = list(rows.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return total
+        write_index(batch)
+        last_pk = batch[-1][0]
+        total += len(batch)
+
+
+def search_posts(queryset, query):
+    """
+    Сужает выборку постов до найденных по запросу и сортирует их по
+    релевантности, затем по дате. Должны совпасть все слова запроса.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return queryset.none()
+    if use_fts():
+        # Основы — это \w+, кавычки внутри них невозможны.
+        match = " ".join(f'"{term}"' for term in terms)
+        weights = ", ".join(str(weight) for weight in FIELD_WEIGHTS.values())
+        table = Post._meta.db_table
+        # bm25 тем меньше, чем выше релевантность.
+        return queryset.extra(
+            select={"search_rank": f"-bm25({FTS_TABLE}, {weights})"},
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = {table}.id", f"{FTS_TABLE} MATCH %s"],
+            params=[match],
+        ).order_by("-search_rank", "-pub_date")
+    matches = (
+        PostSearchTerm.objects.filter(term__in=terms)
+        .values("post")
+        .annotate(found=Count("term"), score=Sum("weight"))
+        .filter(found=len(terms))
+    )
+    return (
+        queryset.filter(pk__in=matches.values("post"))
+        .annotate(
+            search_rank=Subquery(
+                matches.filter(post=OuterRef("pk")).values("score")[:1]
+            )
+        )
+        .order_by("-search_rank", "-pub_date")
+    )
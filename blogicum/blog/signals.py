@@ -0,0 +1,328 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.cache import GLOBAL_TAG, purge_page_tags
+
+from .cache import touch_posts
+from .tasks import generate_post_renditions, renditions_ready
+from .models import Category, Comment, Location, Post
+from .publication import posts_went_live, sync_category_posts
+from .search import forget_fts_tables, index_posts, unindex_post
+from .stats import adjust_stats, refresh_stats
+
+User = get_user_model()
+
+# Посты, которые сейчас удаляются в этом потоке: сигналы их каскадно
+# удаляемых комментариев ничего не делают, всё учтено одним разом.
+_deleting = threading.local()
+
+
+def _deleting_post_ids():
+    if not hasattr(_deleting, "post_ids"):
+        _deleting.post_ids = set()
+    return _deleting.post_ids
+
+
+def post_is_deleted(post_id):
+    return post_id in _deleting_post_ids()
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    """Увеличивает счётчик комментариев поста одним UPDATE и отмечает
+    пост изменённым: новое время изменения обновляет его карточку.
+    """
+    posts = Post.objects.filter(pk=instance.post_id)
+    if created:
+        posts.update(
+            comment_count=F("comment_count") + 1, updated_at=timezone.now()
+        )
+    else:
+        posts.update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Уменьшает счётчик комментариев поста, в том числе при каскадном
+    удалении комментариев вместе с автором.
+    """
+    if post_is_deleted(instance.post_id):
+        return
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F("comment_count") - 1, updated_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Category)
+def sync_category_live_posts(sender, instance, **kwargs):
+    """Показывает или скрывает посты категории при смене её статуса."""
+    sync_category_posts(instance)
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    """Посты удалённой категории теряют категорию и уходят из ленты."""
+    posts = Post.objects.filter(category=instance, is_live=True)
+    author_ids = set(posts.values_list("author_id", flat=True))
+    posts.update(is_live=False, updated_at=timezone.now())
+    refresh_stats(author_ids=author_ids)
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_stats(sender, instance, **kwargs):
+    """Смена статуса категории показывает или скрывает её посты."""
+    refresh_stats(
+        author_ids=Post.objects.filter(category=instance)
+        .values_list("author_id", flat=True)
+        .distinct(),
+        category_ids=[instance.pk],
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_stats(sender, instance, **kwargs):
+    """Запоминает, в чьих сводках пост учитывался до изменения."""
+    instance._stats_before = (
+        Post.objects.filter(pk=instance.pk)
+        .values_list("author_id", "category_id", "is_live", "comment_count")
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Post)
+def update_post_stats(sender, instance, created, **kwargs):
+    """Переносит пост и его комментарии между сводками, если сменились
+    автор, категория или видимость поста.
+    """
+    before = getattr(instance, "_stats_before", None)
+    after = (instance.author_id, instance.category_id, instance.is_live)
+    if before is not None and before[:3] == after:
+        if instance.is_live:
+            adjust_stats(*after[:2], moment=instance.pub_date)
+        return
+    if before is not None:
+        author_id, category_id, was_live, comments = before
+        adjust_stats(
+            author_id, category_id, posts=-int(was_live), comments=-comments
+        )
+    adjust_stats(
+        instance.author_id,
+        instance.category_id,
+        posts=int(instance.is_live),
+        comments=0 if before is None else before[3],
+        moment=instance.pub_date if instance.is_live else None,
+    )
+
+
+@receiver(pre_delete, sender=Post)
+def uncount_deleted_post(sender, instance, **kwargs):
+    """Вычитает пост и все его комментарии из сводок одним UPDATE на
+    сводку. Сигналы каскадно удаляемых комментариев пропускаются.
+    """
+    _deleting_post_ids().add(instance.pk)
+    adjust_stats(
+        instance.author_id,
+        instance.category_id,
+        posts=-int(instance.is_live),
+        comments=-Comment.objects.filter(post=instance).count(),
+    )
+
+
+@receiver(post_delete, sender=Post)
+def forget_deleted_post(sender, instance, **kwargs):
+    _deleting_post_ids().discard(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def count_received_comment(sender, instance, created, **kwargs):
+    if created:
+        adjust_stats(
+            instance.post.author_id,
+            instance.post.category_id,
+            comments=1,
+            moment=instance.created_at,
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_received_comment(sender, instance, **kwargs):
+    if post_is_deleted(instance.post_id):
+        return
+    adjust_stats(
+        instance.post.author_id, instance.post.category_id, comments=-1
+    )
+
+
+@receiver(post_save, sender=Post)
+def schedule_post_image_renditions(sender, instance, **kwargs):
+    """Заказывает уменьшенные копии нового или заменённого фото."""
+    if (
+        instance.image
+        and instance.image_renditions.get("source") != instance.image.name
+    ):
+        generate_post_renditions.enqueue(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    """Обновляет пост в поисковом индексе, если изменился его текст."""
+    update_fields = kwargs.get("update_fields")
+    if update_fields and not {"title", "text", "author"} & update_fields:
+        return
+    index_posts([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def reindex_author_posts(sender, instance, created, **kwargs):
+    """Имя автора тоже ищется, поэтому его смена переиндексирует посты."""
+    update_fields = kwargs.get("update_fields")
+    if created or (update_fields and "username" not in update_fields):
+        return
+    index_posts(
+        Post.objects.filter(author=instance).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_migrate)
+def recheck_fts_table(sender, **kwargs):
+    """Миграции могли создать или удалить таблицу FTS5."""
+    forget_fts_tables()
+
+
+@receiver(renditions_ready)
+def refresh_post_with_renditions(sender, post_id, **kwargs):
+    """Страницы поста переходят на готовые копии фото; карточку обновляет
+    новое время изменения поста.
+    """
+    purge_page_tags(*post_page_tags([post_id]))
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def touch_related_posts(sender, instance, **kwargs):
+    """Обновляет карточки постов, в которых выводится изменённая
+    категория или местоположение.
+    """
+    field = "category" if sender is Category else "location"
+    touch_posts(Post.objects.filter(**{field: instance}))
+
+
+@receiver(post_save, sender=User)
+def touch_author_posts(sender, instance, created, **kwargs):
+    """Обновляет карточки постов автора при смене его имени.
+    Сохранение last_login при входе пропускается.
+    """
+    update_fields = kwargs.get("update_fields")
+    if created or (update_fields and "username" not in update_fields):
+        return
+    touch_posts(Post.objects.filter(author=instance))
+
+
+def post_page_tags(post_ids):
+    """Теги страниц, на которых выводятся указанные посты."""
+    tags = {"feed"}
+    rows = Post.objects.filter(pk__in=post_ids).values_list(
+        "pk", "category__slug", "author__username"
+    )
+    for post_id, category_slug, username in rows:
+        tags.update(
+            (
+                f"post:{post_id}",
+                f"category:{category_slug}",
+                f"author:{username}",
+            )
+        )
+    return tags
+
+
+def with_count_tags(tags):
+    """Добавляет к тегам лент теги закешированных счётчиков их постов.
+    Комментарии число постов не меняют и сбрасывают только страницы.
+    """
+    return {
+        *tags,
+        *(f"count:{tag}" for tag in tags if not tag.startswith("post:")),
+    }
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_page_tags(sender, instance, **kwargs):
+    """Запоминает страницы поста до изменения: пост мог сменить
+    категорию.
+    """
+    instance._page_tags_before = (
+        post_page_tags([instance.pk]) if instance.pk else set()
+    )
+
+
+@receiver(post_save, sender=Post)
+def purge_post_pages(sender, instance, **kwargs):
+    purge_page_tags(
+        *with_count_tags(
+            post_page_tags([instance.pk])
+            | getattr(instance, "_page_tags_before", set())
+        )
+    )
+
+
+@receiver(pre_delete, sender=Post)
+def purge_deleted_post_pages(sender, instance, **kwargs):
+    purge_page_tags(*with_count_tags(post_page_tags([instance.pk])))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_pages(sender, instance, **kwargs):
+    """Комментарий меняет страницу поста и счётчик в карточках лент."""
+    if post_is_deleted(instance.post_id):
+        return
+    purge_page_tags(*post_page_tags([instance.post_id]))
+
+
+@receiver(posts_went_live)
+def purge_published_post_pages(sender, post_ids, **kwargs):
+    purge_page_tags(*with_count_tags(post_page_tags(post_ids)))
+
+
+@receiver(posts_went_live)
+def count_published_posts(sender, post_ids, **kwargs):
+    for author_id, category_id, pub_date in Post.objects.filter(
+        pk__in=post_ids
+    ).values_list("author_id", "category_id", "pub_date"):
+        adjust_stats(author_id, category_id, posts=1, moment=pub_date)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def purge_all_pages(sender, instance, **kwargs):
+    """Категории, местоположения и авторы выводятся на многих страницах
+    сразу, поэтому их изменение сбрасывает весь кеш страниц.
+    """
+    update_fields = kwargs.get("update_fields")
+    if sender is User and update_fields and "username" not in update_fields:
+        return
+    purge_page_tags(GLOBAL_TAG)
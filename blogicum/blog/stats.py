@@ -0,0 +1,125 @@
+from django.db.models import Case, Count, F, Max, Q, Value, When
+from django.db.models.functions import Greatest
+
+from .models import AuthorStats, CategoryStats, Comment, Post
+
+# Модель сводки: её поле-владелец и поле поста, по которому она
+# собирается.
+STATS = {
+    AuthorStats: ("user", "author"),
+    CategoryStats: ("category", "category"),
+}
+
+
+def _refresh(model, ids):
+    owner, post_field = STATS[model]
+    ids = {pk for pk in ids if pk is not None}
+    if not ids:
+        return
+    posts = {
+        pk: (total, last)
+        for pk, total, last in Post.objects.filter(
+            **{f"{post_field}__in": ids}, is_live=True
+        )
+        .values_list(post_field)
+        .annotate(total=Count("pk"), last=Max("pub_date"))
+        .order_by()
+    }
+    comments = {
+        pk: (total, last)
+        for pk, total, last in Comment.objects.filter(
+            **{f"post__{post_field}__in": ids}
+        )
+        .values_list(f"post__{post_field}")
+        .annotate(total=Count("pk"), last=Max("created_at"))
+        .order_by()
+    }
+    rows = []
+    for pk in ids:
+        post_total, post_last = posts.get(pk, (0, None))
+        comment_total, comment_last = comments.get(pk, (0, None))
+        moments = [moment for moment in (post_last, comment_last) if moment]
+        rows.append(
+            model(
+                **{f"{owner}_id": pk},
+                posts_published=post_total,
+                comments_received=comment_total,
+                last_activity_at=max(moments) if moments else None,
+            )
+        )
+    existing = set(
+        model.objects.filter(pk__in=ids).values_list("pk", flat=True)
+    )
+    model.objects.bulk_update(
+        [row for row in rows if row.pk in existing],
+        ["posts_published", "comments_received", "last_activity_at"],
+    )
+    model.objects.bulk_create(
+        [row for row in rows if row.pk not in existing],
+        ignore_conflicts=True,
+    )
+
+
+def refresh_stats(author_ids=(), category_ids=()):
+    """Пересчитывает сводки указанных авторов и категорий по их постам.
+    Запросы идут по индексам (author, pub_date) и (category, pub_date).
+    """
+    _refresh(AuthorStats, author_ids)
+    _refresh(CategoryStats, category_ids)
+
+
+def adjust_stats(author_id, category_id, posts=0, comments=0, moment=None):
+    """
+    Сдвигает счётчики сводок автора и категории на posts и comments и
+    продвигает время последней активности до moment — одним UPDATE на
+    сводку, без пересчёта. Сводка, которой ещё нет, один раз собирается
+    пересчётом.
+    """
+    changes = {}
+    if posts:
+        changes["posts_published"] = Greatest(
+            F("posts_published") + posts, Value(0)
+        )
+    if comments:
+        changes["comments_received"] = Greatest(
+            F("comments_received") + comments, Value(0)
+        )
+    if moment is not None:
+        changes["last_activity_at"] = Case(
+            When(
+                Q(last_activity_at__lt=moment)
+                | Q(last_activity_at__isnull=True),
+                then=Value(moment),
+            ),
+            default=F("last_activity_at"),
+        )
+    if not changes:
+        return
+    for model, pk in ((AuthorStats, author_id), (CategoryStats, category_id)):
+        if pk is not None and not model.objects.filter(pk=pk).update(
+            **changes
+        ):
+            _refresh(model, [pk])
+
+
+def rebuild_stats(batch_size=500):
+    """Пересчитывает все сводки порциями. Возвращает число авторов и
+    категорий.
+    """
+    totals = []
+    for model, (owner, _) in STATS.items():
+        owners = (
+            model._meta.get_field(owner)
+            .related_model.objects.order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        last_pk, total = 0, 0
+        while True:
+            batch = list(owners.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            _refresh(model, batch)
+            last_pk = batch[-1]
+            total += len(batch)
+        totals.append(total)
+    return tuple(totals)
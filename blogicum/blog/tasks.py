@@ -0,0 +1,51 @@
+import logging
+
+from django.dispatch import Signal
+from django.utils import timezone
+from PIL import Image
+
+from core.tasks import task
+from core.writes import run_serialized
+
+from .images import build_renditions
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Отправляется с аргументом post_id, когда копии картинки поста готовы:
+# по нему сбрасываются карточка и страницы поста.
+renditions_ready = Signal()
+
+
+@task(max_attempts=3)
+def generate_post_renditions(post_id, force=False):
+    """Строит копии текущей картинки поста. Возвращает True, если
+    копии сохранены или уже были готовы.
+    """
+    name, current = (
+        Post.objects.filter(pk=post_id)
+        .values_list("image", "image_renditions")
+        .first()
+        or (None, None)
+    )
+    if not name:
+        return False
+    if current.get("source") == name and not force:
+        # Копии уже построила задача, поставленная раньше.
+        return True
+    try:
+        renditions = build_renditions(name)
+    except Image.DecompressionBombError:
+        # Повтор не поможет: такую картинку не обработать никогда.
+        logger.exception("Слишком большая картинка %s", name)
+        return False
+    # Пока копии строились, картинку могли заменить: тогда результат
+    # устарел, а новые копии построит следующая задача.
+    updated = run_serialized(
+        Post.objects.filter(pk=post_id, image=name).update,
+        image_renditions=renditions,
+        updated_at=timezone.now(),
+    )
+    if updated:
+        renditions_ready.send(sender=Post, post_id=post_id)
+    return bool(updated)
@@ -1,11 +1,14 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name: str = "blog"
 
 urlpatterns: list = [
     path("", views.PostListView.as_view(), name="index"),
+    path("search/", views.SearchView.as_view(), name="search"),
+    path("feed/", feeds.LatestPostsFeed(), name="feed"),
+    path("feed/atom/", feeds.LatestPostsAtomFeed(), name="feed_atom"),
     path(
         "posts/<int:pk>/", views.PostDetailView.as_view(), name="post_detail"
     ),
@@ -14,6 +17,16 @@ urlpatterns: list = [
         views.CategoryListView.as_view(),
         name="category_posts",
     ),
+    path(
+        "category/<slug:category_slug>/feed/",
+        feeds.CategoryPostFeed(),
+        name="category_feed",
+    ),
+    path(
+        "category/<slug:category_slug>/feed/atom/",
+        feeds.CategoryPostAtomFeed(),
+        name="category_feed_atom",
+    ),
     path(
         "posts/create/", views.PostCreateEditView.as_view(), name="create_post"
     ),
@@ -25,6 +38,16 @@ urlpatterns: list = [
     path(
         "profile/<username>/", views.UserProfileView.as_view(), name="profile"
     ),
+    path(
+        "profile/<username>/feed/",
+        feeds.AuthorPostFeed(),
+        name="profile_feed",
+    ),
+    path(
+        "profile/<username>/feed/atom/",
+        feeds.AuthorPostAtomFeed(),
+        name="profile_feed_atom",
+    ),
     path(
         "edit_profile/<int:pk>/",
         views.UserEditProfileView.as_view(),
@@ -40,6 +63,11 @@ urlpatterns: list = [
         views.CommentCreateView.as_view(),
         name="add_comment",
     ),
+    path(
+        "posts/<int:pk>/comments/",
+        views.CommentListView.as_view(),
+        name="comments",
+    ),
     path(
         "posts/<int:post_id>/edit_comment/<int:pk>/",
         views.CommentUpdateView.as_view(),
@@ -50,4 +78,20 @@ urlpatterns: list = [
         views.CommentDeleteView.as_view(),
         name="delete_comment",
     ),
+    path(
+        "cache/stats/",
+        views.PageCacheStatsView.as_view(),
+        name="page_cache_stats",
+    ),
+    path(
+        "tasks/stats/",
+        views.TaskQueueStatsView.as_view(),
+        name="task_queue_stats",
+    ),
+    path(
+        "requests/stats/",
+        views.RequestStatsView.as_view(),
+        name="request_stats",
+    ),
+    path("export/", views.ExportView.as_view(), name="export"),
 ]
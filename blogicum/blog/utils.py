@@ -1,3 +1,5 @@
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.db.models import Model
 from django.shortcuts import get_object_or_404
 from django.views.generic.detail import SingleObjectTemplateResponseMixin
 from django.views.generic.edit import ModelFormMixin, ProcessFormView
@@ -5,8 +7,40 @@ from django.views.generic.edit import ModelFormMixin, ProcessFormView
 from .models import Post
 
 
+class StaffRequiredMixin(UserPassesTestMixin):
+    """Доступ только для персонала; анонимы уходят на страницу входа."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+
+class ResolvedObjectsMixin:
+    """
+    Запоминает объекты, найденные по аргументам URL, на время запроса:
+    dispatch, get_queryset, get_context_data и get_success_url получают
+    один и тот же объект вместо повторного запроса к БД.
+    """
+
+    def resolve_object(self, queryset, **lookup):
+        """
+        get_object_or_404, который ищет каждый объект один раз за запрос.
+        Ключ — модель и условия поиска, поэтому для одного объекта нужно
+        везде передавать одну и ту же выборку.
+        """
+        if isinstance(queryset, type) and issubclass(queryset, Model):
+            queryset = queryset._default_manager.all()
+        resolved = self.__dict__.setdefault("_resolved_objects", {})
+        key = (queryset.model, tuple(sorted(lookup.items())))
+        if key not in resolved:
+            resolved[key] = get_object_or_404(queryset, **lookup)
+        return resolved[key]
+
+
 class CreateUpdateView(
-    SingleObjectTemplateResponseMixin, ModelFormMixin, ProcessFormView
+    ResolvedObjectsMixin,
+    SingleObjectTemplateResponseMixin,
+    ModelFormMixin,
+    ProcessFormView,
 ):
     """
     Как у BaseUpdateView, так и у BaseCreateView общие практически родители,
@@ -26,7 +60,7 @@ class CreateUpdateView(
         """
         pk = self.kwargs.get("pk")
         if pk is not None:
-            return get_object_or_404(Post, pk=pk)
+            return self.resolve_object(Post, pk=pk)
         return None
 
     def get(self, request, *args, **kwargs):
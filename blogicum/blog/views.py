@@ -1,24 +1,47 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
-from django.db.models import Count
-from django.http import Http404, HttpResponseRedirect
+from django.db.models import OuterRef, Q, Subquery
+from django.http import (
+    Http404,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.http import urlencode
 from django.views.generic import (
     CreateView,
     DeleteView,
     DetailView,
     ListView,
     UpdateView,
+    View,
 )
 
 from blog.models import Category, Comment, Post
+from core.cache import (
+    AnonymousPageCacheMixin,
+    page_cache_stats,
+    page_tag_versions,
+)
+from core.conditional import ConditionalGetMixin, make_etag
+from core.instrumentation import request_stats
+from core.tasks import task_queue_stats
 
+from .exporter import MODELS, stream_export
 from .forms import CommentForm, PostForm
-from .utils import CreateUpdateView
+from .paginators import CachedCountPaginator, CursorPaginator
+from .search import search_posts
+from .utils import (
+    CreateUpdateView,
+    ResolvedObjectsMixin,
+    StaffRequiredMixin,
+)
 
 User = get_user_model()
 
@@ -33,7 +56,17 @@ PROFILE = reverse_lazy(PROFILE_URL)
 POST_DETAIL = reverse_lazy(POST_DETAIL_URL)
 
 
-class PostFieldsMixin:
+def comment_paginator(queryset):
+    """Keyset-пагинатор комментариев в хронологическом порядке."""
+    return CursorPaginator(
+        queryset,
+        settings.BLOG_COMMENTS_PER_PAGE,
+        date_field="created_at",
+        descending=False,
+    )
+
+
+class PostFieldsMixin(ResolvedObjectsMixin):
     """Миксин, определяющий общие поля для представлений создания и
     редактирования постов.
     """
@@ -42,12 +75,17 @@ class PostFieldsMixin:
     template_name = "blog/create.html"
     success_url = INDEX
 
+    def get_object(self, queryset=None):
+        """Пост из URL, найденный один раз за запрос; None при создании."""
+        pk = self.kwargs.get("pk")
+        return None if pk is None else self.resolve_object(Post, pk=pk)
+
     def check_if_user_is_author(self, request, *args, **kwargs):
         """Проверяет, является ли текущий пользователь автором
         поста.
         """
-        post_to_delete = get_object_or_404(Post, id=kwargs["pk"])
-        if request.user.id != post_to_delete.author.id:
+        post_to_delete = self.get_object()
+        if request.user.id != post_to_delete.author_id:
             return redirect(POST_DETAIL_URL, pk=post_to_delete.pk)
         else:
             return super().dispatch(request, *args, **kwargs)
@@ -78,8 +116,8 @@ class PostCreateEditView(
         пользователь редактировать пост.
         """
         if "edit/" in self.request.path:
-            post_to_edit = get_object_or_404(Post, id=kwargs["pk"])
-            if request.user.id != post_to_edit.author.id:
+            post_to_edit = self.get_object()
+            if request.user.id != post_to_edit.author_id:
                 return redirect("blog:post_detail", pk=post_to_edit.pk)
         return super().dispatch(request, *args, **kwargs)
 
@@ -95,82 +133,225 @@ class PostDeleteView(LoginRequiredMixin, PostFieldsMixin, DeleteView):
         return self.check_if_user_is_author(request, *args, **kwargs)
 
 
-class ListingMixin:
+class ListingMixin(AnonymousPageCacheMixin, ConditionalGetMixin):
     """Миксин, определяющий общие поля для представлений списка постов."""
 
     model = Post
     ordering = "-pub_date"
     paginate_by = 10
+    paginator_class = CachedCountPaginator
+    cursor_kwarg = "cursor"
+
+    def get_validators(self):
+        """
+        Валидаторы строятся по постам самой страницы: их id, времени
+        изменения (оно меняется и с комментариями) и числу постов ленты,
+        поэтому видят изменения из любого процесса. Переименование
+        категории, места или автора тоже меняет время изменения их постов.
+        Страница выбирается здесь же и переиспользуется при отрисовке.
+        """
+        queryset = self.get_queryset()
+        paginator, page, posts, _ = self.paginate_queryset(
+            queryset, self.get_paginate_by(queryset)
+        )
+        etag = make_etag(
+            *((post.pk, post.updated_at.isoformat()) for post in posts),
+            getattr(paginator, "count", None),
+            self.request.user.pk,
+            *(self.request.GET.get(name) for name in self.page_cache_vary_on),
+        )
+        last_modified = max(
+            (int(post.updated_at.timestamp()) for post in posts),
+            default=None,
+        )
+        return etag, last_modified
+
+    def get_count_visibility(self):
+        """Какой набор постов видит пользователь: от этого зависит их
+        число в ленте.
+        """
+        return "public"
+
+    def get_count_cache_key(self):
+        """Ключ кешированного числа постов ленты. Поколения count-тегов
+        меняются при изменении постов ленты, что сбрасывает счётчик.
+        """
+        tags = [f"count:{tag}" for tag in self.get_page_cache_tags()]
+        return "post_count:" + make_etag(
+            *tags, *page_tag_versions(tags), self.get_count_visibility()
+        ).strip('"')
+
+    def get_paginator(self, *args, **kwargs):
+        return super().get_paginator(
+            *args, count_key=self.get_count_cache_key(), **kwargs
+        )
+
+    def get_context_data(self, **kwargs):
+        """Добавляет в контекст окно номеров страниц вокруг текущей."""
+        context = super().get_context_data(**kwargs)
+        page = context["page_obj"]
+        if page is not None and not getattr(
+            page.paginator, "is_keyset", False
+        ):
+            context["page_range"] = list(
+                page.paginator.get_elided_page_range(page.number)
+            )
+        return context
+
+    def use_cursor_pagination(self):
+        """Keyset-пагинация включается настройкой BLOG_CURSOR_PAGINATION
+        или явным параметром ?cursor= в запросе.
+        """
+        return (
+            settings.BLOG_CURSOR_PAGINATION
+            or self.cursor_kwarg in self.request.GET
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        """Разбивает выборку на страницы по курсору вместо OFFSET,
+        если включена keyset-пагинация. Страница выбирается один раз за
+        запрос: её уже загрузил get_validators().
+        """
+        if not hasattr(self, "_pagination"):
+            if self.use_cursor_pagination():
+                paginator = CursorPaginator(queryset, page_size)
+                page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+                self._pagination = (
+                    paginator,
+                    page,
+                    page.object_list,
+                    page.has_other_pages(),
+                )
+            else:
+                self._pagination = super().paginate_queryset(
+                    queryset, page_size
+                )
+        return self._pagination
 
 
 class PostListView(ListingMixin, ListView):
     """Представление списка постов."""
 
     template_name = "blog/index.html"
-    queryset = (
-        Post.objects.select_related("location", "author", "category")
-        .exclude(pub_date__gt=timezone.now())
-        .filter(is_published=True, category__is_published=True)
-        .annotate(comment_count=Count("comments"))
-    )
 
+    def get_page_cache_tags(self):
+        return ("feed",)
+
+    def get_queryset(self):
+        """Получает опубликованные посты для ленты."""
+        return super().get_queryset().published().for_listing()
+
+
+class SearchView(ListingMixin, ListView):
+    """Поиск по опубликованным постам, результаты по релевантности."""
+
+    template_name = "blog/search.html"
+    ordering = None
+    query_kwarg = "q"
+    page_cache_vary_on = ("page", "q")
+
+    def get_page_cache_tags(self):
+        return ("feed",)
+
+    def get_query(self):
+        return self.request.GET.get(self.query_kwarg, "").strip()
+
+    def use_cursor_pagination(self):
+        # Курсор идёт по дате, а результаты отсортированы по релевантности.
+        return False
+
+    def get_count_cache_key(self):
+        return super().get_count_cache_key() + make_etag(
+            self.get_query()
+        ).strip('"')
+
+    def get_queryset(self):
+        return search_posts(
+            super().get_queryset().published().for_listing(),
+            self.get_query(),
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["query"] = self.get_query()
+        # Ссылки пагинатора сохраняют поисковый запрос.
+        context["page_query"] = urlencode({self.query_kwarg: context["query"]})
+        return context
 
-class CategoryListView(ListingMixin, ListView):
+
+class CategoryListView(ResolvedObjectsMixin, ListingMixin, ListView):
     """Представление списка постов в категории."""
 
     template_name = "blog/category.html"
 
+    def get_page_cache_tags(self):
+        return (f"category:{self.kwargs['category_slug']}",)
+
+    def get_category(self):
+        """Опубликованная категория из URL вместе со своей сводкой."""
+        return self.resolve_object(
+            Category.objects.select_related("stats"),
+            slug=self.kwargs["category_slug"],
+            is_published=True,
+        )
+
     def get_queryset(self):
         """Получает отфильтрованный список постов в выбранной категории."""
-        queryset = super().get_queryset()
-        category = get_object_or_404(
-            Category, slug=self.kwargs["category_slug"], is_published=True
-        )
         return (
-            queryset.select_related("category")
-            .exclude(pub_date__gt=timezone.now())
-            .filter(category=category, is_published=True)
-            .annotate(comment_count=Count("comments"))
+            super()
+            .get_queryset()
+            .published()
+            .for_listing()
+            .filter(category=self.get_category())
         )
 
     def get_context_data(self, *, object_list=None, **kwargs):
         """Добавляет выбранную категорию в контекст."""
         context = super().get_context_data(**kwargs)
-        context["category"] = get_object_or_404(
-            Category, slug=self.kwargs["category_slug"], is_published=True
-        )
+        context["category"] = self.get_category()
         return context
 
 
-class UserProfileView(ListingMixin, ListView):
+class UserProfileView(ResolvedObjectsMixin, ListingMixin, ListView):
     """Представление профиля пользователя."""
 
     template_name = "blog/profile.html"
-    queryset = Post.objects.select_related("author").annotate(
-        comment_count=Count("comments")
-    )
+
+    def get_page_cache_tags(self):
+        return (f"author:{self.kwargs['username']}",)
+
+    def get_count_visibility(self):
+        if self.request.user.get_username() == self.kwargs["username"]:
+            return "owner"
+        return "public"
+
+    def get_author(self):
+        """Автор из URL вместе со сводкой его активности."""
+        return self.resolve_object(
+            User.objects.select_related("post_stats"),
+            username=self.kwargs["username"],
+        )
 
     def get_queryset(self):
         """Получает отфильтрованный список постов пользователя."""
-        author = get_object_or_404(User, username=self.kwargs["username"])
-        queryset = super().get_queryset().filter(author=author)
-        if author.id != self.request.user.id:
-            queryset = queryset.filter(
-                is_published=True, category__is_published=True
-            ).exclude(pub_date__gt=timezone.now())
-        return queryset
+        return (
+            super()
+            .get_queryset()
+            .visible_to(self.request.user)
+            .for_listing()
+            .filter(author=self.get_author())
+        )
 
     def get_context_data(self, *, object_list=None, **kwargs):
         """Добавляет профиль пользователя в контекст."""
         context = super().get_context_data(**kwargs)
-        author_id = get_object_or_404(
-            User, username=self.kwargs["username"]
-        ).id
-        context["profile"] = get_object_or_404(User, id=author_id)
+        context["profile"] = self.get_author()
         return context
 
 
-class UserEditProfileView(LoginRequiredMixin, UpdateView):
+class UserEditProfileView(
+    LoginRequiredMixin, ResolvedObjectsMixin, UpdateView
+):
     """Представление редактирования профиля пользователя."""
 
     model = User
@@ -184,47 +365,109 @@ class UserEditProfileView(LoginRequiredMixin, UpdateView):
         """
         return super().get_queryset().filter(id=self.kwargs["pk"])
 
+    def get_object(self, queryset=None):
+        return self.resolve_object(self.get_queryset(), pk=self.kwargs["pk"])
+
     def get_success_url(self, *args, **kwargs):
         """Возвращает URL для перенаправления после успешного
-        редактирования профиля.
+        редактирования профиля: уже сохранённый объект знает новое имя.
         """
-        username = get_object_or_404(User, id=self.kwargs["pk"]).username
-        return reverse_lazy(PROFILE_URL, args=[username])
+        return reverse_lazy(PROFILE_URL, args=[self.get_object().username])
 
 
-class PostDetailView(DetailView):
+class PostDetailView(
+    AnonymousPageCacheMixin, ConditionalGetMixin, DetailView
+):
     """Представление для детального просмотра поста."""
 
     model = Post
     template_name = "blog/detail.html"
+    page_cache_vary_on = ("comments",)
+    comments_cursor_kwarg = "comments"
 
-    def get_queryset(self):
-        """Получает отфильтрованный список постов."""
-        queryset = super().get_queryset()
-        author = get_object_or_404(Post, id=self.kwargs["pk"]).author
-        if self.request.user.id != author.id:
-            queryset = queryset.filter(
-                is_published=True, category__is_published=True
-            ).exclude(pub_date__gt=timezone.now())
-        return queryset
+    def get_validators(self):
+        """Валидаторы по дате публикации, времени изменения поста и его
+        последнему комментарию. Пост загружается здесь же и больше не
+        запрашивается.
+        """
+        try:
+            post = self.get_object()
+        except Http404:
+            return None, None
+        moments = (post.pub_date, post.updated_at, post.last_comment_at)
+        last_modified = min(
+            timezone.now(),
+            max(moment for moment in moments if moment is not None),
+        )
+        etag = make_etag(
+            post.pk,
+            post.updated_at.isoformat(),
+            post.comment_count,
+            post.last_comment_at,
+            self.request.user.pk,
+            self.request.GET.get(self.comments_cursor_kwarg),
+        )
+        return etag, int(last_modified.timestamp())
 
-    def dispatch(self, request, *args, **kwargs):
-        """Перехватывает запрос и проверяет, доступен ли пост
-        текущему пользователю.
+    def get_page_cache_tags(self):
+        return (f"post:{self.kwargs['pk']}",)
+
+    def get_queryset(self):
+        """Получает посты, доступные текущему пользователю, вместе с
+        автором, категорией, местоположением и временем последнего
+        комментария — одним запросом.
         """
-        if not self.get_object():
-            raise Http404("Такого поста не существует.")
-        return super().dispatch(request, *args, **kwargs)
+        last_comment = (
+            Comment.objects.filter(post=OuterRef("pk"))
+            .order_by("-created_at")
+            .values("created_at")[:1]
+        )
+        return (
+            Post.objects.visible_to(self.request.user)
+            .select_related("author", "category", "location")
+            .annotate(last_comment_at=Subquery(last_comment))
+        )
+
+    def get_object(self, queryset=None):
+        """Загружает пост один раз за запрос."""
+        if not hasattr(self, "_post"):
+            self._post = super().get_object(queryset)
+        return self._post
 
     def get_context_data(self, **kwargs):
-        """Добавляет форму комментариев и список комментариев в контекст."""
+        """Добавляет форму комментариев и первую порцию комментариев
+        (или порцию с комментария из ?comments=) в контекст.
+        """
         context = super().get_context_data(**kwargs)
         context["form"] = CommentForm()
-        context["comments"] = self.object.comments.select_related("post")
+        context["comments"] = context["comments_page"] = comment_paginator(
+            self.object.comments.select_related("author")
+        ).page(self.request.GET.get(self.comments_cursor_kwarg))
+        return context
+
+
+class CommentListView(ListView):
+    """HTML-фрагмент со следующей порцией комментариев поста."""
+
+    template_name = "includes/comment_list.html"
+
+    def get_queryset(self):
+        """Комментарии поста, доступного текущему пользователю."""
+        self.post = get_object_or_404(
+            Post.objects.visible_to(self.request.user), pk=self.kwargs["pk"]
+        )
+        return self.post.comments.select_related("author")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["post"] = self.post
+        context["comments"] = context["comments_page"] = comment_paginator(
+            self.object_list
+        ).page(self.request.GET.get("cursor"))
         return context
 
 
-class CommentMixin:
+class CommentMixin(ResolvedObjectsMixin):
     model = Comment
     template_name = "blog/comment.html"
     form_class = CommentForm
@@ -234,23 +477,52 @@ class CommentMixin:
         пользователя в качестве автора комментария.
         """
         if "delete/" not in self.request.path:
-            post = get_object_or_404(
-                Post, id=self.kwargs.get("post_id") or self.kwargs["pk"]
-            )
+            post = self.get_post()
             form.instance.author = self.request.user
             form.instance.post = post
         return super().form_valid(form)
 
+    def get_post(self):
+        """Пост, к которому относится комментарий из URL."""
+        return self.resolve_object(
+            Post, pk=self.kwargs.get("post_id") or self.kwargs["pk"]
+        )
+
+    def get_object(self, queryset=None):
+        """Комментарий из URL, найденный один раз за запрос."""
+        return self.resolve_object(Comment, pk=self.kwargs["pk"])
+
     def form_invalid(self, form):
         """Перенаправляет на страницу поста в случае невалидной формы."""
         return HttpResponseRedirect(self.get_success_url())
 
+    def get_success_url(self, anchor=True):
+        """Возвращает URL порции комментариев на странице поста, в
+        которой виден обработанный комментарий.
+        """
+        url = reverse(
+            POST_DETAIL_URL,
+            kwargs={"pk": self.kwargs.get("post_id") or self.kwargs["pk"]},
+        )
+        comment = self.object
+        if comment is None or comment.pk is None:
+            return url
+        comments = Comment.objects.filter(post_id=comment.post_id)
+        paginator = comment_paginator(comments)
+        earlier = comments.filter(
+            Q(created_at__lt=comment.created_at)
+            | Q(created_at=comment.created_at, pk__lt=comment.pk)
+        )
+        if earlier[: paginator.per_page].count() >= paginator.per_page:
+            url += f"?comments={paginator.cursor_at(comment)}"
+        if anchor:
+            url += f"#comment_{comment.pk}"
+        return url
+
     def dispatch(self, request, *args, **kwargs):
         if "/comment/" not in self.request.path:
-            comment_to_change = get_object_or_404(
-                Comment, id=self.kwargs["pk"]
-            )
-            if request.user.id != comment_to_change.author.id:
+            comment_to_change = self.get_object()
+            if request.user.id != comment_to_change.author_id:
                 raise PermissionDenied
         return super().dispatch(request, *args, **kwargs)
 
@@ -268,7 +540,63 @@ class CommentDeleteView(LoginRequiredMixin, CommentMixin, DeleteView):
 
     def get_success_url(self):
         """Возвращает URL для перенаправления после успешного
-        удаления комментария.
+        удаления комментария: порцию, где он находился.
         """
-        post = get_object_or_404(Post, id=self.kwargs["post_id"])
-        return reverse(POST_DETAIL_URL, kwargs={"pk": post.pk})
+        return super().get_success_url(anchor=False)
+
+
+class PageCacheStatsView(StaffRequiredMixin, View):
+    """Статистика кеша страниц для анонимов, доступна только персоналу."""
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(page_cache_stats())
+
+
+class TaskQueueStatsView(StaffRequiredMixin, View):
+    """Глубина фоновой очереди и задержки задач, только для персонала."""
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(task_queue_stats())
+
+
+class RequestStatsView(StaffRequiredMixin, View):
+    """Гистограмма времени ответов процесса по представлениям, только
+    для персонала.
+    """
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(request_stats())
+
+
+class ExportView(StaffRequiredMixin, View):
+    """
+    Потоковая выгрузка содержимого сжатым JSONL, только для персонала:
+    ?models=posts,comments выбирает модели, ?since=ГГГГ-ММ-ДД
+    ограничивает записи датой создания.
+    """
+
+    def get(self, request, *args, **kwargs):
+        names = request.GET.get("models")
+        names = names.split(",") if names else list(MODELS)
+        unknown = [name for name in names if name not in MODELS]
+        since = request.GET.get("since")
+        try:
+            since_date = parse_date(since) if since else None
+        except ValueError:
+            since_date = None
+        if unknown or (since and since_date is None):
+            return JsonResponse(
+                {"error": f"Доступны модели: {', '.join(MODELS)}; "
+                          "since — дата ГГГГ-ММ-ДД."},
+                status=400,
+            )
+        labels = [label for name, label in MODELS.items() if name in names]
+        response = StreamingHttpResponse(
+            stream_export(labels, since_date),
+            content_type="application/gzip",
+        )
+        stamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+        response["Content-Disposition"] = (
+            f'attachment; filename="blogicum-{stamp}.jsonl.gz"'
+        )
+        return response
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR: Path = Path(__file__).resolve().parent.parent
@@ -18,6 +19,7 @@ INSTALLED_APPS: list = [
     "pages.apps.PagesConfig",
     "core.apps.CoreConfig",
     "users.apps.UsersConfig",
+    "api.apps.ApiConfig",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -28,6 +30,7 @@ INSTALLED_APPS: list = [
 ]
 
 MIDDLEWARE: list = [
+    "core.middleware.RequestTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -35,6 +38,7 @@ MIDDLEWARE: list = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "blog.middleware.ScheduledPublicationMiddleware",
 ]
 
 ROOT_URLCONF: str = "blogicum.urls"
@@ -60,11 +64,61 @@ TEMPLATES: list = [
 WSGI_APPLICATIONL: str = "blogicum.wsgi.application"
 
 
-DATABASES: dict = {
-    "default": {
+# Профиль базы: sqlite по умолчанию, для рабочего сервера —
+# BLOGICUM_DB=sqlite-wal (WAL, настройки PRAGMA, постоянные соединения
+# на BLOGICUM_DB_CONN_MAX_AGE секунд с проверкой перед запросом).
+# Файл базы — BLOGICUM_DB_PATH.
+BLOGICUM_DB: str = os.environ.get("BLOGICUM_DB", "sqlite")
+BLOGICUM_DB_PATH: Path = Path(
+    os.environ.get("BLOGICUM_DB_PATH", BASE_DIR / "db.sqlite3")
+)
+
+DATABASE_PROFILES: dict = {
+    "sqlite": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+        "NAME": BLOGICUM_DB_PATH,
+    },
+    "sqlite-wal": {
+        "ENGINE": "core.db.sqlite3",
+        "NAME": BLOGICUM_DB_PATH,
+        "CONN_MAX_AGE": int(os.environ.get("BLOGICUM_DB_CONN_MAX_AGE", 600)),
+        "OPTIONS": {"health_checks": True},
+    },
+}
+
+DATABASES: dict = {"default": DATABASE_PROFILES[BLOGICUM_DB]}
+
+# Кеш фрагментов (карточек постов): locmem по умолчанию, файловый —
+# BLOGICUM_CACHE=file. Ключ карточки включает время изменения поста,
+# поэтому кешу фрагментов не нужно быть общим для процессов.
+# Кеш страниц для анонимов всегда общий (файловый): в нём же хранятся
+# поколения тегов, которыми страницы сбрасываются во всех процессах.
+BLOGICUM_CACHE: str = os.environ.get("BLOGICUM_CACHE", "locmem")
+
+CACHE_BACKENDS: dict = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+}
+
+# Вид кеша по псевдониму
+CACHE_KINDS: dict = {"fragments": BLOGICUM_CACHE, "pages": "file"}
+
+CACHES: dict = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    **{
+        alias: {
+            "BACKEND": CACHE_BACKENDS[kind],
+            "LOCATION": (
+                str(BASE_DIR / "cache" / alias)
+                if kind == "file"
+                else f"blogicum-{alias}"
+            ),
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+        for alias, kind in CACHE_KINDS.items()
+    },
 }
 
 
@@ -106,3 +160,55 @@ AUTH_USER_MODEL = "users.User"
 MEDIA_ROOT = BASE_DIR / "media"
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = BASE_DIR / "sent_emails"
+
+# Блог
+# Keyset-пагинация лент (?cursor=) вместо постраничной (?page=)
+BLOG_CURSOR_PAGINATION: bool = False
+# Как часто (в секундах) процесс проверяет отложенные публикации;
+# None — только командой publish_scheduled
+BLOG_PUBLICATION_CHECK_INTERVAL: int = 60
+# Время жизни страниц в кеше для анонимов, секунды; 0 — кеш отключён
+BLOG_PAGE_CACHE_TIMEOUT: int = 300
+# Сколько секунд хранится число постов ленты для пагинатора; изменения
+# из других процессов видны не позже этого срока
+BLOG_COUNT_CACHE_TIMEOUT: int = 300
+# Сколько последних постов попадает в RSS/Atom-ленты и сколько секунд
+# готовая лента хранится в кеше; 0 — не кешировать
+BLOG_FEED_ITEMS: int = 20
+BLOG_FEED_CACHE_TIMEOUT: int = 3600
+# Размер порции комментариев на странице поста и во фрагменте подгрузки
+BLOG_COMMENTS_PER_PAGE: int = 50
+# Поисковый индекс: fts5 — таблица SQLite FTS5, python — обратный индекс
+# в таблице blog_postsearchterm, auto — FTS5, если она доступна
+BLOG_SEARCH_BACKEND: str = "auto"
+# Заголовок Server-Timing и гистограмма времени ответов по представлениям
+BLOG_REQUEST_TIMING: bool = True
+# Порог медленного запроса к БД, миллисекунды; такие запросы с планом
+# EXPLAIN попадают в журнал core.SlowQuery. None — журнал отключён
+BLOG_SLOW_QUERY_MS: int = 200
+# Сколько разных медленных запросов хранит журнал
+BLOG_SLOW_QUERY_KEEP: int = 500
+
+# Фоновая очередь задач (core.tasks), выполняется командой run_tasks
+# Выполнять задачи сразу после фиксации транзакции в процессе сайта,
+# без воркера
+BLOG_TASKS_EAGER: bool = False
+# Задержка перед первым повтором упавшей задачи, секунды; далее удваивается
+BLOG_TASKS_RETRY_DELAY: int = 10
+BLOG_TASKS_MAX_RETRY_DELAY: int = 3600
+# Через сколько секунд задача без ответа от воркера возвращается в очередь
+BLOG_TASKS_STALE_AFTER: int = 600
+# Сколько секунд хранить выполненные задачи для метрик
+BLOG_TASKS_KEEP_DONE: int = 86400
+
+# Запись в базу (core.writes): сохранение и удаление моделей блога и
+# пользователей выполняются по одному на все процессы сайта
+BLOG_WRITE_LOCK: bool = True
+# Файл межпроцессной блокировки; None — рядом с файлом базы
+BLOG_WRITE_LOCK_PATH = None
+# Сколько секунд ждать блокировку, прежде чем писать без неё
+BLOG_WRITE_LOCK_TIMEOUT: int = 30
+# Повторы транзакции, если база занята писателем вне блокировки, и
+# пауза перед первым из них, секунды; далее удваивается
+BLOG_WRITE_RETRIES: int = 5
+BLOG_WRITE_RETRY_DELAY: float = 0.05
@@ -1,10 +1,13 @@
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
+from django.contrib.auth import views as auth_views
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path, resolvers, reverse_lazy
 from django.views.generic import CreateView
 
+from users.forms import QueuedPasswordResetForm
+
 handler404 = resolvers.get_callable("pages.views.page_not_found")
 handler500 = "pages.views.server_error"
 
@@ -19,7 +22,15 @@ urlpatterns: list = [
         ),
         name="registration",
     ),
+    path(
+        "auth/password_reset/",
+        auth_views.PasswordResetView.as_view(
+            form_class=QueuedPasswordResetForm
+        ),
+        name="password_reset",
+    ),
     path("auth/", include("django.contrib.auth.urls")),
     path("pages/", include("pages.urls", namespace="pages")),
+    path("api/", include("api.urls", namespace="api")),
     path("admin/", admin.site.urls),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
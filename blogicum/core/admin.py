@@ -0,0 +1,57 @@
+from django.contrib import admin
+
+from .models import SlowQuery, Task
+from .writes import run_serialized
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "attempts", "run_after", "finished_at")
+    list_filter = ("status", "name")
+    readonly_fields = ("created_at", "started_at", "finished_at")
+    actions = ("requeue",)
+
+    @admin.action(description="Вернуть в очередь")
+    def requeue(self, request, queryset):
+        run_serialized(
+            queryset.exclude(status=Task.RUNNING).update,
+            status=Task.QUEUED,
+            attempts=0,
+        )
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = (
+        "statement_preview",
+        "count",
+        "avg_ms",
+        "max_ms",
+        "last_view",
+        "last_seen",
+    )
+    list_filter = ("last_view",)
+    search_fields = ("statement",)
+    readonly_fields = (
+        "fingerprint",
+        "statement",
+        "sample",
+        "plan",
+        "count",
+        "total_ms",
+        "max_ms",
+        "last_view",
+        "first_seen",
+        "last_seen",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description="Запрос")
+    def statement_preview(self, obj):
+        return str(obj)
+
+    @admin.display(description="В среднем, мс")
+    def avg_ms(self, obj):
+        return round(obj.avg_ms, 1)
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+    verbose_name = "Служебное"
+
+    def ready(self):
+        # Задачи регистрируются при импорте модулей tasks приложений:
+        # воркер должен знать их все.
+        autodiscover_modules("tasks")
+        from . import checks  # noqa: F401
@@ -0,0 +1,178 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+PAGE_CACHE = "pages"
+GLOBAL_TAG = "all"
+STATS_KEYS = ("hits", "misses", "hit_us", "miss_us")
+
+
+def _cache():
+    return caches[PAGE_CACHE]
+
+
+def _tag_key(tag):
+    return f"page_tag:{tag}"
+
+
+def purge_page_tags(*tags):
+    """
+    Сбрасывает закешированные страницы с указанными тегами.
+    Страницы не удаляются поштучно: у тега меняется поколение, и ключи
+    всех страниц с ним перестают совпадать.
+    """
+    _cache().set_many(
+        {_tag_key(tag): time.time_ns() for tag in tags}, timeout=None
+    )
+
+
+def page_tag_versions(tags):
+    """Поколения тегов (время последнего сброса в наносекундах, 0 — если
+    тег ещё не сбрасывался), включая глобальный тег.
+    """
+    tags = (GLOBAL_TAG, *tags)
+    generations = _cache().get_many([_tag_key(tag) for tag in tags])
+    return [generations.get(_tag_key(tag), 0) for tag in tags]
+
+
+def page_cache_is_shared():
+    """
+    Виден ли кеш страниц всем процессам. Поколения тегов хранятся в нём
+    же, и сброс в локальном кеше одного процесса оставил бы остальным
+    устаревшие страницы, поэтому с таким кешем страницы не кешируются.
+    """
+    return not isinstance(_cache(), LocMemCache)
+
+
+def page_cache_key(path, params, tags):
+    """Ключ страницы с учётом пути, значимых GET-параметров и поколений
+    её тегов.
+    """
+    raw = "|".join(
+        [path, repr(sorted(params.items()))]
+        + [str(version) for version in page_tag_versions(tags)]
+    )
+    return "page:" + hashlib.md5(raw.encode()).hexdigest()
+
+
+def _record(hit, started):
+    cache = _cache()
+    elapsed = int((time.perf_counter() - started) * 1_000_000)
+    counters = ("hits", "hit_us") if hit else ("misses", "miss_us")
+    for key, value in zip(counters, (1, elapsed)):
+        key = f"page_cache_stats:{key}"
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            cache.set(key, value, timeout=None)
+
+
+def page_cache_stats():
+    """Счётчики попаданий и промахов, доля попаданий и средние времена
+    ответа в миллисекундах.
+    """
+    raw = _cache().get_many([f"page_cache_stats:{key}" for key in STATS_KEYS])
+    hits, misses, hit_us, miss_us = (
+        raw.get(f"page_cache_stats:{key}", 0) for key in STATS_KEYS
+    )
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / total if total else 0.0,
+        "avg_hit_ms": hit_us / hits / 1000 if hits else 0.0,
+        "avg_miss_ms": miss_us / misses / 1000 if misses else 0.0,
+    }
+
+
+def reset_page_cache_stats():
+    _cache().delete_many([f"page_cache_stats:{key}" for key in STATS_KEYS])
+
+
+class AnonymousPageCacheMixin:
+    """
+    Кеширует готовые страницы для анонимных посетителей.
+    Ключ зависит от пути, параметров из page_cache_vary_on и поколений
+    тегов из get_page_cache_tags(); ответы отдаются с ETag и
+    Last-Modified, поэтому повторный запрос может закончиться 304.
+    Стоит в базовых классах перед ConditionalGetMixin: попадание в кеш
+    обходится без запросов к БД, которые нужны для валидаторов.
+    """
+
+    page_cache_vary_on = ("page", "cursor")
+
+    def get_page_cache_tags(self):
+        """Теги, по которым страница сбрасывается при изменении данных."""
+        return ()
+
+    def page_cache_applies(self, request):
+        return (
+            settings.BLOG_PAGE_CACHE_TIMEOUT
+            and page_cache_is_shared()
+            and request.method in ("GET", "HEAD")
+            and not request.user.is_authenticated
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.page_cache_applies(request):
+            return super().dispatch(request, *args, **kwargs)
+        started = time.perf_counter()
+        params = {
+            name: request.GET[name]
+            for name in self.page_cache_vary_on
+            if name in request.GET
+        }
+        key = page_cache_key(request.path, params, self.get_page_cache_tags())
+        entry = _cache().get(key)
+        if entry is not None:
+            response = self.cached_response(request, entry)
+            _record(True, started)
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200 or response.streaming:
+            return response
+
+        def store(response):
+            # Валидаторы представления (ConditionalGetMixin) сохраняются,
+            # чтобы ETag не зависел от того, попал ли запрос в кеш.
+            entry = {
+                "content": response.content,
+                "content_type": response["Content-Type"],
+                "etag": response.get("ETag")
+                or quote_etag(hashlib.md5(response.content).hexdigest()),
+                "last_modified": parse_http_date_safe(
+                    response.get("Last-Modified")
+                )
+                or int(time.time()),
+            }
+            response["ETag"] = entry["etag"]
+            response["Last-Modified"] = http_date(entry["last_modified"])
+            response["X-Page-Cache"] = "MISS"
+            _cache().set(key, entry, settings.BLOG_PAGE_CACHE_TIMEOUT)
+            _record(False, started)
+
+        if hasattr(response, "render") and not response.is_rendered:
+            response.add_post_render_callback(store)
+        else:
+            store(response)
+        return response
+
+    @staticmethod
+    def cached_response(request, entry):
+        response = get_conditional_response(
+            request,
+            etag=entry["etag"],
+            last_modified=entry["last_modified"],
+        ) or HttpResponse(entry["content"], content_type=entry["content_type"])
+        response["ETag"] = entry["etag"]
+        response["Last-Modified"] = http_date(entry["last_modified"])
+        response["X-Page-Cache"] = "HIT"
+        return response
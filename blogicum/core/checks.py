@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+from .cache import PAGE_CACHE, page_cache_is_shared
+
+
+@register()
+def check_page_cache(app_configs, **kwargs):
+    """Кеш страниц в памяти процесса не включается, о чём и предупреждает."""
+    if not settings.BLOG_PAGE_CACHE_TIMEOUT or page_cache_is_shared():
+        return []
+    return [
+        Warning(
+            f"Кеш {PAGE_CACHE!r} хранится в памяти процесса, поэтому "
+            "страницы для анонимов не кешируются.",
+            hint=(
+                "Укажите для него общий для процессов бэкенд, например "
+                "FileBasedCache, или BLOG_PAGE_CACHE_TIMEOUT = 0."
+            ),
+            id="core.W001",
+        )
+    ]
@@ -0,0 +1,41 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """Строит ETag из значений, от которых зависит страница."""
+    raw = "|".join(str(part) for part in parts)
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+class ConditionalGetMixin:
+    """
+    Отвечает 304 на If-None-Match/If-Modified-Since до построения
+    страницы. Наследники вычисляют дешёвые валидаторы в
+    get_validators(), не загружая данные самой страницы.
+    """
+
+    def get_validators(self):
+        """Возвращает пару (etag, last_modified) для текущего запроса;
+        last_modified — timestamp в секундах. None — валидатора нет.
+        """
+        return None, None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        if etag is not None:
+            response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
@@ -0,0 +1,130 @@
+import copy
+import os
+import random
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError
+from django.db.utils import ConnectionHandler
+
+# Собственный ConnectionHandler: соединения прогона не смешиваются
+# с django.db.connections.
+ALIAS = DEFAULT_DB_ALIAS
+# Сколько строк вставляет одна транзакция записи.
+WRITE_BATCH = 10
+
+
+def _percentile(values, share):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * share))], 3)
+
+
+def _connections(profile, path):
+    options = copy.deepcopy(settings.DATABASE_PROFILES[profile])
+    options.update(NAME=path, CONN_MAX_AGE=None)
+    return ConnectionHandler({ALIAS: options})
+
+
+def _seed(connections, rows):
+    with connections[ALIAS].cursor() as cursor:
+        cursor.execute(
+            "CREATE TABLE bench (id INTEGER PRIMARY KEY, text TEXT)"
+        )
+        cursor.executemany(
+            "INSERT INTO bench (text) VALUES (%s)",
+            [(f"Комментарий {number}" * 4,) for number in range(rows)],
+        )
+    connections[ALIAS].close()
+
+
+def _reader(connections, rows, deadline, stats):
+    rnd = random.Random()
+    with connections[ALIAS].cursor() as cursor:
+        while time.perf_counter() < deadline:
+            first = rnd.randrange(1, rows)
+            started = time.perf_counter()
+            try:
+                cursor.execute(
+                    "SELECT id, text FROM bench WHERE id BETWEEN %s AND %s",
+                    [first, first + 20],
+                )
+                cursor.fetchall()
+            except OperationalError:
+                stats["errors"] += 1
+                continue
+            stats["reads"].append((time.perf_counter() - started) * 1000)
+    connections[ALIAS].close()
+
+
+def _writer(connections, deadline, stats):
+    with connections[ALIAS].cursor() as cursor:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.executemany(
+                    "INSERT INTO bench (text) VALUES (%s)",
+                    [("Новый комментарий",)] * WRITE_BATCH,
+                )
+                cursor.execute("COMMIT")
+            except OperationalError:
+                stats["errors"] += 1
+                if connections[ALIAS].connection.in_transaction:
+                    cursor.execute("ROLLBACK")
+                continue
+            stats["writes"].append((time.perf_counter() - started) * 1000)
+    connections[ALIAS].close()
+
+
+def run_profile(profile, seconds=5.0, readers=4, writers=2, rows=10000):
+    """
+    Читатели выбирают по 20 строк по первичному ключу, пока писатели
+    вставляют строки транзакциями по WRITE_BATCH, все в своих потоках
+    и соединениях с настройками профиля базы из DATABASE_PROFILES.
+    Возвращает число чтений и записей в секунду, их p50/p99 и число
+    ошибок блокировки.
+    """
+    directory = tempfile.mkdtemp(prefix="blogicum-concurrency-")
+    path = os.path.join(directory, "bench.sqlite3")
+    connections = _connections(profile, path)
+    _seed(connections, rows)
+    stats = {"reads": [], "writes": [], "errors": 0}
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(
+            target=_reader, args=(connections, rows, deadline, stats)
+        )
+        for _ in range(readers)
+    ] + [
+        threading.Thread(target=_writer, args=(connections, deadline, stats))
+        for _ in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+    return {
+        "reads_per_s": round(len(stats["reads"]) / seconds, 1),
+        "writes_per_s": round(
+            len(stats["writes"]) * WRITE_BATCH / seconds, 1
+        ),
+        "read_p50_ms": _percentile(stats["reads"], 0.5),
+        "read_p99_ms": _percentile(stats["reads"], 0.99),
+        "write_p99_ms": _percentile(stats["writes"], 0.99),
+        "errors": stats["errors"],
+    }
+
+
+def run(profiles=None, **options):
+    """Результаты run_profile() для каждого профиля базы."""
+    return {
+        profile: run_profile(profile, **options)
+        for profile in profiles or settings.DATABASE_PROFILES
+    }
@@ -0,0 +1,115 @@
+import os
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.backends.sqlite3 import base
+
+from core.writes import write_lock
+
+Database = base.Database
+
+# Настройки соединения для рабочего сервера. WAL позволяет читать во
+# время записи; synchronous=NORMAL в режиме WAL не портит базу при сбое,
+# но может потерять последние транзакции при отключении питания.
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    # Отрицательное значение — размер в КиБ, а не в страницах.
+    "cache_size": -64 * 1024,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite с настройками PRAGMAS для каждого нового соединения.
+    OPTIONS["pragmas"] дополняет и переопределяет их, а
+    OPTIONS["health_checks"] проверяет постоянное соединение
+    (CONN_MAX_AGE) в начале и конце каждого запроса: соединение
+    с ошибкой или с файлом базы, подменённым после восстановления из
+    копии, закрывается и открывается заново.
+    Транзакции основной базы держат блокировку записи
+    (core.writes.write_lock) от BEGIN до COMMIT или ROLLBACK.
+    """
+
+    transaction_write_lock = None
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {**PRAGMAS, **params.pop("pragmas", {})}
+        self.health_checks = params.pop("health_checks", False)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        self.inode = self.get_inode()
+        return conn
+
+    def get_inode(self):
+        """Номер файла базы или None для базы в памяти."""
+        if self.is_in_memory_db():
+            return None
+        try:
+            return os.stat(self.settings_dict["NAME"]).st_ino
+        except OSError:
+            return None
+
+    def is_usable(self):
+        try:
+            self.connection.execute("SELECT 1")
+        except Database.Error:
+            return False
+        return self.get_inode() == self.inode
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        if (
+            self.connection is not None
+            and self.health_checks
+            and not self.in_atomic_block
+            and not self.is_usable()
+        ):
+            self.close()
+
+    def set_autocommit(self, autocommit, *args, **kwargs):
+        """
+        Внешний atomic() начинает транзакцию, выключая автофиксацию, и
+        заканчивает её, включая обратно. Блокировка записи берётся здесь
+        же: запись внутри чужой транзакции (например, транзакции
+        админки) иначе отпускала бы её раньше COMMIT.
+        """
+        if (
+            not autocommit
+            and self.alias == DEFAULT_DB_ALIAS
+            and self.transaction_write_lock is None
+        ):
+            # Новое соединение само включает автофиксацию: оно
+            # открывается до блокировки, чтобы не отпустить её сразу.
+            self.ensure_connection()
+            self.transaction_write_lock = write_lock()
+            self.transaction_write_lock.__enter__()
+            try:
+                super().set_autocommit(autocommit, *args, **kwargs)
+            except BaseException:
+                self.release_write_lock()
+                raise
+            return
+        super().set_autocommit(autocommit, *args, **kwargs)
+        if autocommit:
+            self.release_write_lock()
+
+    def close(self):
+        # Соединение, закрытое посреди транзакции, автофиксацию уже не
+        # включит.
+        try:
+            super().close()
+        finally:
+            self.release_write_lock()
+
+    def release_write_lock(self):
+        lock, self.transaction_write_lock = self.transaction_write_lock, None
+        if lock is not None:
+            lock.__exit__(None, None, None)
@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import Counter
+
+# Верхние границы корзин гистограммы времени ответа, миллисекунды.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, float("inf"))
+
+_lock = threading.Lock()
+_histogram = {}
+
+
+class RequestMetrics:
+    """
+    Замеры одного запроса: время в БД, время отрисовки шаблона, число
+    запросов и повторы — одинаковые SQL с одинаковыми параметрами.
+    Метод execute подключается через connection.execute_wrapper.
+    Запросы дольше slow_ms миллисекунд собираются в slow.
+    """
+
+    def __init__(self, slow_ms=None):
+        self.started = time.perf_counter()
+        self.slow_after = None if slow_ms is None else slow_ms / 1000
+        self.slow = []
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.queries = 0
+        self.statements = Counter()
+        self._render_started = None
+        self._render_db_seconds = 0.0
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.db_seconds += elapsed
+            self.queries += 1
+            if self.slow_after is not None and elapsed >= self.slow_after:
+                self.slow.append((sql, params, elapsed * 1000))
+            if not many:
+                try:
+                    self.statements[sql, tuple(params or ())] += 1
+                except TypeError:
+                    self.statements[sql, repr(params)] += 1
+
+    def render_started(self):
+        self._render_started = time.perf_counter()
+        self._render_db_seconds = self.db_seconds
+
+    def render_finished(self):
+        if self._render_started is None:
+            return
+        # Ленивые выборки выполняются во время отрисовки: их время уже
+        # учтено в БД.
+        self.template_seconds += (
+            time.perf_counter()
+            - self._render_started
+            - (self.db_seconds - self._render_db_seconds)
+        )
+        self._render_started = None
+
+    @property
+    def duplicates(self):
+        """Сколько запросов повторили уже выполненный."""
+        return sum(count - 1 for count in self.statements.values())
+
+    def server_timing(self, total_seconds):
+        """Значение заголовка Server-Timing."""
+        parts = [
+            f"total;dur={total_seconds * 1000:.1f}",
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} '
+            f'queries"',
+            f"tpl;dur={self.template_seconds * 1000:.1f}",
+        ]
+        if self.duplicates:
+            parts.append(f'dup;desc="{self.duplicates} duplicate queries"')
+        return ", ".join(parts)
+
+
+def record(view_name, metrics, total_seconds):
+    """Добавляет замеры запроса в гистограмму процесса."""
+    total_ms = total_seconds * 1000
+    bucket = next(i for i, bound in enumerate(BUCKETS_MS) if total_ms <= bound)
+    with _lock:
+        entry = _histogram.get(view_name)
+        if entry is None:
+            entry = _histogram[view_name] = {
+                "buckets": [0] * len(BUCKETS_MS),
+                "count": 0,
+                "total_ms": 0.0,
+                "db_ms": 0.0,
+                "template_ms": 0.0,
+                "queries": 0,
+                "with_duplicates": 0,
+            }
+        entry["buckets"][bucket] += 1
+        entry["count"] += 1
+        entry["total_ms"] += total_ms
+        entry["db_ms"] += metrics.db_seconds * 1000
+        entry["template_ms"] += metrics.template_seconds * 1000
+        entry["queries"] += metrics.queries
+        entry["with_duplicates"] += bool(metrics.duplicates)
+
+
+def _percentile(buckets, count, share):
+    # Верхняя граница корзины, в которую попадает нужный по счёту запрос.
+    rank = share * count
+    seen = 0
+    for bound, hits in zip(BUCKETS_MS, buckets):
+        seen += hits
+        if seen >= rank:
+            return bound if bound != float("inf") else None
+    return None
+
+
+def request_stats():
+    """
+    Сводка по представлениям с момента запуска процесса: число запросов,
+    средние времена, оценки p50/p95 по корзинам гистограммы (None —
+    дольше последней границы) и доля ответов с повторными запросами.
+    """
+    with _lock:
+        snapshot = {
+            name: {**entry, "buckets": list(entry["buckets"])}
+            for name, entry in _histogram.items()
+        }
+    stats = {}
+    for name, entry in sorted(snapshot.items()):
+        count = entry["count"]
+        stats[name] = {
+            "count": count,
+            "avg_ms": entry["total_ms"] / count,
+            "avg_db_ms": entry["db_ms"] / count,
+            "avg_template_ms": entry["template_ms"] / count,
+            "avg_queries": entry["queries"] / count,
+            "p50_ms": _percentile(entry["buckets"], count, 0.5),
+            "p95_ms": _percentile(entry["buckets"], count, 0.95),
+            "duplicate_ratio": entry["with_duplicates"] / count,
+            "histogram": {
+                ("inf" if bound == float("inf") else f"le_{bound}"): hits
+                for bound, hits in zip(BUCKETS_MS, entry["buckets"])
+            },
+        }
+    return stats
+
+
+def reset_request_stats():
+    with _lock:
+        _histogram.clear()
@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.db.benchmark import run
+
+COLUMNS = (
+    "reads_per_s",
+    "writes_per_s",
+    "read_p50_ms",
+    "read_p99_ms",
+    "write_p99_ms",
+    "errors",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает профили базы: пропускную способность чтения из "
+        "нескольких потоков во время записи."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile",
+            action="append",
+            dest="profiles",
+            help="Профиль из DATABASE_PROFILES (по умолчанию все).",
+        )
+        parser.add_argument(
+            "--seconds",
+            type=float,
+            default=5.0,
+            help="Длительность прогона каждого профиля.",
+        )
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=10000,
+            help="Строк в таблице перед началом прогона.",
+        )
+
+    def handle(self, *args, **options):
+        profiles = options["profiles"]
+        unknown = set(profiles or ()) - set(settings.DATABASE_PROFILES)
+        if unknown:
+            raise CommandError(f"Неизвестные профили: {', '.join(unknown)}.")
+        results = run(
+            profiles,
+            seconds=options["seconds"],
+            readers=options["readers"],
+            writers=options["writers"],
+            rows=options["rows"],
+        )
+        self.stdout.write(
+            f"{'profile':<12}" + "".join(f"{name:>14}" for name in COLUMNS)
+        )
+        for profile, result in results.items():
+            self.stdout.write(
+                f"{profile:<12}"
+                + "".join(f"{str(result[name]):>14}" for name in COLUMNS)
+            )
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.tasks import prune_finished, requeue_stale, run_pending
+
+
+class Command(BaseCommand):
+    help = "Выполняет задачи фоновой очереди."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить готовые задачи и завершиться.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1.0,
+            help="Пауза в секундах, когда очередь пуста.",
+        )
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=100,
+            help="Сколько задач выполнить между обслуживанием очереди.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                requeue_stale()
+                prune_finished()
+                processed = run_pending(limit=options["batch"])
+                if processed:
+                    self.stdout.write(f"Выполнено задач: {processed}")
+                if options["once"] and processed < options["batch"]:
+                    break
+                if not processed:
+                    close_old_connections()
+                    time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
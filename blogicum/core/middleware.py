@@ -0,0 +1,66 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from . import slow_queries
+from .instrumentation import RequestMetrics, record
+from .tasks import record_slow_queries
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTimingMiddleware:
+    """
+    Замеряет каждый запрос: время в БД через execute_wrapper, время
+    отрисовки TemplateResponse, число запросов и повторы. Итог уходит в
+    заголовок Server-Timing и в гистограмму процесса по имени
+    представления. Шаблоны, отрисованные в самом представлении через
+    render(), попадают во время представления. Запросы дольше
+    BLOG_SLOW_QUERY_MS передаются фоновой задаче, которая снимает с них
+    EXPLAIN вне ответа. Должен стоять первым в MIDDLEWARE, чтобы учесть
+    остальные.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = settings.BLOG_REQUEST_TIMING
+        slow_ms = settings.BLOG_SLOW_QUERY_MS
+        if not timing and slow_ms is None:
+            return self.get_response(request)
+        metrics = RequestMetrics(slow_ms)
+        if timing:
+            request._request_metrics = metrics
+        with connection.execute_wrapper(metrics.execute):
+            response = self.get_response(request)
+        total = time.perf_counter() - metrics.started
+        match = request.resolver_match
+        view_name = match.view_name if match else "<unresolved>"
+        if timing:
+            response["Server-Timing"] = metrics.server_timing(total)
+            record(view_name, metrics, total)
+        if metrics.slow:
+            self.log_slow_queries(view_name, metrics.slow)
+        return response
+
+    def process_template_response(self, request, response):
+        metrics = getattr(request, "_request_metrics", None)
+        if metrics is not None:
+            metrics.render_started()
+            response.add_post_render_callback(
+                lambda response: metrics.render_finished()
+            )
+        return response
+
+    @staticmethod
+    def log_slow_queries(view_name, queries):
+        try:
+            record_slow_queries.enqueue(
+                view_name, slow_queries.prepare(queries)
+            )
+        except DatabaseError:
+            # Журнал не должен ронять ответ, например при занятой базе.
+            logger.exception("Не удалось записать медленные запросы")
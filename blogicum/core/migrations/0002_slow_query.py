@@ -0,0 +1,35 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:12
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=32, unique=True, verbose_name='Отпечаток')),
+                ('statement', models.TextField(help_text='SQL без значений параметров.', verbose_name='Запрос')),
+                ('sample', models.TextField(help_text='Последний запрос с параметрами.', verbose_name='Пример')),
+                ('plan', models.TextField(blank=True, verbose_name='План запроса')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Раз')),
+                ('total_ms', models.FloatField(default=0, verbose_name='Всего, мс')),
+                ('max_ms', models.FloatField(default=0, verbose_name='Максимум, мс')),
+                ('last_view', models.CharField(blank=True, max_length=256, verbose_name='Представление')),
+                ('first_seen', models.DateTimeField(auto_now_add=True, verbose_name='Впервые')),
+                ('last_seen', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Последний раз')),
+            ],
+            options={
+                'verbose_name': 'медленный запрос',
+                'verbose_name_plural': 'Медленные запросы',
+                'ordering': ('-total_ms',),
+            },
+        ),
+    ]
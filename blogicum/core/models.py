@@ -1,7 +1,10 @@
 from django.db import models
+from django.utils import timezone
 
+from .writes import SerializedWriteMixin
 
-class BaseModel(models.Model):
+
+class BaseModel(SerializedWriteMixin, models.Model):
     is_published = models.BooleanField(
         default=True,
         verbose_name="Опубликовано",
@@ -13,3 +16,111 @@ class BaseModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class Task(SerializedWriteMixin, models.Model):
+    """Отложенная задача фоновой очереди, см. core.tasks."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = (
+        (QUEUED, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Выполнена"),
+        (FAILED, "Ошибка"),
+    )
+
+    name = models.CharField(max_length=256, verbose_name="Задача")
+    payload = models.JSONField(
+        default=dict, verbose_name="Аргументы", help_text="args и kwargs."
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUSES,
+        default=QUEUED,
+        verbose_name="Состояние",
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name="Попыток"
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=5, verbose_name="Максимум попыток"
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now, verbose_name="Не раньше"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name="Добавлена"
+    )
+    started_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Начата"
+    )
+    finished_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Завершена"
+    )
+    last_error = models.TextField(
+        blank=True, default="", verbose_name="Последняя ошибка"
+    )
+
+    class Meta:
+        verbose_name = "фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        # Воркер выбирает из очереди только готовые к запуску задачи,
+        # а метрики считают время выполнения по недавним.
+        indexes = (
+            models.Index(
+                fields=("run_after", "id"),
+                condition=models.Q(status="queued"),
+                name="task_queued_idx",
+            ),
+            models.Index(
+                fields=("status", "finished_at"),
+                name="task_status_finished_idx",
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.name} #{self.pk}"
+
+
+class SlowQuery(SerializedWriteMixin, models.Model):
+    """Медленные запросы к БД, сгруппированные по отпечатку SQL, см.
+    core.slow_queries.
+    """
+
+    fingerprint = models.CharField(
+        max_length=32, unique=True, verbose_name="Отпечаток"
+    )
+    statement = models.TextField(
+        verbose_name="Запрос", help_text="SQL без значений параметров."
+    )
+    sample = models.TextField(
+        verbose_name="Пример", help_text="Последний запрос с параметрами."
+    )
+    plan = models.TextField(blank=True, verbose_name="План запроса")
+    count = models.PositiveIntegerField(default=0, verbose_name="Раз")
+    total_ms = models.FloatField(default=0, verbose_name="Всего, мс")
+    max_ms = models.FloatField(default=0, verbose_name="Максимум, мс")
+    last_view = models.CharField(
+        max_length=256, blank=True, verbose_name="Представление"
+    )
+    first_seen = models.DateTimeField(
+        auto_now_add=True, verbose_name="Впервые"
+    )
+    last_seen = models.DateTimeField(
+        default=timezone.now, db_index=True, verbose_name="Последний раз"
+    )
+
+    class Meta:
+        verbose_name = "медленный запрос"
+        verbose_name_plural = "Медленные запросы"
+        ordering = ("-total_ms",)
+
+    def __str__(self):
+        return self.statement[:80]
+
+    @property
+    def avg_ms(self):
+        return self.total_ms / self.count if self.count else 0.0
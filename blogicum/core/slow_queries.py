@@ -0,0 +1,131 @@
+import datetime
+import decimal
+import hashlib
+import re
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import SlowQuery
+from .writes import serialized_write
+
+# Сколько медленных запросов одного ответа отправляется в журнал.
+MAX_PER_REQUEST = 20
+
+_STRING_RE = re.compile(r"'(?:''|[^'])*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST_RE = re.compile(r"\(\?(?:, \?)*\)")
+_ROWS_RE = re.compile(r"\(\.\.\.\)(?:, \(\.\.\.\))+")
+_SPACE_RE = re.compile(r"\s+")
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def normalize(sql):
+    """
+    SQL без значений: литералы и параметры заменяются на ?, списки
+    IN (...) и VALUES любой длины сворачиваются. Запросы, отличающиеся
+    только значениями, получают одинаковый текст.
+    """
+    sql = _STRING_RE.sub("?", sql).replace("%s", "?")
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _ROWS_RE.sub("(...), ...", _LIST_RE.sub("(...)", sql))
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def fingerprint(statement):
+    return hashlib.md5(statement.encode()).hexdigest()
+
+
+def _json_safe(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return repr(value)
+
+
+def prepare(queries):
+    """Медленные запросы ответа в виде, пригодном для аргументов задачи."""
+    return [
+        [sql, _json_safe(list(params or ())), round(duration_ms, 3)]
+        for sql, params, duration_ms in queries[:MAX_PER_REQUEST]
+    ]
+
+
+def explain(sql, params):
+    """План запроса (EXPLAIN QUERY PLAN в SQLite) в виде дерева строк."""
+    if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return ""
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql}", params)
+            rows = cursor.fetchall()
+    except Exception as error:
+        return f"EXPLAIN не выполнен: {error}"
+    if connection.vendor != "sqlite":
+        return "\n".join(" ".join(map(str, row)) for row in rows)
+    # Строки SQLite: id, parent, notused, detail.
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + detail)
+    return "\n".join(lines)
+
+
+@serialized_write
+def record(view_name, queries):
+    """
+    Добавляет медленные запросы в журнал: счётчики копятся по отпечатку,
+    план пересчитывается по последнему примеру. Журнал хранит не больше
+    BLOG_SLOW_QUERY_KEEP отпечатков, самые давние вытесняются.
+    """
+    grouped = defaultdict(list)
+    for sql, params, duration_ms in queries:
+        grouped[normalize(sql)].append((sql, params, duration_ms))
+    now = timezone.now()
+    for statement, samples in grouped.items():
+        sql, params, _ = samples[-1]
+        durations = [duration_ms for _, _, duration_ms in samples]
+        values = {
+            "sample": f"{sql}\n-- {params!r}",
+            "plan": explain(sql, params),
+            "last_view": view_name,
+            "last_seen": now,
+        }
+        digest = fingerprint(statement)
+        updated = SlowQuery.objects.filter(fingerprint=digest).update(
+            count=F("count") + len(durations),
+            total_ms=F("total_ms") + sum(durations),
+            max_ms=Greatest(F("max_ms"), max(durations)),
+            **values,
+        )
+        if updated:
+            continue
+        try:
+            with transaction.atomic():
+                SlowQuery.objects.create(
+                    fingerprint=digest,
+                    statement=statement,
+                    count=len(durations),
+                    total_ms=sum(durations),
+                    max_ms=max(durations),
+                    **values,
+                )
+        except IntegrityError:
+            # Другой воркер успел создать запись: учтём в ней.
+            record(view_name, samples)
+    stale = SlowQuery.objects.order_by("-last_seen").values_list(
+        "pk", flat=True
+    )[settings.BLOG_SLOW_QUERY_KEEP:]
+    SlowQuery.objects.filter(pk__in=list(stale)).delete()
@@ -0,0 +1,224 @@
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import slow_queries
+from .models import Task
+from .writes import serialized_write
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+class TaskFunction:
+    """Обёртка зарегистрированной задачи: вызывается как обычная функция,
+    а enqueue() ставит вызов в очередь.
+    """
+
+    def __init__(self, func, max_attempts):
+        self.func = func
+        self.max_attempts = max_attempts
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, delay=None, **kwargs):
+        """
+        Записывает задачу в очередь и возвращает её. Запись идёт в
+        текущей транзакции: задача появится у воркера только вместе с
+        данными, которые её породили. При BLOG_TASKS_EAGER задача
+        выполняется сразу после фиксации транзакции в этом же процессе.
+        """
+        task = Task.objects.create(
+            name=self.name,
+            payload={"args": list(args), "kwargs": kwargs},
+            max_attempts=self.max_attempts,
+            run_after=timezone.now() + (delay or timedelta()),
+        )
+        if settings.BLOG_TASKS_EAGER:
+            transaction.on_commit(lambda: run_task(claim(task.pk)))
+        return task
+
+
+def task(func=None, *, max_attempts=5):
+    """Регистрирует функцию как фоновую задачу. Аргументы задачи должны
+    сериализоваться в JSON.
+    """
+    if func is None:
+        return lambda func: task(func, max_attempts=max_attempts)
+    wrapper = TaskFunction(func, max_attempts)
+    _registry[wrapper.name] = wrapper
+    return wrapper
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед повтором с небольшим разбросом,
+    чтобы упавшие вместе задачи не повторялись одновременно.
+    """
+    base = settings.BLOG_TASKS_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(
+        seconds=min(base, settings.BLOG_TASKS_MAX_RETRY_DELAY)
+        * random.uniform(1, 1.25)
+    )
+
+
+@serialized_write
+def claim(task_id, now=None):
+    """
+    Захватывает задачу из очереди. В SQLite нет SELECT ... FOR UPDATE,
+    поэтому задачу забирает тот воркер, чей условный UPDATE изменил
+    строку; остальные получают None.
+    """
+    now = now or timezone.now()
+    claimed = Task.objects.filter(pk=task_id, status=Task.QUEUED).update(
+        status=Task.RUNNING, started_at=now, attempts=F("attempts") + 1
+    )
+    return Task.objects.get(pk=task_id) if claimed else None
+
+
+def claim_next(now=None):
+    """Захватывает самую старую задачу, время запуска которой наступило."""
+    now = now or timezone.now()
+    candidates = (
+        Task.objects.filter(status=Task.QUEUED, run_after__lte=now)
+        .order_by("run_after", "id")
+        .values_list("pk", flat=True)
+    )
+    for task_id in candidates[:10]:
+        task = claim(task_id, now)
+        if task is not None:
+            return task
+    return None
+
+
+def run_task(task):
+    """
+    Выполняет захваченную задачу. Упавшая задача возвращается в очередь
+    с задержкой, пока не исчерпает попытки; задача, которую нельзя
+    выполнить, сразу помечается ошибкой.
+    """
+    if task is None:
+        return None
+    func = _registry.get(task.name)
+    try:
+        if func is None:
+            raise LookupError(f"Задача {task.name} не зарегистрирована")
+        func(*task.payload.get("args", ()), **task.payload.get("kwargs", {}))
+    except Exception:
+        task.last_error = traceback.format_exc()
+        if func is not None and task.attempts < task.max_attempts:
+            task.status = Task.QUEUED
+            task.run_after = timezone.now() + retry_delay(task.attempts)
+            logger.warning("Задача %s упала, повтор позже", task)
+        else:
+            task.status = Task.FAILED
+            task.finished_at = timezone.now()
+            logger.exception("Задача %s не выполнена", task)
+    else:
+        task.status = Task.DONE
+        task.finished_at = timezone.now()
+        task.last_error = ""
+    task.save(
+        update_fields=["status", "run_after", "finished_at", "last_error"]
+    )
+    return task
+
+
+def run_pending(limit=None):
+    """Выполняет готовые задачи, пока очередь не опустеет. Возвращает
+    число выполненных попыток.
+    """
+    processed = 0
+    while limit is None or processed < limit:
+        task = claim_next()
+        if task is None:
+            break
+        run_task(task)
+        processed += 1
+    return processed
+
+
+@serialized_write
+def requeue_stale(now=None):
+    """Возвращает в очередь задачи, воркер которых завис или погиб."""
+    now = now or timezone.now()
+    timeout = timedelta(seconds=settings.BLOG_TASKS_STALE_AFTER)
+    return Task.objects.filter(
+        status=Task.RUNNING, started_at__lt=now - timeout
+    ).update(status=Task.QUEUED, run_after=now)
+
+
+@serialized_write
+def prune_finished(now=None):
+    """Удаляет выполненные задачи старше BLOG_TASKS_KEEP_DONE секунд."""
+    now = now or timezone.now()
+    deleted, _ = Task.objects.filter(
+        status=Task.DONE,
+        finished_at__lt=now - timedelta(seconds=settings.BLOG_TASKS_KEEP_DONE),
+    ).delete()
+    return deleted
+
+
+def _percentile(values, share):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def task_queue_stats(window=timedelta(hours=1)):
+    """
+    Глубина очереди, число упавших задач и задержки выполненных за
+    последний час задач в секундах: от постановки в очередь до
+    завершения и время самой работы.
+    """
+    now = timezone.now()
+    queued = Task.objects.filter(status=Task.QUEUED)
+    oldest = queued.filter(run_after__lte=now).order_by("run_after").first()
+    finished = Task.objects.filter(
+        status=Task.DONE, finished_at__gte=now - window
+    ).values_list("created_at", "started_at", "finished_at")
+    latencies, durations = [], []
+    for created_at, started_at, finished_at in finished:
+        latencies.append((finished_at - created_at).total_seconds())
+        durations.append((finished_at - started_at).total_seconds())
+    latencies.sort()
+    durations.sort()
+    return {
+        "queued": queued.count(),
+        "due": queued.filter(run_after__lte=now).count(),
+        "running": Task.objects.filter(status=Task.RUNNING).count(),
+        "failed": Task.objects.filter(status=Task.FAILED).count(),
+        "oldest_due_s": (
+            (now - oldest.run_after).total_seconds() if oldest else 0.0
+        ),
+        "done_last_hour": len(latencies),
+        "latency_p50_s": _percentile(latencies, 0.5),
+        "latency_p95_s": _percentile(latencies, 0.95),
+        "run_p50_s": _percentile(durations, 0.5),
+        "run_p95_s": _percentile(durations, 0.95),
+    }
+
+
+@task
+def send_email(subject, body, from_email, recipients, html_body=None):
+    """Отправляет письмо через настроенный EMAIL_BACKEND."""
+    message = EmailMultiAlternatives(subject, body, from_email, recipients)
+    if html_body is not None:
+        message.attach_alternative(html_body, "text/html")
+    message.send()
+
+
+@task(max_attempts=1)
+def record_slow_queries(view_name, queries):
+    """Записывает медленные запросы ответа в журнал с их планами."""
+    slow_queries.record(view_name, queries)
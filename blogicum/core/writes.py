@@ -0,0 +1,155 @@
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+
+try:
+    import fcntl
+except ImportError:  # Windows: только блокировка внутри процесса.
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_process_lock = threading.RLock()
+_local = threading.local()
+_lock_file = None
+_lock_file_pid = None
+
+
+def is_locked_error(error):
+    return "locked" in str(error)
+
+
+def lock_path():
+    """
+    Файл межпроцессной блокировки записи: BLOG_WRITE_LOCK_PATH или
+    файл рядом с базой. У базы в памяти других процессов нет.
+    """
+    if settings.BLOG_WRITE_LOCK_PATH:
+        return str(settings.BLOG_WRITE_LOCK_PATH)
+    if connection.vendor != "sqlite" or connection.is_in_memory_db():
+        return None
+    return f"{connection.settings_dict['NAME']}.write-lock"
+
+
+def _open_lock_file(path):
+    global _lock_file, _lock_file_pid
+    # После fork открытый файл общий с родителем, и flock перестал бы
+    # различать процессы.
+    if _lock_file is None or _lock_file_pid != os.getpid():
+        _lock_file = open(path, "a")
+        _lock_file_pid = os.getpid()
+    return _lock_file
+
+
+def _acquire_file_lock(lock_file):
+    deadline = time.monotonic() + settings.BLOG_WRITE_LOCK_TIMEOUT
+    delay = 0.0005
+    while True:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, 0.01)
+
+
+@contextmanager
+def write_lock():
+    """
+    Даёт писать в базу одному потоку на все процессы сайта: внутри
+    процесса — RLock, между процессами — flock на файле lock_path().
+    Вложенные вызовы в том же потоке ничего не ждут. Если блокировку
+    не удалось получить за BLOG_WRITE_LOCK_TIMEOUT секунд, запись идёт
+    без неё: её защищает повтор в run_serialized().
+    """
+    depth = getattr(_local, "depth", 0)
+    if depth or not settings.BLOG_WRITE_LOCK:
+        _local.depth = depth + 1
+        try:
+            yield
+        finally:
+            _local.depth = depth
+        return
+    with _process_lock:
+        path = lock_path() if fcntl is not None else None
+        lock_file = _open_lock_file(path) if path else None
+        locked = lock_file is not None and _acquire_file_lock(lock_file)
+        if lock_file is not None and not locked:
+            logger.warning("Не дождались блокировки записи %s", path)
+        _local.depth = 1
+        try:
+            yield
+        finally:
+            _local.depth = 0
+            if locked:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def retry_delay(attempt):
+    """Экспоненциальная пауза перед повтором с небольшим разбросом."""
+    return (
+        settings.BLOG_WRITE_RETRY_DELAY * 2 ** attempt
+        * random.uniform(1, 1.25)
+    )
+
+
+def run_serialized(func, *args, **kwargs):
+    """
+    Выполняет func под write_lock() в транзакции. Если база занята
+    писателем вне блокировки (воркер задач, команда управления),
+    транзакция откатывается и повторяется до BLOG_WRITE_RETRIES раз с
+    растущей паузой. Внутри уже открытой транзакции повторять нечего:
+    откатить можно только её целиком, поэтому ошибка передаётся выше.
+    """
+    nested = getattr(_local, "depth", 0) or connection.in_atomic_block
+    with write_lock():
+        attempt = 0
+        while True:
+            try:
+                with transaction.atomic():
+                    return func(*args, **kwargs)
+            except OperationalError as error:
+                if (
+                    nested
+                    or not is_locked_error(error)
+                    or attempt >= settings.BLOG_WRITE_RETRIES
+                ):
+                    raise
+                logger.info("База занята, повтор записи: %s", error)
+                time.sleep(retry_delay(attempt))
+                attempt += 1
+
+
+def serialized_write(func):
+    """Декоратор: функция пишет в базу через run_serialized()."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return run_serialized(func, *args, **kwargs)
+
+    return wrapper
+
+
+class SerializedWriteMixin:
+    """
+    Примесь модели: save() и delete() выполняются через
+    run_serialized() вместе с обработчиками сигналов, которые правят
+    счётчики и сводки. Повторяется только запись в базу, а не всё
+    представление: файлы, загруженные формой, к этому моменту уже
+    сохранены и повтор их не трогает.
+    """
+
+    def save(self, *args, **kwargs):
+        return run_serialized(super().save, *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return run_serialized(super().delete, *args, **kwargs)
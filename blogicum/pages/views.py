@@ -1,6 +1,8 @@
 from django.shortcuts import render
 from django.views.generic import TemplateView
 
+from core.cache import AnonymousPageCacheMixin
+
 
 def page_not_found(request, exception):
     return render(request, "pages/404.html", status=404)
@@ -14,13 +16,13 @@ def csrf_failure(request, reason=""):
     return render(request, "pages/403csrf.html", status=403)
 
 
-class AboutView(TemplateView):
+class AboutView(AnonymousPageCacheMixin, TemplateView):
     """Обработчик страницы "О нас"."""
 
     template_name = "pages/about.html"
 
 
-class RulesView(TemplateView):
+class RulesView(AnonymousPageCacheMixin, TemplateView):
     """Обработчик страницы "Правила"."""
 
     template_name = "pages/rules.html"
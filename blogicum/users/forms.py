@@ -0,0 +1,34 @@
+from django.contrib.auth.forms import PasswordResetForm
+from django.template import loader
+
+from core.tasks import send_email
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Письмо для сброса пароля собирается в запросе, а отправляется
+    фоновой задачей.
+    """
+
+    def send_mail(
+            self,
+            subject_template_name,
+            email_template_name,
+            context,
+            from_email,
+            to_email,
+            html_email_template_name=None,
+    ):
+        subject = loader.render_to_string(subject_template_name, context)
+        body = loader.render_to_string(email_template_name, context)
+        html_body = None
+        if html_email_template_name is not None:
+            html_body = loader.render_to_string(
+                html_email_template_name, context
+            )
+        send_email.enqueue(
+            "".join(subject.splitlines()),
+            body,
+            from_email,
+            [to_email],
+            html_body=html_body,
+        )
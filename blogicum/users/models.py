@@ -1,11 +1,14 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from core.writes import SerializedWriteMixin
 
-class User(AbstractUser):
+
+class User(SerializedWriteMixin, AbstractUser):
     about_me = models.TextField(
         verbose_name="Биография", blank=True, default=""
     )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Изменён")
 
     def __str__(self):
         return self.username
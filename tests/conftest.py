@@ -1,6 +1,7 @@
 import os
 import re
 import time
+from datetime import timedelta
 from http import HTTPStatus
 from inspect import getsource
 from pathlib import Path
@@ -19,11 +20,15 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
 from django.test import override_settings
 from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from mixer.backend.django import mixer as _mixer
 
 N_PER_FIXTURE = 3
@@ -41,6 +46,52 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Откат транзакции теста не вызывает сигналов, поэтому кешированные
+    # страницы и фрагменты иначе пережили бы тест.
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture
+def no_publication_timer(settings):
+    # Проверка отложенных публикаций добавляла бы запросы к случайному
+    # запросу теста.
+    settings.BLOG_PUBLICATION_CHECK_INTERVAL = None
+
+
+@pytest.fixture
+def no_page_cache(settings, no_publication_timer):
+    # Проверяется само представление, а не закешированная страница.
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+
+
+def blend_posts(mixer, count, **kwargs):
+    """Опубликованные посты со своими автором, категорией и
+    местоположением, чтобы ленивые обращения к связям дали по запросу на
+    карточку.
+    """
+    return mixer.cycle(count).blend(
+        "blog.Post",
+        pub_date=timezone.now() - timedelta(days=1),
+        category__is_published=True,
+        location__is_published=True,
+        **kwargs,
+    )
+
+
+def count_queries(client, url, containing=""):
+    """Число запросов страницы, в SQL которых есть containing, и ответ."""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    count = sum(
+        containing in query["sql"] for query in queries.captured_queries
+    )
+    return count, response
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -363,6 +414,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,148 @@
+from datetime import timedelta
+
+import pytest
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Comment
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("no_publication_timer"),
+]
+
+
+@pytest.fixture
+def live_posts(mixer: Mixer, user, published_category, published_location):
+    now = timezone.now()
+    return [
+        mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            location=published_location,
+            pub_date=now - timedelta(hours=hours),
+        )
+        for hours in range(1, 6)
+    ]
+
+
+def _get(client, url, **params):
+    response = client.get(url, params)
+    assert response.status_code == 200, response.content
+    return response.json()
+
+
+def test_posts_are_paginated_by_cursor(client, live_posts, mixer: Mixer):
+    mixer.blend(
+        "blog.Post",
+        is_published=False,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    page = _get(client, "/api/posts/", limit=2)
+    ids = [post["id"] for post in page["results"]]
+    while page["next"]:
+        page = _get(client, page["next"])
+        ids += [post["id"] for post in page["results"]]
+    assert ids == [post.id for post in live_posts]
+
+
+def test_sparse_fields_narrow_the_select(client, live_posts):
+    with CaptureQueriesContext(connection) as queries:
+        page = _get(client, "/api/posts/", fields="id,title")
+    assert set(page["results"][0]) == {"id", "title"}
+    sql = queries.captured_queries[-1]["sql"]
+    assert '"blog_post"."text"' not in sql
+    assert "JOIN" not in sql
+
+    post = _get(client, f"/api/posts/{live_posts[0].id}/", fields="author")
+    assert post == {"author": live_posts[0].author.username}
+    response = client.get("/api/posts/", {"fields": "id,password"})
+    assert response.status_code == 400
+
+
+def test_multi_get_keeps_requested_order(client, live_posts):
+    ids = [live_posts[2].id, 999999, live_posts[0].id]
+    data = _get(
+        client, "/api/posts/", ids=",".join(map(str, ids)), fields="id"
+    )
+    assert [post["id"] for post in data["results"]] == [ids[0], ids[2]]
+    assert data["missing"] == [999999]
+    assert client.get("/api/posts/", {"ids": "1,x"}).status_code == 400
+
+
+def test_hidden_data_is_not_exposed(
+        client, mixer: Mixer, live_posts, user, published_location
+):
+    published_location.is_published = False
+    published_location.save()
+    post = _get(client, f"/api/posts/{live_posts[0].id}/")
+    assert post["location"] is None
+    profile = _get(client, f"/api/users/{user.id}/")
+    assert profile["username"] == user.username
+    assert "email" not in profile and "password" not in profile
+    hidden = mixer.blend(
+        "blog.Post",
+        is_published=False,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    assert client.get(f"/api/posts/{hidden.id}/").status_code == 404
+
+
+def test_comments_filter_by_post(client, mixer: Mixer, live_posts, user):
+    mixer.cycle(3).blend("blog.Comment", post=live_posts[0], author=user)
+    mixer.blend("blog.Comment", post=live_posts[1], author=user)
+    data = _get(client, "/api/comments/", post=live_posts[0].id)
+    assert [comment["post"] for comment in data["results"]] == (
+        [live_posts[0].id] * 3
+    )
+    assert client.get("/api/comments/", {"post": "x"}).status_code == 400
+
+
+def test_conditional_get(client, live_posts, mixer: Mixer, user):
+    response = client.get("/api/posts/")
+    etag = response["ETag"]
+    with CaptureQueriesContext(connection) as queries:
+        repeated = client.get("/api/posts/", HTTP_IF_NONE_MATCH=etag)
+    assert repeated.status_code == 304
+    # Валидаторы строятся по самой выборке страницы.
+    assert len(queries.captured_queries) == 1
+    mixer.blend("blog.Comment", post=live_posts[0], author=user)
+    assert client.get(
+        "/api/posts/", HTTP_IF_NONE_MATCH=etag
+    ).status_code == 200
+
+
+@pytest.mark.parametrize(
+    ("url", "model"),
+    [
+        ("/api/posts/", "blog.Post"),
+        ("/api/categories/", "blog.Category"),
+        ("/api/locations/", "blog.Location"),
+        ("/api/users/", "users.User"),
+    ],
+)
+def test_etag_sees_changes_without_signals(client, live_posts, url, model):
+    # Запись изменена в другом процессе: сигналы этого процесса не
+    # сработали, и кеши здесь ничего о ней не знают.
+    model = apps.get_model(model)
+    obj = model.objects.first()
+    for path in (url, f"{url}{obj.pk}/", f"{url}?ids={obj.pk}"):
+        etag = client.get(path)["ETag"]
+        model.objects.filter(pk=obj.pk).update(
+            updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        response = client.get(path, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, path
+
+
+def test_comment_etag_sees_edits(client, mixer: Mixer, live_posts):
+    comment = mixer.blend("blog.Comment", post=live_posts[0])
+    url = f"/api/comments/{comment.pk}/"
+    etag = client.get(url)["ETag"]
+    Comment.objects.filter(pk=comment.pk).update(text="Правка из воркера")
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.json()["text"] == "Правка из воркера"
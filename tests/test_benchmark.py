@@ -0,0 +1,64 @@
+import copy
+
+import pytest
+from django.db.models import Count
+
+from blog import benchmark
+from blog.models import AuthorStats, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def results(no_publication_timer):
+    benchmark.seed(posts=40, comments=300, users=5, categories=3)
+    return benchmark.run(iterations=1)
+
+
+def test_seed_fills_derived_data(results):
+    assert benchmark.volumes() == {"posts": 40, "comments": 300}
+    post = (
+        Post.objects.annotate(real=Count("comments")).order_by("-real").first()
+    )
+    assert post.comment_count == post.real
+    assert post.author.username == benchmark.BENCH_USERNAME
+    assert AuthorStats.objects.exists()
+
+
+def test_every_route_is_measured(results):
+    assert {
+        "blog:index:anon",
+        "blog:post_detail:user",
+        "blog:feed_atom:anon",
+        "blog:export:user",
+        "pages:about:anon",
+        "api:comment:anon",
+    } < set(results)
+    for key, row in results.items():
+        assert row["status"] in (200, 302), key
+        assert row["p95_ms"] >= row["p50_ms"] > 0
+    assert results["blog:index:anon"]["queries"] > 0
+
+
+def test_compare_flags_regressions(results):
+    assert benchmark.compare(results, results) == []
+    worse = copy.deepcopy(results)
+    worse["blog:index:anon"]["queries"] += 1
+    worse["blog:profile:user"]["p50_ms"] = (
+        results["blog:profile:user"]["p50_ms"] * 3 + 10
+    )
+    regressions = benchmark.compare(worse, results)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("blog:index:anon")
+    # На других объёмах данных сравнивается только число запросов.
+    assert len(benchmark.compare(worse, results, timings=False)) == 1
+
+    # Новый или пропавший маршрут требует обновить базовую линию.
+    partial = dict(results)
+    del partial["pages:about:anon"]
+    assert benchmark.compare(results, partial) == [
+        "pages:about:anon: нет в базовой линии"
+    ]
+    assert benchmark.compare(partial, results) == [
+        "pages:about:anon: нет в результатах"
+    ]
@@ -0,0 +1,36 @@
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        mixer: Mixer, post_with_published_location, another_user
+):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3
+
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+    mixer.blend("blog.Comment", post=post, author=another_user)
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+
+def test_recount_comments_repairs_drift(
+        mixer: Mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(4).blend("blog.Comment", post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=100)
+
+    call_command("recount_comments", batch_size=1)
+
+    post.refresh_from_db()
+    assert post.comment_count == 4
@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+PER_PAGE = 3
+
+
+@pytest.fixture(autouse=True)
+def small_comment_pages(settings):
+    settings.BLOG_COMMENTS_PER_PAGE = PER_PAGE
+
+
+@pytest.fixture
+def discussed_post(mixer: Mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    comments = mixer.cycle(PER_PAGE * 2 + 1).blend("blog.Comment", post=post)
+    # Одинаковое время у части комментариев проверяет порядок по id.
+    Comment.objects.filter(pk__in=[c.pk for c in comments[:2]]).update(
+        created_at=comments[0].created_at
+    )
+    return post
+
+
+def _comment_ids(page):
+    return [comment.id for comment in page]
+
+
+def test_detail_ships_first_batch(client, discussed_post):
+    page = client.get(f"/posts/{discussed_post.id}/").context["comments"]
+    expected = list(
+        discussed_post.comments.order_by("created_at", "pk")
+        .values_list("pk", flat=True)[:PER_PAGE]
+    )
+    assert _comment_ids(page) == expected
+    assert page.has_next()
+
+
+def test_fragment_loads_remaining_comments(client, discussed_post):
+    page = client.get(f"/posts/{discussed_post.id}/").context["comments"]
+    seen = _comment_ids(page)
+    while page.has_next():
+        response = client.get(
+            f"/posts/{discussed_post.id}/comments/",
+            {"cursor": page.next_cursor},
+        )
+        assert "<html" not in response.content.decode()
+        page = response.context["comments"]
+        seen.extend(_comment_ids(page))
+    assert seen == list(
+        discussed_post.comments.order_by("created_at", "pk")
+        .values_list("pk", flat=True)
+    )
+
+
+def test_fragment_respects_post_visibility(another_user_client, discussed_post):
+    discussed_post.is_published = False
+    discussed_post.save()
+    response = another_user_client.get(
+        f"/posts/{discussed_post.id}/comments/"
+    )
+    assert response.status_code == 404
+
+
+def test_new_comment_redirects_to_its_batch(user_client, discussed_post):
+    response = user_client.post(
+        f"/posts/{discussed_post.id}/comment/",
+        {"text": "Свежий комментарий"},
+        follow=True,
+    )
+    comment = Comment.objects.get(text="Свежий комментарий")
+    redirect_url, _ = response.redirect_chain[-1]
+    assert redirect_url.startswith(f"/posts/{discussed_post.id}/?comments=")
+    assert redirect_url.endswith(f"#comment_{comment.id}")
+    assert comment in response.context["comments"]
@@ -0,0 +1,94 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_detail_304_skips_rendering(user_client, published_post):
+    url = f"/posts/{published_post.id}/"
+    etag = user_client.get(url)["ETag"]
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert not any(
+        '"blog_comment"."text"' in query["sql"]
+        for query in queries.captured_queries
+    )
+
+
+def test_detail_if_modified_since(client, published_post):
+    url = f"/posts/{published_post.id}/"
+    last_modified = client.get(url)["Last-Modified"]
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 304
+
+
+def test_detail_etag_changes_with_comments(
+        user_client, mixer: Mixer, published_post
+):
+    url = f"/posts/{published_post.id}/"
+    etag = user_client.get(url)["ETag"]
+    mixer.blend("blog.Comment", post=published_post)
+    assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_detail_etag_depends_on_user(
+        user_client, another_user_client, published_post
+):
+    url = f"/posts/{published_post.id}/"
+    etag = user_client.get(url)["ETag"]
+    response = another_user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+
+
+def test_hidden_post_has_no_validators(another_user_client, published_post):
+    published_post.is_published = False
+    published_post.save()
+    response = another_user_client.get(
+        f"/posts/{published_post.id}/", HTTP_IF_NONE_MATCH="*"
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_listing_304_until_change(request, published_post, client_name):
+    client = request.getfixturevalue(client_name)
+    etag = client.get("/")["ETag"]
+    assert client.get("/", HTTP_IF_NONE_MATCH=etag).status_code == 304
+    published_post.title = "Новый заголовок"
+    published_post.save()
+    assert client.get("/", HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_listing_etag_sees_changes_without_signals(
+        user_client, published_post
+):
+    etag = user_client.get("/")["ETag"]
+    # Пост изменён в другом процессе: сигналы этого процесса не сработали.
+    Post.objects.filter(pk=published_post.pk).update(
+        title="Правка из воркера", updated_at=timezone.now()
+    )
+    response = user_client.get("/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "Правка из воркера" in response.content.decode()
+    Post.objects.filter(pk=published_post.pk).update(is_live=False)
+    assert user_client.get(
+        "/", HTTP_IF_NONE_MATCH=response["ETag"]
+    ).status_code == 200
+
+
+def test_listing_etag_changes_with_location_rename(
+        user_client, published_post
+):
+    etag = user_client.get("/")["ETag"]
+    location = published_post.location
+    location.name = "Новое место"
+    location.save()
+    response = user_client.get("/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "Новое место" in response.content.decode()
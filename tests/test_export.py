@@ -0,0 +1,136 @@
+import gzip
+import json
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.exporter import MODELS
+from blog.importer import LEVELS
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+DB_JSON = Path(__file__).resolve().parent.parent / "db.json"
+
+
+def _export(directory, *args):
+    call_command("export_content", str(directory), *args, stdout=StringIO())
+    return sorted(Path(directory).glob("*.jsonl.gz"))
+
+
+def _read(path):
+    with gzip.open(path, "rt", encoding="utf-8") as stream:
+        return [json.loads(line) for line in stream]
+
+
+def test_models_follow_import_order():
+    assert list(MODELS.values()) == [
+        label for level in LEVELS for label in level
+    ]
+
+
+def test_export_round_trips_through_import(tmp_path, django_user_model):
+    call_command("import_content", str(DB_JSON), stdout=StringIO())
+    post = Post.objects.exclude(location=None).first()
+    Comment.objects.create(post=post, author=post.author, text="Привет")
+    titles = sorted(Post.objects.values_list("title", flat=True))
+
+    (path,) = _export(tmp_path, "--batch-size", "5")
+    records = _read(path)
+    posts = [record["pk"] for record in records
+             if record["model"] == "blog.post"]
+    assert posts == sorted(posts)
+    assert all(
+        "password" not in record["fields"]
+        for record in records
+        if record["model"] == "users.user"
+    )
+
+    django_user_model.objects.all().delete()
+    Category.objects.all().delete()
+    Location.objects.all().delete()
+    call_command("import_content", str(path), stdout=StringIO())
+    assert sorted(Post.objects.values_list("title", flat=True)) == titles
+    assert django_user_model.objects.count() == 4
+    assert Location.objects.count() == 12
+    comment = Comment.objects.get(text="Привет")
+    assert comment.post.title == post.title
+    assert comment.post.location.name == post.location.name
+
+
+def test_incremental_sharded_export(
+        tmp_path, monkeypatch, mixer: Mixer, user, published_category
+):
+    now = timezone.now()
+    posts = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=now - timedelta(days=1),
+    )
+    # Старый пост оказался между новыми по ключу.
+    Post.objects.filter(pk=posts[1].pk).update(
+        created_at=now.replace(year=2022, month=5)
+    )
+    opened = []
+    gzip_open = gzip.open
+
+    def tracked_open(*args, **kwargs):
+        assert all(stream.closed for stream in opened)
+        opened.append(gzip_open(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr("blog.exporter.gzip.open", tracked_open)
+    watermark = tmp_path / "watermark.json"
+    files = _export(
+        tmp_path / "first", "--models", "users,posts",
+        "--shard-by", "month", "--watermark", str(watermark),
+    )
+    monkeypatch.undo()
+    assert len(opened) == len(files) == 3
+    names = [path.name for path in files]
+    assert names[0].startswith("post-2022-05-")
+    assert [record["pk"] for record in _read(files[0])] == [posts[1].pk]
+    assert names[1].startswith(f"post-{now:%Y-%m}-")
+    assert [record["pk"] for record in _read(files[1])] == [
+        posts[0].pk, posts[2].pk
+    ]
+    assert names[2].startswith("user-")
+    assert json.loads(watermark.read_text())["blog.post"] == (
+        Post.objects.latest("pk").pk
+    )
+
+    new = mixer.blend("blog.Post", author=user, category=published_category)
+    files = _export(
+        tmp_path / "second", "--models", "users,posts",
+        "--watermark", str(watermark),
+    )
+    assert [record["pk"] for record in _read(files[0])] == [new.pk]
+    assert not _export(
+        tmp_path / "third", "--models", "posts", "--since", "2100-01-01"
+    )
+
+
+def test_staff_streaming_endpoint(
+        client, user_client, admin_client, mixer: Mixer, user
+):
+    mixer.cycle(3).blend("blog.Comment", author=user)
+    assert client.get("/export/").status_code == 302
+    assert user_client.get("/export/").status_code == 403
+    assert admin_client.get("/export/?models=secrets").status_code == 400
+    assert admin_client.get("/export/?since=2024-13-01").status_code == 400
+
+    response = admin_client.get("/export/?models=comments")
+    assert response.streaming
+    assert response["Content-Type"] == "application/gzip"
+    records = [
+        json.loads(line)
+        for line in gzip.decompress(b"".join(response.streaming_content))
+        .decode()
+        .splitlines()
+    ]
+    assert [record["model"] for record in records] == ["blog.comment"] * 3
+    assert {record["fields"]["author"] for record in records} == {user.pk}
@@ -0,0 +1,129 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("no_publication_timer"),
+]
+
+
+@pytest.fixture(autouse=True)
+def feed_cache(settings):
+    settings.BLOG_FEED_CACHE_TIMEOUT = 300
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    now = timezone.now()
+    return {
+        "live": mixer.blend(
+            "blog.Post",
+            title="Видимый пост",
+            author=user,
+            category=published_category,
+            pub_date=now - timedelta(days=1),
+        ),
+        "hidden": mixer.blend(
+            "blog.Post",
+            title="Скрытый пост",
+            author=user,
+            category=published_category,
+            is_published=False,
+            pub_date=now - timedelta(days=1),
+        ),
+        "deferred": mixer.blend(
+            "blog.Post",
+            title="Отложенный пост",
+            author=user,
+            category=published_category,
+            pub_date=now + timedelta(days=1),
+        ),
+    }
+
+
+@pytest.mark.parametrize(
+    ("url", "content_type"),
+    [
+        ("/feed/", "application/rss+xml"),
+        ("/feed/atom/", "application/atom+xml"),
+    ],
+)
+def test_feed_lists_only_published_posts(
+        client, feed_posts, url, content_type
+):
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith(content_type)
+    content = response.content.decode()
+    assert "Видимый пост" in content
+    assert f"/posts/{feed_posts['live'].id}/" in content
+    assert "Скрытый пост" not in content
+    assert "Отложенный пост" not in content
+
+
+def test_category_and_author_feeds(
+        client, mixer: Mixer, feed_posts, user, published_category
+):
+    other = mixer.blend(
+        "blog.Post",
+        title="Чужой пост",
+        pub_date=timezone.now() - timedelta(days=1),
+        category__is_published=True,
+    )
+    for url in (
+        f"/category/{published_category.slug}/feed/",
+        f"/profile/{user.username}/feed/atom/",
+    ):
+        content = client.get(url).content.decode()
+        assert "Видимый пост" in content
+        assert "Чужой пост" not in content
+    assert "Чужой пост" in client.get("/feed/").content.decode()
+    other.category.is_published = False
+    other.category.save()
+    url = f"/category/{other.category.slug}/feed/"
+    assert client.get(url).status_code == 404
+
+
+def test_repeated_polls_end_in_304(client, feed_posts):
+    response = client.get("/feed/")
+    etag = response["ETag"]
+    with CaptureQueriesContext(connection) as queries:
+        assert client.get("/feed/").content == response.content
+        not_modified = client.get("/feed/", HTTP_IF_NONE_MATCH=etag)
+    # По запросу на опрос: валидаторы, XML берётся из кеша.
+    assert len(queries.captured_queries) == 2
+    assert not_modified.status_code == 304
+
+    feed_posts["hidden"].is_published = True
+    feed_posts["hidden"].save()
+    response = client.get("/feed/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "Скрытый пост" in response.content.decode()
+
+
+def test_feed_etag_sees_changes_without_signals(client, feed_posts):
+    etag = client.get("/feed/")["ETag"]
+    # Пост изменён в другом процессе: сигналы этого процесса не сработали.
+    Post.objects.filter(pk=feed_posts["live"].pk).update(
+        title="Правка из воркера", updated_at=timezone.now()
+    )
+    response = client.get("/feed/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "Правка из воркера" in response.content.decode()
+
+
+def test_category_rename_changes_feed(client, feed_posts):
+    etag = client.get("/feed/")["ETag"]
+    category = feed_posts["live"].category
+    category.title = "Новое название"
+    category.save()
+    response = client.get("/feed/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "Новое название" in response.content.decode()
@@ -0,0 +1,68 @@
+import pytest
+from django.core.cache import caches
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.cache import FRAGMENT_CACHE, post_card_key
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _index(client):
+    return client.get("/").content.decode("utf-8")
+
+
+def test_card_is_served_from_cache(client, published_post):
+    _index(client)
+    assert caches[FRAGMENT_CACHE].get(
+        post_card_key(published_post.id, published_post.updated_at, 0)
+    )
+    # Изменение в обход сигналов не видно, пока карточка в кеше.
+    Post.objects.filter(pk=published_post.pk).update(title="Тихая правка")
+    assert "Тихая правка" not in _index(client)
+
+
+def test_change_from_another_process_replaces_card(
+        client, published_post, no_page_cache
+):
+    _index(client)
+    # Другой процесс сохранил пост: сигналы этого процесса не сработали,
+    # но время изменения входит в ключ карточки.
+    Post.objects.filter(pk=published_post.pk).update(
+        title="Правка из воркера", updated_at=timezone.now()
+    )
+    assert "Правка из воркера" in _index(client)
+
+
+def test_post_save_invalidates_card(client, published_post):
+    _index(client)
+    published_post.title = "Новый заголовок"
+    published_post.save()
+    assert "Новый заголовок" in _index(client)
+
+
+def test_comment_invalidates_card(client, mixer: Mixer, published_post):
+    assert "Комментарии (0)" in _index(client)
+    mixer.blend("blog.Comment", post=published_post)
+    assert "Комментарии (1)" in _index(client)
+
+
+@pytest.mark.parametrize("related", ["category", "location", "author"])
+def test_related_change_invalidates_card(user_client, published_post, related):
+    # Страницы вошедшего пользователя не кешируются целиком, и карточку
+    # здесь никто не удаляет: сменился её ключ, как и в других процессах.
+    _index(user_client)
+    obj = getattr(published_post, related)
+    field = {"category": "title", "location": "name", "author": "username"}
+    setattr(obj, field[related], "renamed-related")
+    obj.save()
+    assert "renamed-related" in _index(user_client)
+
+
+def test_category_delete_touches_posts(published_post):
+    updated_at = published_post.updated_at
+    published_post.category.delete()
+    published_post.refresh_from_db()
+    assert published_post.updated_at > updated_at
+    assert not published_post.is_live
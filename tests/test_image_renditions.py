@@ -0,0 +1,73 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from core.tasks import run_pending
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("no_page_cache"),
+]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def _photo(name="photo.png", size=(2400, 1600)):
+    buffer = BytesIO()
+    # Шум плохо сжимается — как настоящая фотография.
+    Image.effect_noise(size, 64).convert("RGB").save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/png")
+
+
+def test_upload_builds_bounded_renditions(
+        post_with_published_location, media_root
+):
+    post = post_with_published_location
+    post.image = _photo()
+    post.save()
+    run_pending()
+    post.refresh_from_db()
+    renditions = post.image_renditions
+    assert renditions["source"] == post.image.name
+    original_size = (media_root / post.image.name).stat().st_size
+    for label, width in (("thumb", 320), ("medium", 800)):
+        assert renditions[label]["width"] == width
+        for key in ("jpeg", "webp"):
+            path = media_root / renditions[label][key]
+            with Image.open(path) as image:
+                assert image.width == width
+            assert path.stat().st_size * 10 < original_size
+    assert post.image_preview_url.endswith("_thumb.jpg")
+    assert " 800w" in post.image_webp_srcset
+
+
+def test_card_switches_to_renditions(client, post_with_published_location):
+    post = post_with_published_location
+    post.image = _photo()
+    post.save()
+    html = client.get("/").content.decode()
+    assert "srcset" not in html
+
+    run_pending()
+    html = client.get("/").content.decode()
+    assert 'type="image/webp"' in html
+    assert post.image.url in html
+
+
+def test_command_builds_missing_renditions(post_with_published_location):
+    post = post_with_published_location
+    post.image = _photo(size=(100, 60))
+    post.save()
+
+    call_command("generate_renditions")
+
+    post.refresh_from_db()
+    # Маленькое фото не увеличивается.
+    assert post.image_renditions["medium"]["width"] == 100
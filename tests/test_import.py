@@ -0,0 +1,102 @@
+import gzip
+import json
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog import importer
+from blog.models import Category, Comment, Location, Post
+from blog.search import search_posts
+
+pytestmark = [pytest.mark.django_db]
+
+DB_JSON = Path(__file__).resolve().parent.parent / "db.json"
+
+
+def _import(path, *args):
+    call_command("import_content", str(path), *args, stdout=StringIO())
+
+
+def test_imports_db_json(django_user_model, monkeypatch):
+    # Маленькие порции чтения: записи рвутся на границах кусков.
+    monkeypatch.setattr(importer, "CHUNK_SIZE", 100)
+    _import(DB_JSON, "--batch-size", "7")
+    assert django_user_model.objects.count() == 4
+    assert Category.objects.count() == 6
+    assert Location.objects.count() == 12
+    assert Post.objects.count() == 39
+    post = Post.objects.get(title="Обед")
+    # Время создания берётся из файла, а не из момента импорта.
+    assert post.created_at.year == 2022
+    assert post.is_live == (
+        post.is_published
+        and post.category.is_published
+        and post.pub_date <= timezone.now()
+    )
+    assert search_posts(Post.objects.published(), "обед").filter(
+        pk=post.pk
+    ).exists() == post.is_live
+
+    # Повторный импорт не дублирует пользователей и категории.
+    _import(DB_JSON)
+    assert django_user_model.objects.count() == 4
+    assert Category.objects.count() == 6
+    assert Post.objects.count() == 78
+
+
+def test_imports_gzipped_jsonl_in_any_order(tmp_path, django_user_model):
+    published = (timezone.now() - timedelta(days=1)).isoformat()
+    records = [
+        # Комментарии и пост идут раньше, чем то, на что они ссылаются.
+        {
+            "model": "blog.comment",
+            "pk": 1,
+            "fields": {"post": 10, "author": 5, "text": "Первый"},
+        },
+        {
+            "model": "blog.comment",
+            "pk": 2,
+            "fields": {"post": 10, "author": 5, "text": "Второй"},
+        },
+        {
+            "model": "blog.comment",
+            "pk": 3,
+            "fields": {"post": 404, "author": 5, "text": "Сирота"},
+        },
+        {
+            "model": "blog.post",
+            "pk": 10,
+            "fields": {
+                "title": "Импорт",
+                "text": "Текст",
+                "pub_date": published,
+                "author": 5,
+                "category": 7,
+                "location": None,
+            },
+        },
+        {
+            "model": "blog.category",
+            "pk": 7,
+            "fields": {"title": "Разное", "slug": "misc", "description": "-"},
+        },
+        {"model": "users.user", "pk": 5, "fields": {"username": "importer"}},
+    ]
+    path = tmp_path / "dump.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as stream:
+        for record in records:
+            stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+    _import(path, "--batch-size", "1")
+
+    post = Post.objects.get(title="Импорт")
+    assert post.author.username == "importer"
+    assert post.category.slug == "misc"
+    assert post.is_live
+    assert post.comment_count == 2
+    assert Comment.objects.filter(post=post).count() == 2
+    assert not Comment.objects.filter(text="Сирота").exists()
+    assert post.author.post_stats.comments_received == 2
@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from conftest import blend_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    return blend_posts(mixer, 5, author=user, category=published_category)
+
+
+def _post_listing_plans(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    listing_sql = [
+        query["sql"]
+        for query in queries.captured_queries
+        if 'FROM "blog_post"' in query["sql"] and "ORDER BY" in query["sql"]
+    ]
+    assert listing_sql, f"Не найден запрос ленты публикаций для {url}"
+    plans = []
+    with connection.cursor() as cursor:
+        for sql in listing_sql:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            plans.append([row[-1] for row in cursor.fetchall()])
+    return plans
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="План запроса проверяется на SQLite"
+)
+@pytest.mark.parametrize("url_name", ["index", "category", "profile"])
+def test_listing_queries_use_index(
+        client, feed_posts, published_category, user, url_name
+):
+    url = {
+        "index": "/",
+        "category": f"/category/{published_category.slug}/",
+        "profile": f"/profile/{user.username}/",
+    }[url_name]
+    for plan in _post_listing_plans(client, url):
+        post_steps = [step for step in plan if "blog_post" in step]
+        assert post_steps, plan
+        for step in post_steps:
+            assert step.startswith("SEARCH") or "INDEX" in step, (
+                f"Запрос ленты {url} читает blog_post без индекса: {plan}"
+            )
+        assert not any("TEMP B-TREE" in step for step in plan), (
+            f"Запрос ленты {url} сортирует публикации без индекса: {plan}"
+        )
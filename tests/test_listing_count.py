@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+from conftest import N_PER_PAGE, blend_posts, count_queries
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("no_page_cache"),
+]
+
+
+def _count_queries(client, url):
+    return count_queries(client, url, containing="COUNT(*)")
+
+
+def test_feed_count_is_cached_until_posts_change(client, mixer: Mixer):
+    blend_posts(mixer, N_PER_PAGE + 1)
+    counts, response = _count_queries(client, "/")
+    assert counts == 1
+    counts, response = _count_queries(client, "/")
+    assert counts == 0
+    assert response.context["paginator"].count == N_PER_PAGE + 1
+
+    blend_posts(mixer, 1)
+    counts, response = _count_queries(client, "/")
+    assert counts == 1
+    assert response.context["paginator"].count == N_PER_PAGE + 2
+
+
+def test_comments_keep_feed_count(client, mixer: Mixer, user):
+    post = blend_posts(mixer, 1)[0]
+    _count_queries(client, "/")
+    mixer.blend("blog.Comment", post=post, author=user)
+    counts, _ = _count_queries(client, "/")
+    assert counts == 0
+
+
+def test_profile_count_depends_on_viewer(
+        client, user_client, mixer: Mixer, user
+):
+    blend_posts(mixer, 2, author=user)
+    blend_posts(mixer, 1, author=user, is_published=False)
+    url = f"/profile/{user.username}/"
+    _, response = _count_queries(client, url)
+    assert response.context["paginator"].count == 2
+    _, response = _count_queries(user_client, url)
+    assert response.context["paginator"].count == 3
+
+
+def test_page_range_is_elided(client, mixer: Mixer, user, published_category):
+    mixer.cycle(N_PER_PAGE * 20).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=None,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    _, response = _count_queries(client, "/?page=10")
+    page_range = list(response.context["page_range"])
+    assert len(page_range) < 20
+    assert response.context["paginator"].ELLIPSIS in page_range
+
+
+def test_stale_count_does_not_truncate_last_page(client, mixer: Mixer):
+    posts = blend_posts(mixer, N_PER_PAGE + 1)
+    blend_posts(mixer, 1, is_published=False)
+    _count_queries(client, "/?page=2")
+    # Публикация и скрытие в другом процессе: сигналы этого процесса
+    # не сбрасывают закешированный счётчик.
+    Post.objects.filter(is_published=False).update(
+        is_published=True, is_live=True
+    )
+    counts, response = _count_queries(client, "/?page=2")
+    assert counts == 1
+    assert len(response.context["page_obj"]) == 2
+    assert response.context["paginator"].count == N_PER_PAGE + 2
+
+    Post.objects.filter(pk__in=[post.pk for post in posts[:2]]).update(
+        is_live=False
+    )
+    assert client.get("/?page=2").status_code == 404
+    _, response = _count_queries(client, "/")
+    assert response.context["paginator"].count == N_PER_PAGE
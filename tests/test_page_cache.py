@@ -0,0 +1,99 @@
+import pytest
+from django.core.checks import run_checks
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from core.cache import page_tag_versions, reset_page_cache_stats
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(
+    "url", ["/", "/pages/about/", "/pages/rules/"]
+)
+def test_anonymous_pages_are_cached(client, published_post, url):
+    assert client.get(url)["X-Page-Cache"] == "MISS"
+    assert client.get(url)["X-Page-Cache"] == "HIT"
+
+
+def test_post_page_hit_skips_database(client, published_post):
+    url = f"/posts/{published_post.id}/"
+    etag = client.get(url)["ETag"]
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+        not_modified = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response["X-Page-Cache"] == "HIT"
+    assert response["ETag"] == etag
+    assert not_modified.status_code == 304
+    assert not queries.captured_queries
+
+
+def test_page_cache_varies_on_page(client, published_post):
+    client.get("/")
+    assert client.get("/", {"page": 1})["X-Page-Cache"] == "MISS"
+    assert client.get("/", {"utm": "x"})["X-Page-Cache"] == "HIT"
+
+
+def test_logged_in_user_bypasses_cache(user_client, published_post):
+    user_client.get("/")
+    assert "X-Page-Cache" not in user_client.get("/")
+
+
+def test_conditional_get_returns_304(client, published_post):
+    etag = client.get("/")["ETag"]
+    response = client.get("/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+
+def test_post_change_purges_its_pages(client, published_post):
+    urls = [
+        "/",
+        f"/posts/{published_post.id}/",
+        f"/category/{published_post.category.slug}/",
+        f"/profile/{published_post.author.username}/",
+    ]
+    for url in urls:
+        client.get(url)
+    published_post.title = "Обновлённый заголовок"
+    published_post.save()
+    for url in urls:
+        response = client.get(url)
+        assert response["X-Page-Cache"] == "MISS", url
+        assert "Обновлённый заголовок" in response.content.decode()
+
+
+def test_comment_purges_post_page(client, mixer: Mixer, published_post):
+    url = f"/posts/{published_post.id}/"
+    client.get(url)
+    comment = mixer.blend("blog.Comment", post=published_post)
+    assert f'name="comment_{comment.id}"' in client.get(url).content.decode()
+
+
+def test_stats_are_staff_only(
+        client, user_client, admin_client, published_post
+):
+    reset_page_cache_stats()
+    client.get("/")
+    client.get("/")
+    assert user_client.get("/cache/stats/").status_code in (302, 403)
+    stats = admin_client.get("/cache/stats/").json()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_process_local_cache_is_not_used(settings, client, published_post):
+    # Сброс тегов в памяти одного процесса не дошёл бы до остальных.
+    settings.CACHES = {
+        **settings.CACHES,
+        "pages": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+    client.get("/")
+    assert "X-Page-Cache" not in client.get("/")
+    assert "core.W001" in [message.id for message in run_checks()]
+
+
+def test_tag_generations_start_at_zero():
+    # Процессы без общего начального поколения получали бы разные ключи.
+    assert page_tag_versions(["feed"]) == [0, 0]
@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def dated_posts(mixer: Mixer, user, published_category):
+    now = timezone.now()
+    # Часть постов с одинаковой датой, чтобы проверить разрешение по id.
+    dates = (
+        now - timedelta(days=1, hours=i // 3)
+        for i in range(N_PER_PAGE * 2 + 5)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=dates,
+    )
+
+
+def _walk_pages(client, url):
+    seen, cursor = [], ""
+    while True:
+        response = client.get(url, {"cursor": cursor})
+        assert response.status_code == 200
+        page = response.context["page_obj"]
+        seen.extend(post.id for post in page)
+        if not page.has_next():
+            return seen, page
+        cursor = page.next_cursor
+
+
+@pytest.mark.parametrize(
+    "url_name", ["index", "category", "profile"]
+)
+def test_cursor_pagination_walks_all_posts(
+        client, dated_posts, published_category, user, url_name
+):
+    url = {
+        "index": "/",
+        "category": f"/category/{published_category.slug}/",
+        "profile": f"/profile/{user.username}/",
+    }[url_name]
+    seen, _ = _walk_pages(client, url)
+    expected = sorted(
+        dated_posts, key=lambda post: (post.pub_date, post.id), reverse=True
+    )
+    assert seen == [post.id for post in expected]
+
+
+def test_cursor_pagination_previous_page(client, dated_posts):
+    first = client.get("/", {"cursor": ""}).context["page_obj"]
+    second = client.get(
+        "/", {"cursor": first.next_cursor}
+    ).context["page_obj"]
+    back = client.get(
+        "/", {"cursor": second.previous_cursor}
+    ).context["page_obj"]
+    assert [post.id for post in back] == [post.id for post in first]
+
+
+def test_cursor_pagination_skips_count(client, dated_posts):
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/", {"cursor": ""})
+    assert not any(
+        "COUNT(*)" in query["sql"] for query in queries.captured_queries
+    )
+
+
+def test_cursor_pagination_rejects_garbage(client, dated_posts):
+    assert client.get("/", {"cursor": "not-a-cursor"}).status_code == 404
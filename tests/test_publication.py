@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.middleware import ScheduledPublicationMiddleware
+from blog.models import Post
+from blog.publication import posts_went_live
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer: Mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    assert not post.is_live
+    # Имитируем наступление времени публикации без пересохранения поста.
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    return post
+
+
+def _index_ids(client):
+    return [post.id for post in client.get("/").context["page_obj"]]
+
+
+def test_publish_scheduled_command(client, scheduled_post):
+    assert scheduled_post.id not in _index_ids(client)
+    received = []
+
+    def receiver(sender, post_ids, **kwargs):
+        received.extend(post_ids)
+
+    posts_went_live.connect(receiver)
+    try:
+        call_command("publish_scheduled")
+    finally:
+        posts_went_live.disconnect(receiver)
+
+    assert received == [scheduled_post.id]
+    assert scheduled_post.id in _index_ids(client)
+
+
+def test_middleware_publishes_due_posts(client, scheduled_post, settings):
+    settings.BLOG_PUBLICATION_CHECK_INTERVAL = 60
+    ScheduledPublicationMiddleware._next_check = None
+    assert scheduled_post.id in _index_ids(client)
+
+
+def test_category_unpublish_hides_posts(client, scheduled_post):
+    call_command("publish_scheduled")
+    category = scheduled_post.category
+    category.is_published = False
+    category.save()
+    assert scheduled_post.id not in _index_ids(client)
+    category.is_published = True
+    category.save()
+    assert scheduled_post.id in _index_ids(client)
+
+
+def test_rebuild_live_flags(scheduled_post):
+    Post.objects.filter(pk=scheduled_post.pk).update(is_published=False)
+    Post.objects.filter(pk=scheduled_post.pk).update(is_live=True)
+    call_command("publish_scheduled", rebuild=True)
+    assert not Post.objects.get(pk=scheduled_post.pk).is_live
@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE, blend_posts, count_queries
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("no_publication_timer"),
+]
+
+
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_index_query_count_is_constant(request, mixer: Mixer, client_name):
+    client = request.getfixturevalue(client_name)
+    blend_posts(mixer, 1)
+    few = count_queries(client, "/")[0]
+    blend_posts(mixer, N_PER_PAGE)
+    assert count_queries(client, "/")[0] == few
+
+
+def test_category_query_count_is_constant(
+        client, mixer: Mixer, published_category
+):
+    blend_posts(mixer, 1, category=published_category)
+    url = f"/category/{published_category.slug}/"
+    few = count_queries(client, url)[0]
+    mixer.cycle(N_PER_PAGE).blend(
+        "blog.Post",
+        pub_date=timezone.now() - timedelta(days=1),
+        category=published_category,
+        location__is_published=True,
+    )
+    assert count_queries(client, url)[0] == few
+
+
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_profile_query_count_is_constant(
+        request, mixer: Mixer, user, client_name
+):
+    client = request.getfixturevalue(client_name)
+    blend_posts(mixer, 1, author=user)
+    url = f"/profile/{user.username}/"
+    few = count_queries(client, url)[0]
+    blend_posts(mixer, N_PER_PAGE, author=user)
+    assert count_queries(client, url)[0] == few
+
+
+@pytest.mark.parametrize(
+    ("client_name", "expected"),
+    [
+        # пост со связями + комментарии с авторами
+        ("client", 2),
+        # плюс сессия и пользователь
+        ("user_client", 4),
+    ],
+)
+def test_detail_query_count_is_pinned(
+        request, mixer: Mixer, client_name, expected
+):
+    client = request.getfixturevalue(client_name)
+    post = blend_posts(mixer, 1)[0]
+    url = f"/posts/{post.id}/"
+    assert count_queries(client, url)[0] == expected
+    mixer.cycle(N_PER_PAGE * 2).blend("blog.Comment", post=post)
+    assert count_queries(client, url)[0] == expected
+
+
+def _lookups(client, url, table, column, method="get", data=None):
+    """Число запросов, ищущих строку table по column."""
+    with CaptureQueriesContext(connection) as queries:
+        response = getattr(client, method)(url, data or {})
+    assert response.status_code in (200, 302)
+    lookups = 0
+    for query in queries.captured_queries:
+        sql = query["sql"]
+        # Загрузка строки, а не проверка существования SELECT (1).
+        if not sql.startswith('SELECT "') or f'FROM "{table}"' not in sql:
+            continue
+        where = sql.partition(" WHERE ")[2]
+        lookups += f'"{table}"."{column}" =' in where
+    return lookups
+
+
+def test_category_is_resolved_once(client, published_category):
+    url = f"/category/{published_category.slug}/"
+    assert _lookups(client, url, "blog_category", "slug") == 1
+
+
+def test_profile_author_is_resolved_once(client, user):
+    url = f"/profile/{user.username}/"
+    assert _lookups(client, url, "users_user", "username") == 1
+
+
+@pytest.mark.parametrize("action", ["edit", "delete"])
+def test_post_is_resolved_once(
+        user_client, post_with_published_location, action
+):
+    url = f"/posts/{post_with_published_location.id}/{action}/"
+    assert _lookups(user_client, url, "blog_post", "id") == 1
+
+
+@pytest.mark.parametrize("action", ["edit_comment", "delete_comment"])
+def test_comment_is_resolved_once(
+        user_client, mixer: Mixer, user, post_with_published_location, action
+):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    url = f"/posts/{post.id}/{action}/{comment.id}/"
+    assert _lookups(user_client, url, "blog_comment", "id") == 1
+
+
+def test_edit_profile_success_url_reuses_object(user_client, user):
+    url = f"/edit_profile/{user.id}/"
+    data = {"username": "renamed", "email": "renamed@example.com"}
+    # Пользователь сессии и редактируемый профиль.
+    assert _lookups(user_client, url, "users_user", "id", "post", data) == 2
@@ -0,0 +1,69 @@
+import re
+
+import pytest
+from mixer.backend.django import Mixer
+
+from conftest import blend_posts
+from core.instrumentation import RequestMetrics, reset_request_stats
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("no_page_cache"),
+]
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    reset_request_stats()
+
+
+def _timing(response):
+    return {
+        match[0]: match
+        for match in re.findall(
+            r'(\w+)(?:;dur=([\d.]+))?(?:;desc="([^"]*)")?',
+            response["Server-Timing"],
+        )
+    }
+
+
+def test_server_timing_splits_db_and_template(client, mixer: Mixer):
+    blend_posts(mixer, 3)
+    timing = _timing(client.get("/"))
+    assert set(timing) >= {"total", "db", "tpl"}
+    total, db, tpl = (
+        float(timing[name][1]) for name in ("total", "db", "tpl")
+    )
+    assert db > 0 and tpl > 0
+    assert db + tpl <= total
+    assert timing["db"][2].endswith(" queries")
+
+
+def test_duplicate_queries_are_detected():
+    metrics = RequestMetrics()
+
+    def execute(sql, params, many, context):
+        return None
+
+    for params in ([1], [2], [1]):
+        metrics.execute(execute, "SELECT %s", params, False, {})
+    assert metrics.queries == 3
+    assert metrics.duplicates == 1
+    assert 'dup;desc="1 duplicate queries"' in metrics.server_timing(0.01)
+
+
+def test_request_stats_are_staff_only(client, user_client, admin_client):
+    client.get("/")
+    client.get("/")
+    assert user_client.get("/requests/stats/").status_code in (302, 403)
+    stats = admin_client.get("/requests/stats/").json()
+    index = stats["blog:index"]
+    assert index["count"] == 2
+    assert sum(index["histogram"].values()) == 2
+    assert index["p50_ms"] is not None
+    assert index["avg_queries"] > 0
+
+
+def test_timing_can_be_disabled(client, settings):
+    settings.BLOG_REQUEST_TIMING = False
+    assert "Server-Timing" not in client.get("/")
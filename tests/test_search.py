@@ -0,0 +1,131 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.search import search_posts, tokenize, use_fts
+from blog.signals import recheck_fts_table
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("no_page_cache"),
+]
+
+
+@pytest.fixture(params=["fts5", "python"])
+def backend(request, settings):
+    settings.BLOG_SEARCH_BACKEND = request.param
+    return request.param
+
+
+@pytest.fixture
+def posts(mixer: Mixer, user, published_category, backend):
+    blend = dict(
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    return {
+        "title": mixer.blend(
+            "blog.Post", title="Котики на прогулке", text="Про погоду.",
+            **blend,
+        ),
+        "text": mixer.blend(
+            "blog.Post",
+            title="Заметка",
+            text="Мы гуляли с котиком весь день.",
+            **blend,
+        ),
+        "other": mixer.blend(
+            "blog.Post", title="Собаки", text="Совсем другое.", **blend
+        ),
+        "hidden": mixer.blend(
+            "blog.Post", title="Котик", text="Черновик.", is_published=False,
+            **blend,
+        ),
+    }
+
+
+def test_tokenize_stems_russian():
+    assert tokenize("Котики гуляли, котик ГУЛЯЕТ") == tokenize(
+        "котик гуляли котики гуляет"
+    )
+    assert tokenize("ёжик") == tokenize("ежик")
+
+
+def test_search_ranks_title_matches_first(client, posts):
+    response = client.get("/search/", {"q": "котик"})
+    assert response.status_code == 200
+    found = list(response.context["page_obj"])
+    assert found == [posts["title"], posts["text"]]
+
+
+def test_search_requires_all_words(client, posts):
+    response = client.get("/search/", {"q": "котик день"})
+    assert list(response.context["page_obj"]) == [posts["text"]]
+
+
+def test_index_follows_post_changes(client, posts):
+    post = posts["other"]
+    post.text = "Котик пришёл в гости."
+    post.save()
+    response = client.get("/search/", {"q": "котика"})
+    assert post in list(response.context["page_obj"])
+
+    post.delete()
+    response = client.get("/search/", {"q": "котика"})
+    assert post not in list(response.context["page_obj"])
+
+
+def test_author_rename_is_searchable(posts, user):
+    user.username = "barsik"
+    user.save()
+    from blog.models import Post
+
+    assert search_posts(Post.objects.all(), "barsik").count() == 4
+
+
+def test_rebuild_command(posts, backend):
+    from blog.models import Post
+
+    call_command("rebuild_search_index", batch_size=2)
+    assert search_posts(Post.objects.all(), "котик").count() == 3
+
+
+def test_empty_query_finds_nothing(client, posts):
+    response = client.get("/search/", {"q": "  "})
+    assert list(response.context["page_obj"]) == []
+
+
+def test_pagination_keeps_query(client, mixer: Mixer, published_category):
+    mixer.cycle(12).blend(
+        "blog.Post",
+        title="Котик",
+        category=published_category,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    content = client.get("/search/", {"q": "котик"}).content.decode()
+    assert "?q=%D0%BA%D0%BE%D1%82%D0%B8%D0%BA&page=2" in content
+
+
+def test_admin_search_uses_index(admin_client, posts):
+    response = admin_client.get("/admin/blog/post/", {"q": "котики"})
+    assert response.status_code == 200
+    found = set(response.context["cl"].result_list)
+    assert found == {posts["title"], posts["text"]}
+
+
+def test_fts_table_is_checked_once_per_migration(settings):
+    settings.BLOG_SEARCH_BACKEND = "auto"
+    assert use_fts()
+    with CaptureQueriesContext(connection) as queries:
+        assert use_fts()
+    assert not queries.captured_queries
+    recheck_fts_table(sender=None)
+    with CaptureQueriesContext(connection) as queries:
+        assert use_fts()
+    assert len(queries.captured_queries) == 1
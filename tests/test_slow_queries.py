@@ -0,0 +1,64 @@
+import pytest
+
+from core.models import SlowQuery, Task
+from core.slow_queries import normalize
+from core.tasks import run_pending
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def log_every_query(settings, no_page_cache):
+    settings.BLOG_SLOW_QUERY_MS = 0
+
+
+def test_normalize_strips_values():
+    first = normalize(
+        'SELECT "a" FROM "t" WHERE "id" IN (1, 2, 3) AND "s" = \'x\''
+    )
+    second = normalize(
+        'SELECT  "a" FROM "t"\nWHERE "id" IN (%s) AND "s" = \'it\'\'s\''
+    )
+    assert first == second == (
+        'SELECT "a" FROM "t" WHERE "id" IN (...) AND "s" = ?'
+    )
+    assert normalize('INSERT INTO "t" VALUES (%s, %s), (%s, %s)') == (
+        'INSERT INTO "t" VALUES (...), ...'
+    )
+
+
+def test_slow_queries_are_explained_out_of_band(
+        log_every_query, admin_client, published_category
+):
+    url = "/admin/blog/post/?category__id__exact={}"
+    admin_client.get(url.format(published_category.id))
+    admin_client.get(url.format(published_category.id + 1))
+    assert not SlowQuery.objects.exists()
+    assert Task.objects.filter(name__endswith="record_slow_queries").exists()
+
+    run_pending()
+    listing = SlowQuery.objects.get(
+        statement__contains='"blog_post"."category_id" = ?',
+        statement__startswith='SELECT "blog_post"."id"',
+    )
+    # Запросы с разными значениями сгруппированы в одну запись.
+    assert listing.count == 2
+    assert listing.last_view == "admin:blog_post_changelist"
+    assert "blog_post" in listing.plan
+
+
+def test_log_keeps_most_recent_fingerprints(
+        log_every_query, settings, admin_client
+):
+    settings.BLOG_SLOW_QUERY_KEEP = 2
+    admin_client.get("/admin/blog/post/")
+    run_pending()
+    assert SlowQuery.objects.count() == 2
+
+
+def test_log_can_be_disabled(settings, client):
+    settings.BLOG_SLOW_QUERY_MS = None
+    client.get("/")
+    assert not Task.objects.filter(
+        name__endswith="record_slow_queries"
+    ).exists()
@@ -0,0 +1,110 @@
+import os
+import sqlite3
+import threading
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS
+from django.db.utils import ConnectionHandler
+
+from core import writes
+
+
+@pytest.fixture
+def wal_connection(tmp_path, django_db_blocker):
+    handler = ConnectionHandler(
+        {
+            DEFAULT_DB_ALIAS: {
+                "ENGINE": "core.db.sqlite3",
+                "NAME": str(tmp_path / "db.sqlite3"),
+                "CONN_MAX_AGE": None,
+                "OPTIONS": {
+                    "health_checks": True,
+                    "pragmas": {"busy_timeout": 1000},
+                },
+            }
+        }
+    )
+    with django_db_blocker.unblock():
+        yield handler[DEFAULT_DB_ALIAS]
+        handler[DEFAULT_DB_ALIAS].close()
+
+
+def _pragma(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_pragmas_are_applied(wal_connection):
+    assert _pragma(wal_connection, "journal_mode") == "wal"
+    # NORMAL
+    assert _pragma(wal_connection, "synchronous") == 1
+    assert _pragma(wal_connection, "busy_timeout") == 1000
+    assert _pragma(wal_connection, "cache_size") == -64 * 1024
+    assert _pragma(wal_connection, "foreign_keys") == 1
+
+
+def test_health_check_reopens_replaced_database(wal_connection, tmp_path):
+    _pragma(wal_connection, "user_version")
+    raw = wal_connection.connection
+    wal_connection.close_if_unusable_or_obsolete()
+    assert wal_connection.connection is raw
+
+    # База восстановлена из копии: старое соединение видит прежний файл.
+    restored = tmp_path / "restored.sqlite3"
+    backup = sqlite3.connect(restored)
+    backup.execute("PRAGMA user_version = 7")
+    backup.close()
+    os.replace(restored, wal_connection.settings_dict["NAME"])
+    wal_connection.close_if_unusable_or_obsolete()
+    assert wal_connection.connection is None
+    assert _pragma(wal_connection, "user_version") == 7
+
+
+def _locked_elsewhere():
+    result = []
+    thread = threading.Thread(
+        target=lambda: result.append(
+            not writes._process_lock.acquire(blocking=False)
+            or writes._process_lock.release()
+        )
+    )
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+@pytest.mark.parametrize("end", ["commit", "rollback", "close"])
+def test_transaction_holds_write_lock(wal_connection, end):
+    # Так начинает и заканчивает транзакцию внешний atomic(), например
+    # в админке.
+    wal_connection.set_autocommit(
+        False, force_begin_transaction_with_broken_autocommit=True
+    )
+    with writes.write_lock():
+        pass
+    # Запись внутри транзакции не отпустила блокировку.
+    assert writes._local.depth == 1
+    assert _locked_elsewhere()
+    if end == "close":
+        wal_connection.close()
+    else:
+        getattr(wal_connection, end)()
+        wal_connection.set_autocommit(True)
+    assert not writes._local.depth
+    assert not _locked_elsewhere()
+
+
+def test_concurrency_benchmark(django_db_blocker):
+    stdout = StringIO()
+    with django_db_blocker.unblock():
+        call_command(
+            "benchmark_db", "--seconds", "0.3", "--rows", "100",
+            stdout=stdout,
+        )
+    lines = stdout.getvalue().splitlines()
+    assert lines[0].split()[:3] == ["profile", "reads_per_s", "writes_per_s"]
+    assert [line.split()[0] for line in lines[1:]] == ["sqlite", "sqlite-wal"]
+    assert all(line.split()[-1] == "0" for line in lines[1:])
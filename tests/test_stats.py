@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import AuthorStats, CategoryStats
+from blog.publication import publish_due_posts
+from conftest import blend_posts
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("no_page_cache"),
+]
+
+
+def _stats(user, category):
+    # Сводки ещё нет, пока автору или категории нечего учитывать.
+    return tuple(
+        model.objects.filter(pk=pk)
+        .values_list("posts_published", "comments_received")
+        .first()
+        or (0, 0)
+        for model, pk in (
+            (AuthorStats, user.pk),
+            (CategoryStats, category.pk),
+        )
+    )
+
+
+@pytest.fixture
+def live_posts(mixer: Mixer, user, published_category):
+    return blend_posts(mixer, 2, author=user, category=published_category)
+
+
+def test_stats_follow_posts_and_comments(
+        mixer: Mixer, live_posts, user, published_category, another_user
+):
+    mixer.cycle(3).blend(
+        "blog.Comment", post=live_posts[0], author=another_user
+    )
+    assert _stats(user, published_category) == ((2, 3), (2, 3))
+    stats = AuthorStats.objects.get(pk=user.pk)
+    assert stats.last_activity_at >= live_posts[0].pub_date
+
+    live_posts[0].is_published = False
+    live_posts[0].save()
+    assert _stats(user, published_category) == ((1, 3), (1, 3))
+
+    live_posts[1].delete()
+    live_posts[0].delete()
+    assert _stats(user, published_category) == ((0, 0), (0, 0))
+
+
+def test_moving_post_moves_its_comments(
+        mixer: Mixer, live_posts, user, published_category
+):
+    mixer.cycle(2).blend("blog.Comment", post=live_posts[0], author=user)
+    other = mixer.blend("blog.Category", is_published=True)
+    live_posts[0].category = other
+    live_posts[0].save()
+    assert _stats(user, published_category) == ((2, 2), (1, 0))
+    assert _stats(user, other)[1] == (1, 2)
+
+
+def test_scheduled_post_counts_when_live(
+        mixer: Mixer, user, published_category
+):
+    mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    assert _stats(user, published_category) == ((0, 0), (0, 0))
+    publish_due_posts(now=timezone.now() + timedelta(hours=2))
+    assert _stats(user, published_category) == ((1, 0), (1, 0))
+
+
+def test_unpublished_category_hides_posts(
+        live_posts, user, published_category
+):
+    published_category.is_published = False
+    published_category.save()
+    assert _stats(user, published_category) == ((0, 0), (0, 0))
+
+
+def test_rebuild_stats_repairs_drift(live_posts, user, published_category):
+    AuthorStats.objects.filter(pk=user.pk).update(posts_published=40)
+    CategoryStats.objects.all().delete()
+
+    call_command("rebuild_stats", batch_size=1)
+
+    assert _stats(user, published_category) == ((2, 0), (2, 0))
+
+
+def test_headers_show_stats(client, live_posts, user, published_category):
+    profile = client.get(f"/profile/{user.username}/").content.decode()
+    assert "Публикаций: 2" in profile
+    category = client.get(
+        f"/category/{published_category.slug}/"
+    ).content.decode()
+    assert "Публикаций: 2" in category
+
+
+def test_post_delete_query_count_ignores_comments(
+        mixer: Mixer, live_posts, user, published_category, another_user
+):
+    def delete_queries(post):
+        with CaptureQueriesContext(connection) as queries:
+            post.delete()
+        return len(queries.captured_queries)
+
+    mixer.cycle(2).blend(
+        "blog.Comment", post=live_posts[0], author=another_user
+    )
+    mixer.cycle(50).blend(
+        "blog.Comment", post=live_posts[1], author=another_user
+    )
+    few = delete_queries(live_posts[0])
+    assert delete_queries(live_posts[1]) == few
+    assert _stats(user, published_category) == ((0, 0), (0, 0))
+    assert _stats(another_user, published_category)[0] == (0, 0)
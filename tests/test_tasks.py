@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from core import tasks
+from core.models import Task
+
+pytestmark = [pytest.mark.django_db]
+
+CALLS = []
+
+
+@tasks.task(max_attempts=2)
+def remember(value):
+    CALLS.append(value)
+
+
+@tasks.task(max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    CALLS.clear()
+    Task.objects.all().delete()
+
+
+def test_enqueued_task_runs_in_worker():
+    task = remember.enqueue("a")
+    assert CALLS == []
+    assert task.status == Task.QUEUED
+
+    call_command("run_tasks", once=True)
+
+    task.refresh_from_db()
+    assert CALLS == ["a"]
+    assert task.status == Task.DONE
+    assert task.attempts == 1
+
+
+def test_delayed_task_waits():
+    remember.enqueue("later", delay=timedelta(minutes=5))
+    assert tasks.run_pending() == 0
+    assert CALLS == []
+
+
+def test_failed_task_retries_with_backoff_then_fails():
+    task = explode.enqueue()
+    assert tasks.run_pending() == 1
+    task.refresh_from_db()
+    assert task.status == Task.QUEUED
+    assert task.run_after > timezone.now()
+    assert "boom" in task.last_error
+
+    Task.objects.filter(pk=task.pk).update(run_after=timezone.now())
+    tasks.run_pending()
+    task.refresh_from_db()
+    assert task.status == Task.FAILED
+    assert task.attempts == 2
+
+
+def test_task_is_claimed_once():
+    task = remember.enqueue("once")
+    assert tasks.claim(task.pk) is not None
+    assert tasks.claim(task.pk) is None
+
+
+def test_stale_task_returns_to_queue(settings):
+    task = remember.enqueue("stale")
+    tasks.claim(task.pk, now=timezone.now() - timedelta(hours=1))
+    assert tasks.requeue_stale() == 1
+    tasks.run_pending()
+    assert CALLS == ["stale"]
+
+
+def test_eager_mode_runs_after_commit(
+        settings, django_capture_on_commit_callbacks
+):
+    settings.BLOG_TASKS_EAGER = True
+    with django_capture_on_commit_callbacks(execute=True):
+        remember.enqueue("eager")
+    assert CALLS == ["eager"]
+
+
+def test_password_reset_mail_is_queued(client, user):
+    user.email = "reader@example.com"
+    user.save()
+    response = client.post(
+        "/auth/password_reset/", {"email": user.email}
+    )
+    assert response.status_code == 302
+    assert mail.outbox == []
+
+    tasks.run_pending()
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == [user.email]
+
+
+def test_queue_stats_for_staff(client, admin_client):
+    remember.enqueue("x")
+    explode.enqueue(delay=timedelta(hours=1))
+    assert client.get("/tasks/stats/").status_code == 302
+    stats = admin_client.get("/tasks/stats/").json()
+    assert stats["queued"] == 2
+    assert stats["due"] == 1
+
+    tasks.run_pending()
+    stats = admin_client.get("/tasks/stats/").json()
+    assert stats["done_last_hour"] == 1
+    assert stats["latency_p95_s"] >= 0
@@ -0,0 +1,128 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from django.db import OperationalError
+
+from core import writes
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / "blogicum"
+PROCESSES = 6
+COMMENTS = 20
+P99_LIMIT_S = 3.0
+
+SETUP = """
+import django
+django.setup()
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from blog.models import Category, Post
+author = get_user_model().objects.create_user("stress", password="-")
+category = Category.objects.create(title="Нагрузка", slug="stress")
+Post.objects.create(
+    title="Нагрузка", text="-", author=author, category=category,
+    pub_date=timezone.now(),
+)
+"""
+
+WORKER = """
+import json, os, sys, time
+import django
+django.setup()
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.test.utils import setup_test_environment
+from blog.models import Post
+setup_test_environment()
+client = Client()
+client.force_login(get_user_model().objects.get(username="stress"))
+url = f"/posts/{Post.objects.get().pk}/comment/"
+time.sleep(max(0, float(os.environ["STRESS_START"]) - time.time()))
+latencies, errors = [], []
+for number in range(int(os.environ["STRESS_COMMENTS"])):
+    started = time.perf_counter()
+    try:
+        response = client.post(url, {"text": f"Комментарий {number}"})
+    except Exception as error:
+        errors.append(repr(error))
+    else:
+        if response.status_code != 302:
+            errors.append(response.status_code)
+    latencies.append(time.perf_counter() - started)
+json.dump({"latencies": latencies, "errors": errors}, sys.stdout)
+"""
+
+
+@pytest.mark.django_db(transaction=True)
+def test_locked_transaction_is_retried(settings):
+    settings.BLOG_WRITE_RETRY_DELAY = 0
+    calls = []
+
+    def write():
+        calls.append(writes._local.depth)
+        if len(calls) < 3:
+            raise OperationalError("database is locked")
+        # Вложенная запись не ждёт блокировку и не повторяется сама.
+        return writes.run_serialized(lambda: "ok")
+
+    assert writes.run_serialized(write) == "ok"
+    assert calls == [1, 1, 1]
+
+    settings.BLOG_WRITE_RETRIES = 1
+    calls.clear()
+    with pytest.raises(OperationalError):
+        writes.run_serialized(write)
+    assert len(calls) == 2
+
+    def broken():
+        calls.append(None)
+        raise OperationalError("no such table: blog_post")
+
+    calls.clear()
+    with pytest.raises(OperationalError):
+        writes.run_serialized(broken)
+    assert calls == [None]
+
+
+@pytest.mark.parametrize("profile", ["sqlite", "sqlite-wal"])
+def test_concurrent_comments_are_serialized(tmp_path, profile):
+    database = tmp_path / "stress.sqlite3"
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "blogicum.settings",
+        "BLOGICUM_DB": profile,
+        "BLOGICUM_DB_PATH": str(database),
+        "STRESS_COMMENTS": str(COMMENTS),
+    }
+
+    def python(*args):
+        return subprocess.Popen(
+            [sys.executable, *args],
+            cwd=PROJECT_DIR,
+            env=env,
+            stdout=subprocess.PIPE,
+        )
+
+    python("manage.py", "migrate", "-v0").wait()
+    assert python("-c", SETUP).wait() == 0
+    env["STRESS_START"] = str(time.time() + 2)
+    workers = [python("-c", WORKER) for _ in range(PROCESSES)]
+    results = [json.loads(worker.communicate()[0]) for worker in workers]
+
+    errors = [error for result in results for error in result["errors"]]
+    assert not errors
+    latencies = sorted(
+        latency for result in results for latency in result["latencies"]
+    )
+    assert latencies[int(len(latencies) * 0.99)] < P99_LIMIT_S
+    with sqlite3.connect(database) as db:
+        (count,) = db.execute("SELECT count(*) FROM blog_comment").fetchone()
+        (comment_count,) = db.execute(
+            "SELECT comment_count FROM blog_post"
+        ).fetchone()
+    assert count == comment_count == PROCESSES * COMMENTS